@@ -0,0 +1,85 @@
+"""
+Throughput de codificación/decodificación y de frames completos: json vs bin1.
+
+Uso:
+    python -m bench.bench_codec [--seconds 1.0]
+
+- small: un LOGIN/PING típico (~100 bytes)
+- large: GET_MY_PROFILE con 5000 amigos (~600 KB en json)
+El roundtrip de frames usa un socketpair con FrameBuffer reutilizable.
+"""
+import argparse
+import socket
+import threading
+import time
+import uuid
+
+from shared.protocol import BINARY, JSON, FrameBuffer, MessageProtocol, decode_payload, encode_payload
+
+
+def _messages():
+    small = {"type": "LOGIN", "secure": "gAAAAABm" + "x" * 80, "id": 17}
+    friends = [
+        {"id": str(uuid.uuid4()), "name": f"Name{i}", "lastname": f"Last{i}", "username": f"user{i}"}
+        for i in range(5000)
+    ]
+    large = {"status": "ok", "data": {"me": friends[0], "friends": friends}}
+    return {"small": small, "large": large}
+
+
+def _rate(fn, seconds: float) -> float:
+    n = 0
+    t0 = time.perf_counter()
+    end = t0 + seconds
+    while time.perf_counter() < end:
+        fn()
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def _frame_roundtrip_rate(msg, codec: str, seconds: float) -> float:
+    a, b = socket.socketpair()
+    stop = threading.Event()
+    count = [0]
+
+    def reader():
+        buf = FrameBuffer()
+        while not stop.is_set():
+            try:
+                MessageProtocol.recv(b, codec, buf)
+            except (ConnectionError, OSError):
+                return
+            count[0] += 1
+
+    t = threading.Thread(target=reader, daemon=True)
+    t.start()
+    t0 = time.perf_counter()
+    end = t0 + seconds
+    while time.perf_counter() < end:
+        MessageProtocol.send(a, msg, codec)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    a.close()
+    t.join(5)
+    b.close()
+    return count[0] / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=1.0)
+    args = ap.parse_args()
+
+    print(f"{'frame':>6} {'codec':>5} {'bytes':>8} {'enc/s':>9} {'dec/s':>9} {'frames/s':>9} {'MB/s':>7}")
+    for name, msg in _messages().items():
+        for codec in (JSON, BINARY):
+            data = encode_payload(msg, codec)
+            enc = _rate(lambda: encode_payload(msg, codec), args.seconds)
+            dec = _rate(lambda: decode_payload(data, codec), args.seconds)
+            frames = _frame_roundtrip_rate(msg, codec, args.seconds)
+            mbps = frames * len(data) / 1e6
+            print(f"{name:>6} {codec:>5} {len(data):>8} {enc:>9.0f} {dec:>9.0f} {frames:>9.0f} {mbps:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
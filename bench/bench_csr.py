@@ -0,0 +1,99 @@
+"""
+Memoria y velocidad: dict de sets (esquema de GraphService) vs CsrGraph.
+
+Uso:
+    python -m bench.bench_csr [--nodes 330000] [--m 3] [--queries 200]
+
+Con --nodes 3300000 el grafo tiene ~10M aristas (hacen falta varios GB para el
+dict de sets). La memoria se mide con tracemalloc sobre cada estructura ya armada,
+sin contar los strings de los ids (compartidos por ambas).
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from bench.synthetic import random_pairs, scale_free_graph
+from server.core.csr_graph import CsrGraph
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def _bfs_sets(adj, src, dst):
+    parent = {src: None}
+    q = deque([src])
+    while q:
+        u = q.popleft()
+        for v in adj[u]:
+            if v not in parent:
+                parent[v] = u
+                if v == dst:
+                    return True
+                q.append(v)
+    return False
+
+
+def _bfs_csr(g, src, dst):
+    s, t = g.index[src], g.index[dst]
+    parent = {s: -1}
+    q = deque([s])
+    while q:
+        u = q.popleft()
+        for v in g.neighbors_idx(u):
+            if v not in parent:
+                parent[v] = u
+                if v == t:
+                    return True
+                q.append(v)
+    return False
+
+
+def _time(fn, items):
+    t0 = time.perf_counter()
+    for it in items:
+        fn(*it)
+    return (time.perf_counter() - t0) * 1e3 / len(items)
+
+
+def run(n: int, m: int, queries: int) -> None:
+    raw = scale_free_graph(n, m)
+    edges = sum(len(v) for v in raw.values()) // 2
+    sets, sets_bytes = _measure(lambda: {u: set(f) for u, f in raw.items()})
+    csr, csr_bytes = _measure(lambda: CsrGraph.from_adjacency(raw))
+    del raw
+
+    pairs = random_pairs(sets, queries)
+    nodes = [(u,) for u in random.Random(1).sample(list(sets), min(queries * 50, n))]
+    few = pairs[: max(1, queries // 20)]
+
+    print(f"nodes={n} edges={edges}")
+    print(f"{'':>10} {'bytes/edge':>11} {'total_MB':>9} {'degree_us':>10} {'bfs_ms':>8} {'bidir_ms':>9}")
+    print(f"{'dict/set':>10} {sets_bytes / edges:>11.1f} {sets_bytes / 2**20:>9.1f} "
+          f"{_time(lambda u: len(sets[u]), nodes) * 1e3:>10.3f} "
+          f"{_time(lambda s, d: _bfs_sets(sets, s, d), few):>8.2f} {'-':>9}")
+    print(f"{'csr':>10} {csr_bytes / edges:>11.1f} {csr_bytes / 2**20:>9.1f} "
+          f"{_time(csr.degree, nodes) * 1e3:>10.3f} "
+          f"{_time(lambda s, d: _bfs_csr(csr, s, d), few):>8.2f} "
+          f"{_time(csr.bfs_path, pairs):>9.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nodes", type=int, default=330000)
+    ap.add_argument("--m", type=int, default=3)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+    run(args.nodes, args.m, args.queries)
+
+
+if __name__ == "__main__":
+    main()
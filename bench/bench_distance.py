@@ -0,0 +1,60 @@
+"""
+DISTANCE_ESTIMATE: oráculo de landmarks vs BFS bidireccional exacto.
+
+Uso:
+    python -m bench.bench_distance [--nodes 200000] [--m 3] [--landmarks 16] [--queries 500]
+
+Reporta el costo de recalcular las tablas, la latencia por consulta y qué tan
+ajustadas quedan las cotas (exacto cuando lower == upper).
+"""
+import argparse
+import time
+
+from bench.synthetic import MemoryGraphRepository, random_pairs, scale_free_graph
+from server.core.distance_oracle import DistanceOracle
+from server.core.graph_service import GraphService
+from server.core.path_service import PathService
+
+
+def run(n: int, m: int, landmarks: int, queries: int) -> None:
+    raw = scale_free_graph(n, m)
+    pairs = random_pairs(raw, queries)
+    gs = GraphService(MemoryGraphRepository(raw))
+    del raw
+    ps = PathService(gs)
+    oracle = DistanceOracle(gs, ps, landmarks=landmarks)
+
+    t0 = time.perf_counter()
+    oracle.refresh()
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ests = [oracle.estimate(a, b) for a, b in pairs]
+    est_us = (time.perf_counter() - t0) * 1e6 / len(pairs)
+
+    t0 = time.perf_counter()
+    exact = [len(ps.find_path_bfs(a, b)) - 1 for a, b in pairs]
+    bfs_us = (time.perf_counter() - t0) * 1e6 / len(pairs)
+
+    tight = sum(1 for e in ests if e["lower"] == e["upper"])
+    ok = sum(1 for e, d in zip(ests, exact) if e["lower"] <= d <= e["upper"])
+    gap = sum(e["upper"] - e["lower"] for e in ests) / len(ests)
+    err = sum(e["upper"] - d for e, d in zip(ests, exact)) / len(ests)
+
+    print(f"nodes={n} landmarks={landmarks} build_s={build:.2f} table_MB={oracle.stats()['bytes'] / 2**20:.1f}")
+    print(f"estimate_us={est_us:.1f} bfs_us={bfs_us:.1f} exact={tight / len(ests):.0%} "
+          f"bounds_ok={ok / len(ests):.0%} avg_gap={gap:.2f} upper_minus_exact={err:.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nodes", type=int, default=200000)
+    ap.add_argument("--m", type=int, default=3)
+    ap.add_argument("--landmarks", type=int, default=16)
+    ap.add_argument("--queries", type=int, default=500)
+    args = ap.parse_args()
+    run(args.nodes, args.m, args.landmarks, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Costo de las métricas por tipo de mensaje en RequestRouter.handle.
+
+Uso:
+    python -m bench.bench_metrics [--users 1000] [--ops 20000]
+
+Mide el mismo flujo de mensajes con las métricas habilitadas y deshabilitadas
+(router.metrics = None) y reporta la diferencia en µs por request.
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from bench.fixtures import make_router, seed_dataset
+
+
+def _us_per_op(router, reqs) -> float:
+    handle = router.handle
+    best = float("inf")
+    # Mejor de 5: lo que interesa es el costo fijo, no el ruido del scheduler
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for req in reqs:
+            handle(req)
+        best = min(best, (time.perf_counter() - t0) * 1e6 / len(reqs))
+    return best
+
+
+def run(users: int, ops: int) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        ds = seed_dataset(d, users)
+        ids = [u["id"] for u in ds.users]
+        router = make_router(ds.users_file, ds.graph_file)
+        metrics = router.metrics
+        rnd = random.Random(1)
+        flows = {
+            "PING": [{"type": "PING"}] * ops,
+            "GET_MY_PROFILE": [{"type": "GET_MY_PROFILE", "payload": {"user_id": rnd.choice(ids)}} for _ in range(ops)],
+        }
+        print(f"{'type':<16} {'off_us':>9} {'on_us':>9} {'delta_us':>9}")
+        for name, reqs in flows.items():
+            router.metrics = None
+            off = _us_per_op(router, reqs)
+            router.metrics = metrics
+            on = _us_per_op(router, reqs)
+            print(f"{name:<16} {off:>9.2f} {on:>9.2f} {on - off:>9.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--ops", type=int, default=20000)
+    args = ap.parse_args()
+    run(args.users, args.ops)
+
+
+if __name__ == "__main__":
+    main()
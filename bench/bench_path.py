@@ -0,0 +1,80 @@
+"""
+PATH_BETWEEN: BFS bidireccional sobre la vista viva vs snapshot() + BFS simple.
+
+Uso:
+    python -m bench.bench_path [--sizes 100000,1000000] [--m 3] [--queries 200]
+
+Los grafos son Barabási–Albert (bench.synthetic). El esquema anterior se mide con
+menos consultas porque cada una copia y ordena el grafo entero.
+"""
+import argparse
+import time
+from collections import deque
+
+from bench.synthetic import MemoryGraphRepository, random_pairs, scale_free_graph
+from server.core.graph_service import GraphService
+from server.core.path_service import PathService
+
+
+def _legacy_path(graph: GraphService, src: str, dst: str):
+    adj = graph.snapshot()
+    if src not in adj or dst not in adj:
+        return []
+    q = deque([src])
+    parent = {src: None}
+    while q:
+        u = q.popleft()
+        for v in adj.get(u, []):
+            if v in parent:
+                continue
+            parent[v] = u
+            if v == dst:
+                path = []
+                while v is not None:
+                    path.append(v)
+                    v = parent[v]
+                return path[::-1]
+            q.append(v)
+    return []
+
+
+def run(sizes, m: int, queries: int) -> None:
+    print(f"{'nodes':>9} {'edges':>9} {'bidir_ms':>9} {'p99_ms':>8} {'legacy_ms':>10} {'hops':>5}")
+    for n in sizes:
+        adj = scale_free_graph(n, m)
+        edges = sum(len(v) for v in adj.values()) // 2
+        pairs = random_pairs(adj, queries)
+        gs = GraphService(MemoryGraphRepository(adj))
+        del adj
+        ps = PathService(gs)
+
+        lat = []
+        hops = 0
+        for s, d in pairs:
+            t0 = time.perf_counter()
+            p = ps.find_path_bfs(s, d)
+            lat.append((time.perf_counter() - t0) * 1e3)
+            hops += max(0, len(p) - 1)
+        lat.sort()
+
+        legacy_n = max(1, min(5, queries))
+        t0 = time.perf_counter()
+        for s, d in pairs[:legacy_n]:
+            _legacy_path(gs, s, d)
+        legacy = (time.perf_counter() - t0) * 1e3 / legacy_n
+
+        print(f"{n:>9} {edges:>9} {sum(lat) / len(lat):>9.3f} {lat[int(len(lat) * 0.99) - 1]:>8.3f} "
+              f"{legacy:>10.1f} {hops / len(pairs):>5.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100000,1000000")
+    ap.add_argument("--m", type=int, default=3)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.m, args.queries)
+
+
+if __name__ == "__main__":
+    main()
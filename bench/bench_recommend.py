@@ -0,0 +1,86 @@
+"""
+MUTUAL_FRIENDS y RECOMMEND sobre grafos con grados sesgados (Barabási–Albert).
+
+Uso:
+    python -m bench.bench_recommend [--nodes 200000] [--m 5] [--queries 50]
+
+Se miden usuarios de grado típico (p50), alto (p99) y el hub máximo:
+- naive: sets + dict por amigo en Python puro (lo que haría un handler directo)
+- engine: RecommendService sin tabla (cálculo en frío)
+- table: respuesta desde la tabla precalculada
+"""
+import argparse
+import math
+import random
+import time
+
+from bench.synthetic import MemoryGraphRepository, scale_free_graph
+from server.core.graph_service import GraphService
+from server.core.recommend_service import ADAMIC_ADAR, COMMON, RecommendService
+
+
+def _naive_recommend(adj, u, k, method):
+    friends = set(adj[u])
+    scores = {}
+    for f in adj[u]:
+        nb = adj[f]
+        w = 1.0 if method == COMMON else (1.0 / math.log(len(nb)) if len(nb) > 1 else 0.0)
+        for v in nb:
+            if v != u and v not in friends:
+                scores[v] = scores.get(v, 0.0) + w
+    return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+
+def _naive_mutual(adj, a, b):
+    return sorted(set(adj[a]) & set(adj[b]))
+
+
+def _ms(fn, args_list):
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) * 1e3 / len(args_list)
+
+
+def run(n: int, m: int, queries: int) -> None:
+    raw = scale_free_graph(n, m)
+    gs = GraphService(MemoryGraphRepository(raw))
+    del raw
+    snap = gs.current()
+    rs = RecommendService(gs)
+
+    by_degree = sorted(snap, key=lambda u: len(snap[u]))
+    groups = {
+        "p50": by_degree[len(by_degree) // 2 - queries // 2: len(by_degree) // 2 + queries // 2],
+        "p99": by_degree[int(len(by_degree) * 0.99): int(len(by_degree) * 0.99) + queries],
+        "hub": by_degree[-1:],
+    }
+    rnd = random.Random(3)
+
+    print(f"nodes={n} edges={sum(len(v) for v in snap.values()) // 2} max_degree={len(snap[by_degree[-1]])}")
+    print(f"{'users':>6} {'deg':>6} {'query':>16} {'naive_ms':>9} {'engine_ms':>10} {'table_ms':>9}")
+    for name, users in groups.items():
+        deg = sum(len(snap[u]) for u in users) // len(users)
+        pairs = [(u, rnd.choice(by_degree)) for u in users]
+        print(f"{name:>6} {deg:>6} {'mutual':>16} {_ms(lambda a, b: _naive_mutual(snap, a, b), pairs):>9.3f} "
+              f"{_ms(rs.mutual_friends, pairs):>10.3f} {'-':>9}")
+        for method in (COMMON, ADAMIC_ADAR):
+            args = [(u, 10, method) for u in users]
+            naive = _ms(lambda u, k, mth: _naive_recommend(snap, u, k, mth), args)
+            cold = _ms(lambda u, k, mth: rs._top(snap, u, k, mth), args)
+            rs.precompute(users, method)
+            table = _ms(rs.recommend, args)
+            print(f"{name:>6} {deg:>6} {'recommend/' + method[:6]:>16} {naive:>9.3f} {cold:>10.3f} {table:>9.4f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nodes", type=int, default=200000)
+    ap.add_argument("--m", type=int, default=5)
+    ap.add_argument("--queries", type=int, default=50)
+    args = ap.parse_args()
+    run(args.nodes, args.m, args.queries)
+
+
+if __name__ == "__main__":
+    main()
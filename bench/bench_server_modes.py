@@ -0,0 +1,141 @@
+"""
+Compara TcpServer (thread por conexión) vs AsyncTcpServer con N conexiones ociosas.
+
+Uso:
+    python -m bench.bench_server_modes [--conns 1000,5000,10000] [--active 32] [--seconds 2]
+
+Por cada modo y N: levanta el server en un proceso aparte, abre N conexiones que
+mandan un PING y quedan ociosas, y mide RSS/threads del server y el throughput de
+`--active` clientes haciendo PING en loop. El handler es trivial: se mide el transporte.
+Requiere un límite de descriptores (ulimit -n) mayor a N.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import socket
+import threading
+import time
+
+from shared.protocol import MessageProtocol
+
+
+def _handler(req):
+    return {"status": "ok", "data": {"pong": True}}
+
+
+def _serve(mode: str, port: int, max_connections: int, workers: int) -> None:
+    # Los servers loguean cada conexión: silenciamos el proceso hijo
+    import sys
+    sys.stdout = open(os.devnull, "w")
+    if mode == "asyncio":
+        from server.net.async_tcp_server import AsyncTcpServer
+        AsyncTcpServer("127.0.0.1", port, handler=_handler).start()
+    else:
+        from server.net.tcp_server import TcpServer
+        # Límites por encima de la carga: que se mida el modelo de threads, no el rechazo
+        TcpServer(
+            "127.0.0.1",
+            port,
+            handler=_handler,
+            max_connections=max_connections,
+            workers=workers,
+            queue_size=max_connections,
+        ).start()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _proc_status(pid: int) -> dict:
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            k, _, v = line.partition(":")
+            if k in ("VmRSS", "Threads"):
+                out[k] = int(v.split()[0])
+    return out
+
+
+def _ping(sock) -> None:
+    MessageProtocol.send(sock, {"type": "PING"})
+    MessageProtocol.recv(sock)
+
+
+def _throughput(port: int, active: int, seconds: float) -> float:
+    count = [0] * active
+    stop = time.perf_counter() + seconds
+
+    def worker(i):
+        with socket.create_connection(("127.0.0.1", port)) as s:
+            while time.perf_counter() < stop:
+                _ping(s)
+                count[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(active)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return sum(count) / seconds
+
+
+def run_one(mode: str, conns: int, active: int, seconds: float) -> dict:
+    port = _free_port()
+    # Margen para las conexiones de prueba de arranque, que el server libera de a poco
+    limit = conns + active + 128
+    proc = mp.Process(target=_serve, args=(mode, port, limit, active), daemon=True)
+    proc.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    base = _proc_status(proc.pid)
+    idle = []
+    try:
+        for _ in range(conns):
+            s = socket.create_connection(("127.0.0.1", port))
+            _ping(s)
+            idle.append(s)
+        loaded = _proc_status(proc.pid)
+        rps = _throughput(port, active, seconds)
+    finally:
+        for s in idle:
+            s.close()
+        proc.terminate()
+        proc.join()
+
+    return {
+        "mode": mode,
+        "conns": conns,
+        "rss_mb": loaded["VmRSS"] / 1024,
+        "kb_per_conn": (loaded["VmRSS"] - base["VmRSS"]) / max(1, conns),
+        "threads": loaded["Threads"],
+        "rps": rps,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--conns", default="1000,5000,10000")
+    ap.add_argument("--active", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"{'mode':>8} {'conns':>7} {'rss_mb':>8} {'kb/conn':>8} {'threads':>8} {'ping/s':>9}")
+    for n in (int(x) for x in args.conns.split(",")):
+        for mode in ("threads", "asyncio"):
+            r = run_one(mode, n, args.active, args.seconds)
+            print(f"{r['mode']:>8} {r['conns']:>7} {r['rss_mb']:>8.1f} {r['kb_per_conn']:>8.1f} "
+                  f"{r['threads']:>8} {r['rps']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latencia de lookups de UserRepository según cantidad de usuarios.
+
+Uso:
+    python -m bench.bench_user_repo [--sizes 1000,10000,100000] [--lookups 2000]
+
+Compara el repositorio indexado contra el esquema anterior (parsear users.json
+y recorrer la lista en cada llamada).
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from server.core.user_repo import UserRepository
+
+
+def _write_users(path: str, n: int) -> list:
+    users = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Name{i}",
+            "lastname": f"Last{i}",
+            "username": f"user{i}",
+            "password_hash": "x",
+            "photo_path": "",
+        }
+        for i in range(n)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(users, f)
+    return users
+
+
+def _legacy_find(path: str, username: str):
+    with open(path, "r", encoding="utf-8") as f:
+        users = json.load(f)
+    for u in users:
+        if u["username"].lower() == username.lower():
+            return u
+    return None
+
+
+def _per_call_us(fn, args_list) -> float:
+    t0 = time.perf_counter()
+    for a in args_list:
+        fn(a)
+    return (time.perf_counter() - t0) / len(args_list) * 1e6
+
+
+def run(sizes, lookups: int) -> None:
+    rnd = random.Random(42)
+    print(f"{'users':>10} {'load_ms':>10} {'by_user_us':>12} {'by_id_us':>10} {'legacy_us':>12}")
+    with tempfile.TemporaryDirectory() as d:
+        for n in sizes:
+            path = os.path.join(d, f"users_{n}.json")
+            users = _write_users(path, n)
+            names = [rnd.choice(users)["username"] for _ in range(lookups)]
+            ids = [rnd.choice(users)["id"] for _ in range(lookups)]
+
+            t0 = time.perf_counter()
+            repo = UserRepository(path)
+            load_ms = (time.perf_counter() - t0) * 1e3
+
+            by_user = _per_call_us(repo.find_by_username, names)
+            by_id = _per_call_us(repo.get_by_id, ids)
+            # El esquema anterior es O(N) por llamada: medimos pocas llamadas
+            legacy = _per_call_us(lambda u: _legacy_find(path, u), names[: max(1, min(lookups, 20))])
+
+            print(f"{n:>10} {load_ms:>10.1f} {by_user:>12.2f} {by_id:>10.2f} {legacy:>12.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--lookups", type=int, default=2000)
+    args = ap.parse_args()
+    run([int(s) for s in args.sizes.split(",")], args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Datasets sembrados en disco y un RequestRouter montado sobre ellos (suite y loadgen).
+"""
+import importlib
+import os
+from typing import Any, Dict, List, NamedTuple, Set
+
+from passlib.hash import pbkdf2_sha256
+
+from bench.synthetic import scale_free_graph, synthetic_users, write_graph, write_users
+
+# Todos los usuarios sembrados comparten esta contraseña
+PASSWORD = "bench1234"
+
+
+class Dataset(NamedTuple):
+    users_file: str
+    graph_file: str
+    users: List[Dict[str, Any]]
+    adj: Dict[str, Set[str]]
+
+
+def seed_dataset(dirpath: str, n: int, m: int = 3, seed: int = 42) -> Dataset:
+    """
+    Escribe users.json (n usuarios) y graph.json (Barabási–Albert sobre sus ids) en dirpath.
+    """
+    users = synthetic_users(n, seed, password_hash=pbkdf2_sha256.hash(PASSWORD))
+    adj = scale_free_graph(n, m, seed, ids=[u["id"] for u in users])
+    users_file = os.path.join(dirpath, "users.json")
+    graph_file = os.path.join(dirpath, "graph.json")
+    write_users(users_file, users)
+    write_graph(graph_file, adj)
+    return Dataset(users_file, graph_file, users, adj)
+
+
+def make_router(users_file: str, graph_file: str):
+    """
+    RequestRouter sobre esos archivos (backend json). El router lee shared.config al
+    importarse, así que se pisa la config y se recarga el módulo.
+    """
+    import shared.config as cfg
+    cfg.STORAGE_BACKEND = "json"
+    cfg.USERS_FILE = users_file
+    cfg.GRAPH_FILE = graph_file
+
+    import server.core.router as router_module
+    importlib.reload(router_module)
+    return router_module.RequestRouter()
@@ -0,0 +1,287 @@
+"""
+Generador de carga multi-cliente contra un TcpServer local (loopback).
+
+Uso:
+    python -m bench.loadgen [--users 10000] [--connections 16] [--rate 500] [--duration 10]
+                            [--mix SEARCH_USER=30,GET_MY_PROFILE=25,...] [--server-mode threads]
+                            [--poisson] [--inprocess] [--out loadgen.json]
+
+Siembra un dataset (bench.fixtures), levanta el server en un subproceso (para no
+compartir el GIL con el generador; --inprocess lo corre en una thread) y abre
+--connections conexiones con AsyncApiClient, que admite varias requests en vuelo.
+
+Scheduling en lazo abierto: la request i tiene hora programada start + i/rate (o
+intervalos exponenciales con --poisson) y se envía a esa hora aunque las anteriores
+no hayan vuelto. La latencia se mide desde la hora programada, no desde el envío
+real: si el server se traba, las requests que "esperaron" cuentan esa espera y no
+se esconde la cola (coordinated omission).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bench.fixtures import PASSWORD, make_router, seed_dataset
+from client.net.async_api_client import AsyncApiClient
+
+DEFAULT_MIX = "SEARCH_USER=30,GET_MY_PROFILE=25,PATH_BETWEEN=15,ADD_FRIEND=10,LOGIN=8,GRAPH_STATS=7,REGISTER=5"
+MESSAGE_TYPES = ("REGISTER", "LOGIN", "SEARCH_USER", "ADD_FRIEND", "GET_MY_PROFILE", "PATH_BETWEEN", "GRAPH_STATS")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().upper()
+        if name not in MESSAGE_TYPES:
+            raise ValueError(f"Unknown message type in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+# ---------- server ----------
+def _serve(users_file: str, graph_file: str, mode: str) -> None:
+    """
+    Proceso hijo: levanta el server en un puerto libre e imprime "PORT <n>".
+    """
+    router = make_router(users_file, graph_file)
+    srv = _make_server(router, mode)
+    threading.Thread(target=srv.start, daemon=True).start()
+    srv.ready.wait()
+    print(f"PORT {srv.port}", flush=True)
+    # El padre ya no lee stdout: los logs del server no deben llenar el pipe
+    sys.stdout = open(os.devnull, "w")
+    # Termina cuando el padre cierra stdin
+    sys.stdin.read()
+    srv.stop()
+
+
+def _make_server(router, mode: str):
+    from server.net.async_tcp_server import AsyncTcpServer
+    from server.net.tcp_server import TcpServer
+    from shared.config import IDLE_TIMEOUT, MAX_CONNECTIONS, REQUEST_QUEUE_SIZE, WORKER_THREADS
+
+    if mode == "asyncio":
+        return AsyncTcpServer("127.0.0.1", 0, handler=router.handle, metrics=router.metrics)
+    return TcpServer(
+        "127.0.0.1",
+        0,
+        handler=router.handle,
+        max_connections=MAX_CONNECTIONS,
+        workers=WORKER_THREADS,
+        queue_size=REQUEST_QUEUE_SIZE,
+        idle_timeout=IDLE_TIMEOUT,
+        metrics=router.metrics,
+    )
+
+
+class ServerHandle:
+    def __init__(self, users_file: str, graph_file: str, mode: str, inprocess: bool):
+        self._proc: Optional[subprocess.Popen] = None
+        self._srv = None
+        if inprocess:
+            self._srv = _make_server(make_router(users_file, graph_file), mode)
+            threading.Thread(target=self._srv.start, daemon=True).start()
+            self._srv.ready.wait()
+            self.port = self._srv.port
+            return
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "bench.loadgen", "--serve", users_file, graph_file, "--server-mode", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for line in self._proc.stdout:
+            if line.startswith("PORT "):
+                self.port = int(line.split()[1])
+                break
+        else:
+            raise RuntimeError("Server process exited before listening")
+
+    def stop(self) -> None:
+        if self._srv is not None:
+            self._srv.stop()
+        if self._proc is not None:
+            self._proc.stdin.close()
+            try:
+                self._proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+
+# ---------- carga ----------
+class LoadGenerator:
+    def __init__(self, clients: List[AsyncApiClient], ids: List[str], usernames: List[str], mix: Dict[str, float], seed: int = 1):
+        self.clients = clients
+        self.ids = ids
+        self.usernames = usernames
+        self.rnd = random.Random(seed)
+        self.types = list(mix)
+        self.weights = [mix[t] for t in self.types]
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.dropped = 0
+        self.max_lag = 0.0
+        self._registered = itertools.count()
+
+    def _call(self, client: AsyncApiClient, msg_type: str) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        rnd = self.rnd
+        if msg_type == "REGISTER":
+            n = next(self._registered)
+            return lambda: client.register("Load", "Gen", f"loadgen{time.time_ns()}{n}", PASSWORD)
+        if msg_type == "LOGIN":
+            username = rnd.choice(self.usernames)
+            return lambda: client.login(username, PASSWORD)
+        if msg_type == "SEARCH_USER":
+            query = rnd.choice(self.usernames)[: rnd.randint(3, 5)]
+            return lambda: client.search_user(query)
+        if msg_type == "ADD_FRIEND":
+            a, b = rnd.sample(self.ids, 2)
+            return lambda: client.add_friend(a, b)
+        if msg_type == "GET_MY_PROFILE":
+            user_id = rnd.choice(self.ids)
+            return lambda: client.get_profile(user_id)
+        if msg_type == "PATH_BETWEEN":
+            a, b = rnd.choice(self.ids), rnd.choice(self.ids)
+            return lambda: client.path_between(a, b)
+        return client.graph_stats
+
+    async def _one(self, msg_type: str, call: Callable[[], Awaitable[Dict[str, Any]]], intended: float) -> None:
+        try:
+            resp = await call()
+            ok = resp.get("status") == "ok"
+        except Exception:
+            ok = False
+        # Desde la hora programada: incluye la espera si el generador o el server se atrasaron
+        self.latencies[msg_type].append(time.perf_counter() - intended)
+        if not ok:
+            self.errors[msg_type] += 1
+
+    async def run(self, rate: float, duration: float, poisson: bool, max_in_flight: int) -> float:
+        tasks = set()
+        start = time.perf_counter()
+        intended = start
+        i = 0
+        while intended < start + duration:
+            now = time.perf_counter()
+            if intended > now:
+                await asyncio.sleep(intended - now)
+            else:
+                self.max_lag = max(self.max_lag, now - intended)
+            msg_type = self.rnd.choices(self.types, self.weights)[0]
+            if len(tasks) >= max_in_flight:
+                # Protege la memoria del generador; se reporta aparte
+                self.dropped += 1
+            else:
+                client = self.clients[i % len(self.clients)]
+                t = asyncio.create_task(self._one(msg_type, self._call(client, msg_type), intended))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+            i += 1
+            intended += self.rnd.expovariate(rate) if poisson else 1.0 / rate
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"elapsed_s": elapsed, "dropped": self.dropped, "max_scheduler_lag_ms": self.max_lag * 1e3, "types": {}}
+        everything: List[float] = []
+        for msg_type in sorted(self.latencies):
+            lat = sorted(self.latencies[msg_type])
+            everything.extend(lat)
+            out["types"][msg_type] = self._summary(lat, self.errors[msg_type], elapsed)
+        everything.sort()
+        out["total"] = self._summary(everything, sum(self.errors.values()), elapsed)
+        return out
+
+    @staticmethod
+    def _summary(lat: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+        return {
+            "count": len(lat),
+            "errors": errors,
+            "throughput_rps": len(lat) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(lat, 50) * 1e3,
+            "p95_ms": percentile(lat, 95) * 1e3,
+            "p99_ms": percentile(lat, 99) * 1e3,
+            "max_ms": (lat[-1] if lat else 0.0) * 1e3,
+        }
+
+
+def print_report(rep: Dict[str, Any]) -> None:
+    print(f"{'type':<16} {'count':>7} {'errors':>6} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    rows = list(rep["types"].items()) + [("TOTAL", rep["total"])]
+    for name, r in rows:
+        print(f"{name:<16} {r['count']:>7} {r['errors']:>6} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+    print(f"elapsed {rep['elapsed_s']:.1f}s  dropped {rep['dropped']}  max scheduler lag {rep['max_scheduler_lag_ms']:.1f} ms")
+
+
+async def _drive(args, port: int, ids: List[str], usernames: List[str]) -> Dict[str, Any]:
+    clients = [AsyncApiClient("127.0.0.1", port) for _ in range(args.connections)]
+    await asyncio.gather(*(c.connect() for c in clients))
+    try:
+        gen = LoadGenerator(clients, ids, usernames, parse_mix(args.mix), seed=args.seed)
+        elapsed = await gen.run(args.rate, args.duration, args.poisson, args.max_in_flight)
+        return gen.report(elapsed)
+    finally:
+        await asyncio.gather(*(c.close() for c in clients))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=10000)
+    ap.add_argument("--m", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--connections", type=int, default=16)
+    ap.add_argument("--rate", type=float, default=500.0, help="requests por segundo (objetivo)")
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--poisson", action="store_true", help="llegadas exponenciales en vez de intervalos fijos")
+    ap.add_argument("--max-in-flight", type=int, default=10000)
+    ap.add_argument("--server-mode", choices=("threads", "asyncio"), default="threads")
+    ap.add_argument("--inprocess", action="store_true", help="server en una thread de este proceso")
+    ap.add_argument("--out", help="guardar el reporte en JSON")
+    ap.add_argument("--serve", nargs=2, metavar=("USERS_FILE", "GRAPH_FILE"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.serve:
+        _serve(args.serve[0], args.serve[1], args.server_mode)
+        return 0
+
+    parse_mix(args.mix)
+    with tempfile.TemporaryDirectory() as d:
+        ds = seed_dataset(d, args.users, args.m, args.seed)
+        ids = [u["id"] for u in ds.users]
+        usernames = [u["username"] for u in ds.users]
+        server = ServerHandle(ds.users_file, ds.graph_file, args.server_mode, args.inprocess)
+        try:
+            rep = asyncio.run(_drive(args, server.port, ids, usernames))
+        finally:
+            server.stop()
+
+    rep["config"] = {k: v for k, v in vars(args).items() if k != "serve"}
+    print_report(rep)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
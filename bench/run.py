@@ -0,0 +1,233 @@
+"""
+Suite de benchmarks del core del server.
+
+Uso:
+    python -m bench.run [--sizes 1000,10000,100000] [--out bench_results.json]
+                        [--baseline viejo.json] [--threshold 0.25] [--budget 1.0]
+    python -m bench.run --compare viejo.json nuevo.json [--threshold 0.25]
+
+Para cada tamaño siembra usuarios y un grafo Barabási–Albert (bench.fixtures) en un
+directorio temporal y mide, con latencia por operación (p50/p95/media en µs):
+- core: find_path_bfs, compute_stats, search_by_name, friends_of
+- persist: carga de users.json/graph.json, journal del grafo, snapshot, alta de usuario
+- router: cada tipo de mensaje de RequestRouter.handle
+
+Los resultados van a un JSON. Con --baseline (o --compare) se marcan como regresión
+las mediciones cuyo p50 empeoró más de --threshold; en ese caso sale con código 1.
+Tamaños de 1M funcionan pero tardan minutos y varios GB de RAM.
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from bench.fixtures import PASSWORD, make_router, seed_dataset
+from server.core.graph_repo import GraphRepository
+from server.core.graph_service import GraphService
+from server.core.path_service import PathService
+from server.core.user_repo import UserRepository
+from shared.config import FERNET_KEY
+from shared.crypto import CryptoService
+
+MIN_OPS = 3
+MAX_OPS = 2000
+# Diferencias menores a esto (µs) son ruido aunque el ratio sea grande
+MIN_DELTA_US = 2.0
+
+
+class Recorder:
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def measure(self, name: str, fn: Callable[..., Any], args: Iterable[tuple], max_ops: int = MAX_OPS) -> None:
+        """
+        Corre fn(*a) para cada a de args hasta max_ops o hasta agotar el presupuesto
+        de tiempo (con al menos MIN_OPS operaciones).
+        """
+        lat: List[float] = []
+        start = time.perf_counter()
+        for a in itertools.islice(args, max_ops):
+            t0 = time.perf_counter()
+            fn(*a)
+            t1 = time.perf_counter()
+            lat.append((t1 - t0) * 1e6)
+            if t1 - start > self.budget and len(lat) >= MIN_OPS:
+                break
+        lat.sort()
+        self.results[name] = {
+            "ops": len(lat),
+            "mean_us": sum(lat) / len(lat),
+            "p50_us": lat[len(lat) // 2],
+            "p95_us": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+        }
+        r = self.results[name]
+        print(f"  {name:<32} {r['ops']:>6} ops  p50 {r['p50_us']:>12.1f} us  p95 {r['p95_us']:>12.1f} us", flush=True)
+
+
+def _ok(resp: Dict[str, Any]) -> Dict[str, Any]:
+    # Un benchmark que mide errores no sirve: cortamos
+    if resp.get("status") != "ok":
+        raise RuntimeError(f"Unexpected response: {resp}")
+    return resp
+
+
+def _cycle(make: Callable[[], tuple]) -> Iterable[tuple]:
+    while True:
+        yield make()
+
+
+def bench_size(n: int, m: int, seed: int, budget: float) -> Dict[str, Dict[str, float]]:
+    rec = Recorder(budget)
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() as d:
+        ds = seed_dataset(d, n, m, seed)
+        ids = [u["id"] for u in ds.users]
+        usernames = [u["username"] for u in ds.users]
+        ds = ds._replace(adj={})  # el router carga su propia copia
+
+        # ---------- persistencia: carga ----------
+        rec.measure("persist.users_load", lambda: UserRepository(ds.users_file), _cycle(tuple), max_ops=5)
+        rec.measure("persist.graph_load", lambda: GraphService(GraphRepository(ds.graph_file)), _cycle(tuple), max_ops=5)
+
+        router = make_router(ds.users_file, ds.graph_file)
+        crypto = CryptoService(FERNET_KEY)
+        path = PathService(router.graph)  # sin caché: mide el BFS
+
+        def pair() -> tuple:
+            return rnd.choice(ids), rnd.choice(ids)
+
+        def prefix() -> tuple:
+            return (rnd.choice(usernames)[: rnd.randint(3, 5)],)
+
+        # ---------- core ----------
+        rec.measure("core.find_path_bfs", path.find_path_bfs, _cycle(pair))
+        rec.measure("core.compute_stats", router.stats.compute_stats, _cycle(tuple))
+        rec.measure("core.compute_stats_verify", lambda: router.stats.compute_stats(verify=True), _cycle(tuple), max_ops=20)
+        rec.measure("core.search_by_name", router.users.search_by_name, _cycle(prefix))
+        rec.measure("core.friends_of", router.graph.friends_of, _cycle(lambda: (rnd.choice(ids),)))
+
+        # ---------- router: lecturas ----------
+        if router.distance is not None:
+            rec.measure("oracle.refresh", router.distance.refresh, [()], max_ops=1)
+
+        def msg(t: str, payload_fn: Optional[Callable[[], Dict[str, Any]]] = None) -> Iterable[tuple]:
+            return _cycle(lambda: ({"type": t, "payload": payload_fn() if payload_fn else {}},))
+
+        def h(req: Dict[str, Any]) -> None:
+            _ok(router.handle(req))
+
+        rec.measure("router.PING", h, msg("PING"))
+        rec.measure("router.SEARCH_USER", h, msg("SEARCH_USER", lambda: {"query": prefix()[0]}))
+        rec.measure("router.GET_MY_PROFILE", h, msg("GET_MY_PROFILE", lambda: {"user_id": rnd.choice(ids)}))
+        rec.measure("router.FRIENDS_PAGE", h, msg("FRIENDS_PAGE", lambda: {"user_id": rnd.choice(ids), "limit": 50}))
+        rec.measure("router.MUTUAL_FRIENDS", h, msg("MUTUAL_FRIENDS", lambda: dict(zip("ab", pair()))))
+        rec.measure("router.RECOMMEND", h, msg("RECOMMEND", lambda: {"user_id": rnd.choice(ids), "k": 10}))
+        rec.measure("router.PATH_BETWEEN", h, msg("PATH_BETWEEN", lambda: dict(zip(("src", "dst"), pair()))))
+        rec.measure("router.DISTANCE_ESTIMATE", h, msg("DISTANCE_ESTIMATE", lambda: dict(zip("ab", pair()))))
+        rec.measure("router.GRAPH_STATS", h, msg("GRAPH_STATS"))
+        rec.measure("router.CACHE_STATS", h, msg("CACHE_STATS"))
+        rec.measure("router.METRICS", h, msg("METRICS"))
+        rec.measure("router.BATCH", h, msg("BATCH", lambda: {"parallel": True, "requests": [
+            {"type": "GET_MY_PROFILE", "payload": {"user_id": rnd.choice(ids)}} for _ in range(10)
+        ]}))
+        def login() -> tuple:
+            secure = crypto.encrypt_json({"username": rnd.choice(usernames), "password": PASSWORD})
+            return ({"type": "LOGIN", "secure": secure},)
+
+        rec.measure("router.LOGIN", h, _cycle(login))
+
+        # ---------- escrituras (router y persistencia) ----------
+        pairs = [p for p in (pair() for _ in range(MAX_OPS)) if p[0] != p[1]]
+        for t in ("ADD_FRIEND", "REMOVE_FRIEND"):
+            rec.measure(f"router.{t}", h, [({"type": t, "payload": {"a": a, "b": b}},) for a, b in pairs])
+
+        counter = itertools.count()
+
+        def register() -> tuple:
+            secure = crypto.encrypt_json({
+                "name": "Bench", "lastname": "User", "username": f"benchuser{next(counter)}", "password": PASSWORD,
+            })
+            return ({"type": "REGISTER", "secure": secure},)
+
+        rec.measure("router.REGISTER", h, _cycle(register), max_ops=50)
+        rec.measure("persist.graph_snapshot", router.graph.compact, _cycle(tuple), max_ops=5)
+    return rec.results
+
+
+# ---------- comparación ----------
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Imprime la comparación de p50 y retorna las claves que empeoraron más de threshold.
+    """
+    regressions = []
+    print(f"{'benchmark':<44} {'old_p50':>12} {'new_p50':>12} {'ratio':>7}")
+    for size, results in new["results"].items():
+        base = old["results"].get(size, {})
+        for name, r in results.items():
+            if name not in base:
+                continue
+            o, c = base[name]["p50_us"], r["p50_us"]
+            ratio = c / o if o else float("inf")
+            bad = ratio > 1 + threshold and c - o > MIN_DELTA_US
+            key = f"n={size}/{name}"
+            if bad:
+                regressions.append(key)
+            print(f"{key:<44} {o:>12.1f} {c:>12.1f} {ratio:>7.2f}{'  REGRESSION' if bad else ''}")
+    print(f"{len(regressions)} regression(s) (threshold {threshold:.0%})")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--m", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--budget", type=float, default=1.0, help="segundos máximos por benchmark")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline", help="resultados previos contra los que comparar")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="sólo comparar dos archivos")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(_load(args.compare[0]), _load(args.compare[1]), args.threshold) else 0
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    out: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "m": args.m,
+            "seed": args.seed,
+            "budget": args.budget,
+        },
+        "results": {},
+    }
+    for n in sizes:
+        print(f"[n={n}]", flush=True)
+        out["results"][str(n)] = bench_size(n, args.m, args.seed, args.budget)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2)
+    print(f"Resultados en {args.out}")
+
+    if args.baseline:
+        return 1 if compare(_load(args.baseline), out, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Generadores sintéticos reproducibles (con seed) para los benchmarks.
+"""
+import json
+import random
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+NAMES = [
+    "Julián", "Ana", "Sofía", "Mateo", "Valentina", "Santiago", "Camila", "Tomás", "Lucía", "Martín",
+    "Isabella", "Benjamín", "Emilia", "Joaquín", "Martina", "Nicolás", "Catalina", "Diego", "Paula", "Andrés",
+    "María", "José", "Daniela", "Gabriel", "Fernanda", "Sebastián", "Mariana", "Alejandro", "Ximena", "Felipe",
+]
+LASTNAMES = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez", "Flores", "Benítez", "Acosta", "Medina",
+    "Herrera", "Suárez", "Aguirre", "Giménez", "Gutiérrez", "Pereira", "Rojas", "Molina", "Castro", "Ortiz",
+    "Jiménez", "Vargas", "Mora", "Solís", "Chaves", "Quesada", "Vega", "Araya", "Campos", "Salazar",
+]
+
+
+def node_id(i: int) -> str:
+    return f"u{i:07d}"
+
+
+def synthetic_users(n: int, seed: int = 42, password_hash: str = "x") -> List[Dict[str, Any]]:
+    """
+    Usuarios con el formato de users.json: nombres y apellidos repetidos con
+    frecuencias desparejas (como en la realidad) y usernames únicos.
+    Todos comparten password_hash para no pagar el hash n veces.
+    """
+    rnd = random.Random(seed)
+    users = []
+    for i in range(n):
+        # Sesgo hacia el principio de cada lista: hay nombres mucho más comunes que otros
+        name = NAMES[min(int(rnd.expovariate(1 / 6)), len(NAMES) - 1)]
+        lastname = LASTNAMES[min(int(rnd.expovariate(1 / 8)), len(LASTNAMES) - 1)]
+        users.append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+            "name": name,
+            "lastname": lastname,
+            "username": f"{name[:3]}{lastname}{i}".lower(),
+            "password_hash": password_hash,
+            "photo_path": "",
+        })
+    return users
+
+
+def write_users(path: str, users: List[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(users, f, ensure_ascii=False)
+
+
+def write_graph(path: str, adj: Dict[str, Set[str]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({u: sorted(v) for u, v in adj.items()}, f)
+
+
+def scale_free_graph(n: int, m: int = 3, seed: int = 42, ids: Optional[Sequence[str]] = None) -> Dict[str, Set[str]]:
+    """
+    Grafo Barabási–Albert: cada nodo nuevo se conecta a m nodos existentes elegidos
+    con probabilidad proporcional a su grado (grados con cola pesada, como una red social).
+    ids: user_ids a usar como nodos (por defecto node_id(i)).
+    """
+    rnd = random.Random(seed)
+    ids = list(ids) if ids is not None else [node_id(i) for i in range(n)]
+    adj: Dict[str, Set[str]] = {u: set() for u in ids}
+    # Cada nodo aparece en repeated tantas veces como su grado
+    repeated: List[str] = []
+    core = min(n, m + 1)
+    for i in range(core):
+        for j in range(i + 1, core):
+            adj[ids[i]].add(ids[j])
+            adj[ids[j]].add(ids[i])
+            repeated += [ids[i], ids[j]]
+
+    for i in range(core, n):
+        u = ids[i]
+        targets: Set[str] = set()
+        while len(targets) < m:
+            targets.add(rnd.choice(repeated))
+        # Orden fijo: iterar el set depende del hash de los strings (varía entre procesos)
+        for v in sorted(targets):
+            adj[u].add(v)
+            adj[v].add(u)
+            repeated += [u, v]
+    return adj
+
+
+def random_pairs(adj: Dict[str, Set[str]], k: int, seed: int = 7) -> List[tuple]:
+    rnd = random.Random(seed)
+    ids = list(adj.keys())
+    return [(rnd.choice(ids), rnd.choice(ids)) for _ in range(k)]
+
+
+class MemoryGraphRepository:
+    """
+    Repositorio de grafo en memoria (mismo contrato que GraphRepository) para poder
+    montar un GraphService grande sin pasar por disco.
+    """
+
+    needs_compaction = False
+
+    def __init__(self, adj: Optional[Dict[str, Set[str]]] = None):
+        self._adj = adj or {}
+
+    def load(self) -> Dict[str, List[str]]:
+        return {k: list(v) for k, v in self._adj.items()}
+
+    def append(self, op: str, a: str, b: Optional[str] = None) -> None:
+        pass
+
+    def save(self, adj: Dict[str, List[str]]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -1,22 +1,89 @@
 import socket
-from typing import Dict, Any
-from shared.protocol import MessageProtocol
+from typing import Dict, Any, Iterator, List, Optional
+from shared.protocol import JSON, FrameBuffer, MessageProtocol
 
 class ApiClient:
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, encoding: str = JSON, timeout: float | None = None):
         self.host = host
         self.port = port
+        self.timeout = timeout  # segundos para connect y cada send/recv (None = sin límite)
         self.sock: socket.socket | None = None
+        # Codificación pedida; la efectiva (self.codec) sale del HELLO al conectar
+        self.encoding = encoding
+        self.codec = JSON
+        self._buf = FrameBuffer()
 
     def connect(self) -> None:
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
         self.sock.connect((self.host, self.port))
+        self.codec = JSON
+        if self.encoding != JSON:
+            self._negotiate()
+
+    def _negotiate(self) -> None:
+        MessageProtocol.send(self.sock, MessageProtocol.hello([self.encoding, JSON]))
+        resp = MessageProtocol.recv(self.sock, JSON, self._buf)
+        # Un server viejo responde "Unknown type": seguimos en json
+        if resp.get("status") == "ok":
+            self.codec = resp["data"].get("encoding", JSON)
 
     def request(self, msg: Dict[str, Any]) -> Dict[str, Any]:
         if not self.sock:
             raise RuntimeError("Not connected")
-        MessageProtocol.send(self.sock, msg)
-        return MessageProtocol.recv(self.sock)
+        MessageProtocol.send(self.sock, msg, self.codec)
+        return MessageProtocol.recv(self.sock, self.codec, self._buf)
+
+    def request_stream(self, msg: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Para respuestas en varios frames: entrega cada uno hasta el que trae more=False.
+        Hay que consumirlo entero antes de la próxima request.
+        """
+        if not self.sock:
+            raise RuntimeError("Not connected")
+        MessageProtocol.send(self.sock, msg, self.codec)
+        while True:
+            frame = MessageProtocol.recv(self.sock, self.codec, self._buf)
+            yield frame
+            if not frame.get("more"):
+                return
+
+    def friends_page(self, user_id: str, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"user_id": user_id, "limit": limit}
+        if cursor is not None:
+            payload["cursor"] = cursor
+        return self.request({"type": "FRIENDS_PAGE", "payload": payload})
+
+    def iter_friends(self, user_id: str, page_size: int = 100, stream: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Todos los amigos de user_id, página a página (o en un solo stream).
+        """
+        if stream:
+            msg = {"type": "FRIENDS_PAGE", "payload": {"user_id": user_id, "limit": page_size, "stream": True}}
+            for frame in self.request_stream(msg):
+                if frame.get("status") != "ok":
+                    raise RuntimeError(frame.get("error", "Request failed"))
+                yield from frame["data"]["friends"]
+            return
+
+        cursor = None
+        while True:
+            resp = self.friends_page(user_id, cursor, page_size)
+            if resp.get("status") != "ok":
+                raise RuntimeError(resp.get("error", "Request failed"))
+            yield from resp["data"]["friends"]
+            cursor = resp["data"]["next_cursor"]
+            if cursor is None:
+                return
+
+    def batch(self, requests: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """
+        Envía varias requests en un solo BATCH y retorna una respuesta por item, en orden.
+        """
+        resp = self.request({"type": "BATCH", "payload": {"requests": requests, "parallel": parallel}})
+        if resp.get("status") != "ok":
+            raise RuntimeError(resp.get("error", "Batch failed"))
+        return resp["data"]["results"]
 
     def close(self) -> None:
         if self.sock:
@@ -0,0 +1,203 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from shared.config import FERNET_KEY
+from shared.crypto import CryptoService
+from shared.protocol import MessageProtocol
+
+
+class AsyncApiClient:
+    """
+    Cliente asyncio del protocolo SocialTec (mismo framing que ApiClient).
+
+    Soporta pipelining: varias requests en vuelo comparten la conexión y cada
+    respuesta se asocia a su request por "id" (el server lo devuelve tal cual).
+    Si el server no devuelve ids, se asume orden FIFO.
+    Las respuestas en varios frames (stream) se leen con stream().
+    """
+
+    def __init__(self, host: str, port: int, crypto: Optional[CryptoService] = None):
+        self.host = host
+        self.port = port
+        self.crypto = crypto or CryptoService(FERNET_KEY)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        # id -> Future (una respuesta) o Queue (stream: frames hasta more=False)
+        self._pending: "OrderedDict[int, Union[asyncio.Future, asyncio.Queue]]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._write_lock = asyncio.Lock()
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._writer = None
+        if self._read_task:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        self._fail_pending(ConnectionError("Client closed"))
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def request(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._writer:
+            raise RuntimeError("Not connected")
+        if self._read_task is None or self._read_task.done():
+            raise ConnectionError("Disconnected")
+        req_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        try:
+            async with self._write_lock:
+                await MessageProtocol.send_async(self._writer, dict(msg, id=req_id))
+        except BaseException:
+            self._pending.pop(req_id, None)
+            raise
+        return await fut
+
+    async def stream(self, msg: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Envía msg (con "stream": true en el payload) y entrega cada frame de la respuesta.
+        """
+        if not self._writer:
+            raise RuntimeError("Not connected")
+        if self._read_task is None or self._read_task.done():
+            raise ConnectionError("Disconnected")
+        req_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending[req_id] = queue
+        try:
+            async with self._write_lock:
+                await MessageProtocol.send_async(self._writer, dict(msg, id=req_id))
+        except BaseException:
+            self._pending.pop(req_id, None)
+            raise
+        while True:
+            frame = await queue.get()
+            if isinstance(frame, BaseException):
+                raise frame
+            yield frame
+            if not frame.get("more"):
+                return
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                resp = await MessageProtocol.recv_async(self._reader)
+                req_id = resp.pop("id", None)
+                queue = self._pending.get(req_id)
+                if isinstance(queue, asyncio.Queue):
+                    queue.put_nowait(resp)
+                    if not resp.get("more"):
+                        del self._pending[req_id]
+                    continue
+                fut = self._pending.pop(req_id, None)
+                if fut is None and self._pending:
+                    # Server sin correlation ids: respuestas en orden
+                    _, fut = self._pending.popitem(last=False)
+                if fut is not None and not fut.done():
+                    fut.set_result(resp)
+        except (ConnectionError, OSError) as e:
+            self._fail_pending(e)
+        except Exception as e:
+            # Frame inválido: el stream quedó desincronizado, no se puede seguir leyendo
+            self._fail_pending(ConnectionError(f"Invalid frame from server: {e}"))
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        while self._pending:
+            _, fut = self._pending.popitem(last=False)
+            if isinstance(fut, asyncio.Queue):
+                fut.put_nowait(exc)
+            elif not fut.done():
+                fut.set_exception(exc)
+
+    # ---------- helpers (mismas operaciones que client/main.py) ----------
+    async def register(self, name: str, lastname: str, username: str, password: str) -> Dict[str, Any]:
+        data = {"name": name, "lastname": lastname, "username": username, "password": password}
+        return await self.request({"type": "REGISTER", "secure": self.crypto.encrypt_json(data)})
+
+    async def login(self, username: str, password: str) -> Dict[str, Any]:
+        data = {"username": username, "password": password}
+        return await self.request({"type": "LOGIN", "secure": self.crypto.encrypt_json(data)})
+
+    async def search_user(self, query: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"query": query}
+        if limit is not None:
+            payload["limit"] = limit
+        if cursor is not None:
+            payload["cursor"] = cursor
+        return await self.request({"type": "SEARCH_USER", "payload": payload})
+
+    async def add_friend(self, a: str, b: str) -> Dict[str, Any]:
+        return await self.request({"type": "ADD_FRIEND", "payload": {"a": a, "b": b}})
+
+    async def remove_friend(self, a: str, b: str) -> Dict[str, Any]:
+        return await self.request({"type": "REMOVE_FRIEND", "payload": {"a": a, "b": b}})
+
+    async def get_profile(self, user_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"user_id": user_id}
+        if fields:
+            payload["fields"] = fields
+        return await self.request({"type": "GET_MY_PROFILE", "payload": payload})
+
+    async def friends_page(self, user_id: str, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"user_id": user_id, "limit": limit}
+        if cursor is not None:
+            payload["cursor"] = cursor
+        return await self.request({"type": "FRIENDS_PAGE", "payload": payload})
+
+    async def mutual_friends(self, a: str, b: str) -> Dict[str, Any]:
+        return await self.request({"type": "MUTUAL_FRIENDS", "payload": {"a": a, "b": b}})
+
+    async def recommend(self, user_id: str, k: int = 10, method: str = "adamic_adar") -> Dict[str, Any]:
+        return await self.request({"type": "RECOMMEND", "payload": {"user_id": user_id, "k": k, "method": method}})
+
+    async def path_between(self, src: str, dst: str) -> Dict[str, Any]:
+        return await self.request({"type": "PATH_BETWEEN", "payload": {"src": src, "dst": dst}})
+
+    async def distance_estimate(self, a: str, b: str, exact: bool = False) -> Dict[str, Any]:
+        return await self.request({"type": "DISTANCE_ESTIMATE", "payload": {"a": a, "b": b, "exact": exact}})
+
+    async def graph_stats(self) -> Dict[str, Any]:
+        return await self.request({"type": "GRAPH_STATS"})
+
+    async def cache_stats(self) -> Dict[str, Any]:
+        return await self.request({"type": "CACHE_STATS"})
+
+    async def profile(self, action: str = "status", **options: Any) -> Dict[str, Any]:
+        # options (start): requests, seconds, types, mode
+        return await self.request({"type": "PROFILE", "payload": dict(options, action=action)})
+
+    async def metrics(self, prometheus: bool = False) -> Dict[str, Any]:
+        payload = {"format": "prometheus"} if prometheus else {}
+        return await self.request({"type": "METRICS", "payload": payload})
+
+    async def batch(self, requests: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        resp = await self.request({"type": "BATCH", "payload": {"requests": requests, "parallel": parallel}})
+        if resp.get("status") != "ok":
+            raise RuntimeError(resp.get("error", "Batch failed"))
+        return resp["data"]["results"]
@@ -0,0 +1,229 @@
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from client.net.api_client import ApiClient
+from shared.protocol import JSON
+
+# Tipos que se pueden reenviar sin riesgo si la conexión se cae a mitad de camino.
+# REGISTER y BATCH no: podrían aplicarse dos veces.
+IDEMPOTENT_TYPES = frozenset({
+    "PING", "LOGIN", "SEARCH_USER", "GET_MY_PROFILE", "FRIENDS_PAGE", "MUTUAL_FRIENDS",
+    "RECOMMEND", "PATH_BETWEEN", "DISTANCE_ESTIMATE", "GRAPH_STATS", "CACHE_STATS",
+    "METRICS", "ADD_FRIEND", "REMOVE_FRIEND",
+})
+
+
+class PoolTimeout(TimeoutError):
+    pass
+
+
+class ApiClientPool:
+    """
+    Pool thread-safe de ApiClient hacia un mismo server.
+
+    - Entre min_size y max_size conexiones; si están todas en uso, request() espera.
+    - Conexiones ociosas por más de health_check_interval se validan con PING al tomarlas.
+    - Errores de conexión: se descarta el socket, se reconecta y, si el tipo es
+      idempotente, se reintenta (hasta retries veces) dentro del deadline.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        min_size: int = 1,
+        max_size: int = 8,
+        timeout: float = 5.0,
+        retries: int = 2,
+        health_check_interval: float = 30.0,
+        encoding: str = JSON,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size")
+        self.host = host
+        self.port = port
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.retries = retries
+        self.health_check_interval = health_check_interval
+        self.encoding = encoding
+
+        self._cond = threading.Condition()
+        self._idle: Deque[Tuple[ApiClient, float]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Métricas para dimensionar el pool
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._reconnects = 0
+        self._retries_done = 0
+
+        for _ in range(min_size):
+            c = self._new_client()
+            with self._cond:
+                self._size += 1
+                self._idle.append((c, time.monotonic()))
+
+    # ---------- conexiones ----------
+    def _new_client(self) -> ApiClient:
+        c = ApiClient(self.host, self.port, encoding=self.encoding, timeout=self.timeout)
+        c.connect()
+        return c
+
+    def _healthy(self, c: ApiClient) -> bool:
+        try:
+            return c.request({"type": "PING"}).get("status") == "ok"
+        except (OSError, ConnectionError):
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> ApiClient:
+        t0 = time.monotonic()
+        deadline = None if timeout is None else t0 + timeout
+        create = False
+        client: Optional[ApiClient] = None
+        idle_since = 0.0
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool closed")
+                if self._idle:
+                    client, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    create = True
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout("Timed out waiting for a connection")
+                self._cond.wait(remaining)
+            self._in_use += 1
+            waited = time.monotonic() - t0
+            self._waits += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if create:
+                return self._new_client()
+            if time.monotonic() - idle_since > self.health_check_interval and not self._healthy(client):
+                client.close()
+                client = self._new_client()
+                with self._cond:
+                    self._reconnects += 1
+            return client
+        except BaseException:
+            # No pudimos entregar una conexión: liberamos el cupo
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, client: ApiClient, broken: bool = False) -> None:
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed:
+                client.close()
+                self._size -= 1
+            else:
+                self._idle.append((client, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[ApiClient]:
+        c = self.acquire(timeout)
+        broken = False
+        try:
+            yield c
+        except (OSError, ConnectionError):
+            broken = True
+            raise
+        finally:
+            self.release(c, broken=broken)
+
+    # ---------- requests ----------
+    def request(self, msg: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        deadline: segundos totales para esta request (espera en el pool + reintentos incluidos).
+        """
+        end = None if deadline is None else time.monotonic() + deadline
+        retryable = msg.get("type") in IDEMPOTENT_TYPES
+        attempt = 0
+
+        while True:
+            remaining = None if end is None else end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise PoolTimeout("Request deadline exceeded")
+
+            try:
+                client = self.acquire(remaining)
+            except PoolTimeout:
+                raise
+            except (OSError, ConnectionError):
+                # No se pudo (re)conectar
+                if not retryable or attempt >= self.retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self._retries_done += 1
+                continue
+
+            try:
+                if remaining is not None and client.sock is not None:
+                    client.sock.settimeout(min(self.timeout, remaining) if self.timeout else remaining)
+                resp = client.request(msg)
+                if remaining is not None and client.sock is not None:
+                    client.sock.settimeout(self.timeout)
+            except socket.timeout:
+                # La respuesta podría llegar tarde: el socket ya no es confiable
+                self.release(client, broken=True)
+                raise PoolTimeout("Request timed out")
+            except (OSError, ConnectionError):
+                self.release(client, broken=True)
+                if not retryable or attempt >= self.retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self._retries_done += 1
+                    self._reconnects += 1
+                continue
+            except BaseException:
+                # Frame inválido, KeyboardInterrupt...: el stream puede haber quedado a mitad
+                self.release(client, broken=True)
+                raise
+            self.release(client)
+            return resp
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+                "acquires": self._waits,
+                "wait_time_total": self._wait_total,
+                "wait_time_avg": self._wait_total / self._waits if self._waits else 0.0,
+                "wait_time_max": self._wait_max,
+                "reconnects": self._reconnects,
+                "retries": self._retries_done,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                c, _ = self._idle.pop()
+                c.close()
+                self._size -= 1
+            self._cond.notify_all()
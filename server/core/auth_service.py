@@ -1,5 +1,6 @@
 from typing import Dict, Any
 from passlib.hash import pbkdf2_sha256
+from shared import tracing
 from server.core.user_repo import UserRepository
 
 class AuthService:
@@ -7,7 +8,8 @@ class AuthService:
         self.repo = repo
 
     def register(self, name: str, lastname: str, username: str, password: str) -> Dict[str, Any]:
-        password_hash = pbkdf2_sha256.hash(password)
+        with tracing.span("pbkdf2"):
+            password_hash = pbkdf2_sha256.hash(password)
         user = self.repo.create_user(name, lastname, username, password_hash)
         return {"id": user["id"], "name": user["name"], "lastname": user["lastname"], "username": user["username"]}
 
@@ -15,6 +17,8 @@ class AuthService:
         user = self.repo.find_by_username(username)
         if not user:
             raise ValueError("Invalid credentials")
-        if not pbkdf2_sha256.verify(password, user["password_hash"]):
+        with tracing.span("pbkdf2"):
+            valid = pbkdf2_sha256.verify(password, user["password_hash"])
+        if not valid:
             raise ValueError("Invalid credentials")
         return {"id": user["id"], "name": user["name"], "lastname": user["lastname"], "username": user["username"]}
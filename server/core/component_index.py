@@ -0,0 +1,231 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class UnionFind:
+    """
+    Union-find con unión por tamaño y compresión por halving: O(α(n)) amortizado.
+    """
+
+    __slots__ = ("_parent", "_size", "_hist", "count")
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        # Sólo las raíces tienen entrada
+        self._size: Dict[str, int] = {}
+        # tamaño -> cantidad de componentes, al día en cada add/union
+        self._hist: Dict[int, int] = {}
+        self.count = 0
+
+    @classmethod
+    def from_adjacency(cls, adj: Mapping[str, Iterable[str]]) -> "UnionFind":
+        uf = cls()
+        for u in adj:
+            uf.add(u)
+        for u, friends in adj.items():
+            for v in friends:
+                if u < v:
+                    uf.union(u, v)
+        return uf
+
+    def add(self, u: str) -> None:
+        if u not in self._parent:
+            self._parent[u] = u
+            self._size[u] = 1
+            self._hist[1] = self._hist.get(1, 0) + 1
+            self.count += 1
+
+    def find(self, u: str) -> str:
+        parent = self._parent
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        return u
+
+    def union(self, a: str, b: str) -> None:
+        self.add(a)
+        self.add(b)
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self._size[ra] < self._size[rb]:
+            ra, rb = rb, ra
+        sa, sb = self._size[ra], self._size.pop(rb)
+        self._parent[rb] = ra
+        self._size[ra] = sa + sb
+        self._drop(sa)
+        self._drop(sb)
+        self._hist[sa + sb] = self._hist.get(sa + sb, 0) + 1
+        self.count -= 1
+
+    def _drop(self, size: int) -> None:
+        n = self._hist[size] - 1
+        if n:
+            self._hist[size] = n
+        else:
+            del self._hist[size]
+
+    def connected(self, a: str, b: str) -> bool:
+        if a not in self._parent or b not in self._parent:
+            return a == b
+        return self.find(a) == self.find(b)
+
+    def size_histogram(self) -> Dict[int, int]:
+        # O(tamaños distintos), que son a lo sumo O(sqrt(n))
+        return dict(sorted(self._hist.items()))
+
+    def largest(self) -> int:
+        return max(self._hist) if self._hist else 0
+
+
+class ComponentIndex:
+    """
+    Componentes conexas del grafo, mantenidas por GraphService.
+
+    - Agregar nodos/aristas actualiza el union-find en O(α(n)).
+    - Quitar una arista puede partir una componente: el índice queda "sucio" y una
+      thread de fondo lo reconstruye desde el snapshot vigente (sin el lock de
+      escritura), con debounce: cuando las bajas llevan `quiet` segundos quietas, o
+      a los `interval` segundos si no paran, y nunca más de una vez por `interval`.
+      Las altas publicadas mientras tanto se repiten sobre el union-find nuevo; si
+      hubo otra baja, se instala igual (más fresco) y sigue sucio.
+    - Las consultas nunca reconstruyen ni esperan: connected() responde None (el
+      llamador recorre el grafo) y summary() devuelve los últimos números con
+      "components_stale": True.
+    """
+
+    def __init__(self, uf: UnionFind, version: int, current: Callable[[], Any], quiet: float = 0.5, interval: float = 5.0):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._uf = uf
+        self._version = version
+        # Snapshot vigente del grafo (GraphService.current)
+        self._current = current
+        self.quiet = quiet
+        self.interval = interval
+        self._dirty = False
+        # Versión de la última baja de arista: el índice sigue siendo válido
+        # para snapshots posteriores (sólo hubo altas desde entonces)
+        self._removed_at = 0
+        # Cambios publicados después del snapshot del union-find: (versión, op, nodos)
+        self._pending: List[Tuple[int, str, Tuple[str, ...]]] = []
+        # time.monotonic() de la primera y la última baja sin reconstruir, y del último rebuild
+        self._dirty_since = 0.0
+        self._last_remove = 0.0
+        self._last_rebuild = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self.rebuilds = 0
+
+    @classmethod
+    def from_snapshot(cls, snap, current: Callable[[], Any], quiet: float = 0.5, interval: float = 5.0) -> "ComponentIndex":
+        return cls(UnionFind.from_adjacency(snap), snap.version, current, quiet, interval)
+
+    @staticmethod
+    def _apply_to(uf: UnionFind, op: str, nodes: Tuple[str, ...]) -> None:
+        if op == "add":
+            a, b = nodes
+            uf.union(a, b)
+        else:
+            for u in nodes:
+                uf.add(u)
+
+    def apply(self, version: int, op: str, nodes: Iterable[str]) -> None:
+        # Se llama con el lock de escritura de GraphService tomado
+        nodes = tuple(nodes)
+        with self._lock:
+            self._version = version
+            if op == "remove":
+                now = time.monotonic()
+                if not self._dirty:
+                    self._dirty = True
+                    self._dirty_since = now
+                self._last_remove = now
+                self._removed_at = version
+                self._changed.notify()
+            elif not self._dirty:
+                self._apply_to(self._uf, op, nodes)
+                return
+            self._pending.append((version, op, nodes))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rebuild_loop, name="component-index", daemon=True)
+                self._thread.start()
+
+    def _due(self) -> float:
+        # Con self._lock tomado y el índice sucio: cuándo toca reconstruir
+        settle = min(self._last_remove + self.quiet, self._dirty_since + self.interval)
+        return max(settle, self._last_rebuild + self.interval)
+
+    def _rebuild_loop(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._dirty:
+                        self._changed.wait()
+                        continue
+                    left = self._due() - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._changed.wait(left)
+            try:
+                self.rebuild(self._current())
+            except Exception as e:
+                print(f"[COMPONENTS] Rebuild failed: {e}")
+                with self._lock:
+                    self._last_rebuild = time.monotonic()
+
+    def rebuild(self, snap) -> bool:
+        """
+        Reconstruye desde snap y lo instala. Retorna True si el índice quedó al día
+        (no hubo bajas posteriores a snap).
+        """
+        uf = UnionFind.from_adjacency(snap)
+        with self._lock:
+            later = [p for p in self._pending if p[0] > snap.version]
+            removes = [p for p in later if p[1] == "remove"]
+            # Hasta la primera baja posterior el union-find nuevo se puede poner al día
+            upto = removes[0][0] if removes else None
+            for version, op, nodes in later:
+                if upto is not None and version >= upto:
+                    break
+                self._apply_to(uf, op, nodes)
+            self._uf = uf
+            self._last_rebuild = time.monotonic()
+            self.rebuilds += 1
+            if removes:
+                self._pending = [p for p in later if p[0] >= upto]
+                self._dirty_since = self._last_rebuild
+                return False
+            self._dirty = False
+            self._pending = []
+            return True
+
+    def connected(self, a: str, b: str, snap) -> Optional[bool]:
+        """
+        ¿a y b están en la misma componente en snap? False es definitivo;
+        None si no se puede responder sin recorrer el grafo.
+        """
+        with self._lock:
+            # snap más nuevo que el índice: GraphService publica el snapshot antes de apply()
+            if self._dirty or snap.version < self._removed_at or snap.version > self._version:
+                return None
+            # Sin bajas desde snap: separados ahora implica separados en snap
+            if not self._uf.connected(a, b):
+                return False
+            # Unidos ahora, pero quizás por una arista posterior a snap
+            return True if self._version == snap.version else None
+
+    def summary(self, snap) -> Dict[str, Any]:
+        """
+        Cantidad de componentes y distribución de tamaños (tamaño -> cantidad), sin
+        esperar: con el índice sucio son los de la última versión reconstruida.
+        Con el índice al día corresponde a la versión vigente, que puede ser
+        posterior a snap si hubo escrituras en el medio.
+        """
+        with self._lock:
+            return {
+                "components": self._uf.count,
+                "largest_component": self._uf.largest(),
+                "component_sizes": self._uf.size_histogram(),
+                "components_stale": self._dirty,
+            }
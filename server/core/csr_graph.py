@@ -0,0 +1,250 @@
+import bisect
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+
+class CsrGraph:
+    """
+    Grafo no dirigido compacto para grafos grandes.
+
+    - Los user_ids se internan a enteros densos (0..n-1).
+    - La adyacencia base está en formato CSR: offsets (int64) y targets (int32);
+      los vecinos de i son targets[offsets[i]:offsets[i+1]], ordenados.
+    - Las mutaciones van a un overlay chico (added/removed por nodo) que se
+      compacta en un CSR nuevo cuando crece más de compact_ratio de la base.
+
+    Cada arista ocupa 2 x 4 bytes en la base, contra cientos de bytes en dict de sets.
+    """
+
+    def __init__(self, compact_ratio: float = 0.1):
+        self.compact_ratio = compact_ratio
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.offsets = array("q", [0])
+        self.targets = array("i")
+        self._tview = memoryview(self.targets)
+        self._added: Dict[int, Set[int]] = {}
+        self._removed: Dict[int, Set[int]] = {}
+        self._delta = 0
+        self._edges = 0
+
+    @classmethod
+    def from_adjacency(cls, adj: Mapping[str, Iterable[str]], compact_ratio: float = 0.1) -> "CsrGraph":
+        g = cls(compact_ratio)
+        keys = list(adj)
+        for u in keys:
+            g.intern(u)
+        rows: List[Set[int]] = [set() for _ in keys]
+        for u in keys:
+            iu = g.index[u]
+            for v in adj[u]:
+                iv = g.intern(v)
+                if iv == iu:
+                    continue
+                # Vecinos que no eran claves de adj se internan al final: fila propia vacía
+                if iv >= len(rows):
+                    rows.extend(set() for _ in range(iv + 1 - len(rows)))
+                # Se agregan ambos sentidos: una adyacencia asimétrica queda no dirigida
+                rows[iu].add(iv)
+                rows[iv].add(iu)
+        g._load_rows([sorted(r) for r in rows])
+        return g
+
+    def _load_rows(self, rows: List[List[int]]) -> None:
+        offsets = array("q", [0]) * (len(rows) + 1)
+        targets = array("i")
+        total = 0
+        for i, row in enumerate(rows):
+            targets.extend(row)
+            total += len(row)
+            offsets[i + 1] = total
+        self.offsets = offsets
+        self.targets = targets
+        self._tview = memoryview(targets)
+        self._added.clear()
+        self._removed.clear()
+        self._delta = 0
+        self._edges = total // 2
+
+    # ---------- nodos ----------
+    def intern(self, u: str) -> int:
+        i = self.index.get(u)
+        if i is None:
+            i = len(self.ids)
+            self.ids.append(u)
+            self.index[u] = i
+        return i
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, u: object) -> bool:
+        return u in self.index
+
+    @property
+    def edge_count(self) -> int:
+        return self._edges
+
+    # ---------- adyacencia ----------
+    def _base(self, i: int):
+        if i + 1 >= len(self.offsets):
+            return ()
+        return self._tview[self.offsets[i]:self.offsets[i + 1]]
+
+    def _base_has(self, i: int, j: int) -> bool:
+        if i + 1 >= len(self.offsets):
+            return False
+        hi = self.offsets[i + 1]
+        k = bisect.bisect_left(self.targets, j, self.offsets[i], hi)
+        return k < hi and self.targets[k] == j
+
+    def neighbors_idx(self, i: int) -> Iterator[int]:
+        removed = self._removed.get(i)
+        if removed:
+            for j in self._base(i):
+                if j not in removed:
+                    yield j
+        else:
+            yield from self._base(i)
+        added = self._added.get(i)
+        if added:
+            yield from added
+
+    def _degree(self, i: int) -> int:
+        base = len(self._base(i))
+        return base - len(self._removed.get(i, ())) + len(self._added.get(i, ()))
+
+    def has_edge(self, a: str, b: str) -> bool:
+        i = self.index.get(a)
+        j = self.index.get(b)
+        if i is None or j is None:
+            return False
+        return self._has(i, j)
+
+    def _has(self, i: int, j: int) -> bool:
+        if j in self._added.get(i, ()):
+            return True
+        return self._base_has(i, j) and j not in self._removed.get(i, ())
+
+    def neighbors(self, u: str) -> List[str]:
+        i = self.index.get(u)
+        if i is None:
+            return []
+        ids = self.ids
+        return sorted(ids[j] for j in self.neighbors_idx(i))
+
+    def degree(self, u: str) -> int:
+        i = self.index.get(u)
+        return 0 if i is None else self._degree(i)
+
+    # ---------- mutaciones (overlay) ----------
+    def add_node(self, u: str) -> None:
+        self.intern(u)
+
+    def add_edge(self, a: str, b: str) -> None:
+        if a == b:
+            raise ValueError("Cannot friend yourself")
+        i, j = self.intern(a), self.intern(b)
+        if self._has(i, j):
+            return
+        for x, y in ((i, j), (j, i)):
+            removed = self._removed.get(x)
+            if removed and y in removed:
+                removed.discard(y)
+            else:
+                self._added.setdefault(x, set()).add(y)
+        self._edges += 1
+        self._bump()
+
+    def remove_edge(self, a: str, b: str) -> None:
+        i = self.index.get(a)
+        j = self.index.get(b)
+        if i is None or j is None or not self._has(i, j):
+            return
+        for x, y in ((i, j), (j, i)):
+            added = self._added.get(x)
+            if added and y in added:
+                added.discard(y)
+            else:
+                self._removed.setdefault(x, set()).add(y)
+        self._edges -= 1
+        self._bump()
+
+    def _bump(self) -> None:
+        self._delta += 1
+        if self._delta > max(64, self.compact_ratio * len(self.targets) / 2):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Vuelca el overlay en un CSR nuevo: O(V + E).
+        """
+        rows = [sorted(self.neighbors_idx(i)) for i in range(len(self.ids))]
+        self._load_rows(rows)
+
+    # ---------- consultas ----------
+    def bfs_path(self, src: str, dst: str, max_depth: Optional[int] = None) -> List[str]:
+        """
+        Camino más corto (BFS bidireccional sobre enteros). [] si no hay camino.
+        """
+        if src == dst:
+            return [src]
+        s = self.index.get(src)
+        t = self.index.get(dst)
+        if s is None or t is None:
+            return []
+
+        parent_s: Dict[int, int] = {s: -1}
+        parent_t: Dict[int, int] = {t: -1}
+        front_s = [s]
+        front_t = [t]
+        depth = 0
+        while front_s and front_t:
+            if max_depth is not None and depth >= max_depth:
+                return []
+            if len(front_s) <= len(front_t):
+                front_s, meet = self._expand(front_s, parent_s, parent_t)
+            else:
+                front_t, meet = self._expand(front_t, parent_t, parent_s)
+            depth += 1
+            if meet is not None:
+                return self._join(parent_s, parent_t, meet)
+        return []
+
+    def _expand(self, frontier: List[int], own: Dict[int, int], other: Dict[int, int]) -> Tuple[List[int], Optional[int]]:
+        nxt: List[int] = []
+        for u in frontier:
+            for v in self.neighbors_idx(u):
+                if v in own:
+                    continue
+                own[v] = u
+                if v in other:
+                    return nxt, v
+                nxt.append(v)
+        return nxt, None
+
+    def _join(self, parent_s: Dict[int, int], parent_t: Dict[int, int], meet: int) -> List[str]:
+        left: List[int] = []
+        cur = meet
+        while cur != -1:
+            left.append(cur)
+            cur = parent_s[cur]
+        left.reverse()
+        cur = parent_t[meet]
+        while cur != -1:
+            left.append(cur)
+            cur = parent_t[cur]
+        return [self.ids[i] for i in left]
+
+    def memory_bytes(self) -> int:
+        """
+        Bytes de las estructuras propias (arrays, índice, overlay); no cuenta los strings
+        de los ids, que se comparten con el resto del server.
+        """
+        total = self.offsets.buffer_info()[1] * self.offsets.itemsize
+        total += self.targets.buffer_info()[1] * self.targets.itemsize
+        total += sys.getsizeof(self.ids) + sys.getsizeof(self.index)
+        for d in (self._added, self._removed):
+            total += sys.getsizeof(d) + sum(sys.getsizeof(v) for v in d.values())
+        return total
@@ -0,0 +1,115 @@
+import math
+from typing import Any, Dict, List, Optional
+
+
+class DegreeIndex:
+    """
+    Grados por nodo agrupados en buckets (grado -> nodos), mantenidos en cada mutación.
+
+    Como cada cambio mueve un nodo entre buckets vecinos (grado ±1) o cambia pocos
+    grados, max/min se actualizan en O(1); nodos, aristas y suma de grados también.
+    El histograma y los percentiles cuestan O(grados distintos).
+    """
+
+    def __init__(self):
+        # Dict como set ordenado: el primero en llegar a un grado es el representante
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._nodes = 0
+        self._deg_sum = 0
+        self._max: Optional[int] = None
+        self._min: Optional[int] = None
+
+    @classmethod
+    def from_degrees(cls, degrees) -> "DegreeIndex":
+        idx = cls()
+        for u, d in degrees:
+            idx.add_node(u, d)
+        return idx
+
+    def add_node(self, u: str, degree: int = 0) -> None:
+        self._buckets.setdefault(degree, {})[u] = None
+        self._nodes += 1
+        self._deg_sum += degree
+        self._max = degree if self._max is None else max(self._max, degree)
+        self._min = degree if self._min is None else min(self._min, degree)
+
+    def change(self, u: str, old: int, new: int) -> None:
+        if old == new:
+            return
+        bucket = self._buckets[old]
+        del bucket[u]
+        if not bucket:
+            del self._buckets[old]
+        self._buckets.setdefault(new, {})[u] = None
+        self._deg_sum += new - old
+
+        if new > self._max:
+            self._max = new
+        elif old == self._max and old not in self._buckets:
+            self._max = self._scan(old, -1)
+        if new < self._min:
+            self._min = new
+        elif old == self._min and old not in self._buckets:
+            self._min = self._scan(old, +1)
+
+    def _scan(self, start: int, step: int) -> int:
+        # Con cambios de ±1 esto termina en un paso; con saltos mayores, recorre hasta encontrar
+        d = start + step
+        while d not in self._buckets:
+            d += step
+        return d
+
+    # ---------- lecturas ----------
+    @property
+    def nodes(self) -> int:
+        return self._nodes
+
+    @property
+    def edges(self) -> int:
+        return self._deg_sum // 2
+
+    def summary(self) -> Dict[str, Any]:
+        if not self._nodes:
+            return {
+                "max_user_id": None,
+                "max_friends": 0,
+                "min_user_id": None,
+                "min_friends": 0,
+                "avg_friends": 0.0,
+                "nodes": 0,
+                "edges": 0,
+                "isolated_users": 0,
+            }
+        return {
+            "max_user_id": next(iter(self._buckets[self._max])),
+            "max_friends": self._max,
+            "min_user_id": next(iter(self._buckets[self._min])),
+            "min_friends": self._min,
+            "avg_friends": self._deg_sum / self._nodes,
+            "nodes": self._nodes,
+            "edges": self.edges,
+            "isolated_users": len(self._buckets.get(0, ())),
+        }
+
+    def histogram(self) -> Dict[int, int]:
+        return {d: len(b) for d, b in sorted(self._buckets.items())}
+
+    def percentiles(self, ps: List[float]) -> Dict[str, int]:
+        """
+        Percentiles de grado (nearest-rank) sobre el histograma.
+        """
+        hist = sorted((d, len(b)) for d, b in self._buckets.items())
+        out: Dict[str, int] = {}
+        for p in ps:
+            name = f"p{p:g}"
+            if not self._nodes:
+                out[name] = 0
+                continue
+            rank = max(1, math.ceil(p * self._nodes / 100))
+            acc = 0
+            for d, c in hist:
+                acc += c
+                if acc >= rank:
+                    out[name] = d
+                    break
+        return out
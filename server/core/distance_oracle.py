@@ -0,0 +1,169 @@
+import heapq
+import threading
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from server.core.csr_graph import CsrGraph
+from server.core.graph_service import GraphService
+from server.core.path_service import PathService
+
+UNREACHABLE = 0xFFFF
+
+
+class _Tables(NamedTuple):
+    version: int
+    index: Dict[str, int]
+    landmarks: List[str]
+    # Una tabla de distancias por landmark, indexada por el entero de cada user_id
+    dists: List[array]
+
+
+def _bfs_distances(csr: CsrGraph, src: int) -> array:
+    dist = array("H", [UNREACHABLE]) * len(csr)
+    dist[src] = 0
+    offsets, targets = csr.offsets, csr.targets
+    frontier = [src]
+    d = 0
+    while frontier:
+        d += 1
+        nxt = []
+        for u in frontier:
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if dist[v] == UNREACHABLE:
+                    dist[v] = d
+                    nxt.append(v)
+        frontier = nxt
+    return dist
+
+
+class DistanceOracle:
+    """
+    Estimación de grados de separación con landmarks.
+
+    Se eligen los `landmarks` usuarios de mayor grado y se guarda la distancia BFS de
+    cada uno a todos los nodos (2 bytes por nodo y landmark, sobre un CsrGraph).
+    Por desigualdad triangular, para cada landmark l:
+        |d(l,a) - d(l,b)| <= d(a,b) <= d(l,a) + d(l,b)
+    así que la consulta cuesta O(landmarks). Las tablas corresponden a una versión
+    del grafo; una thread en segundo plano las recalcula cuando el grafo cambia.
+    """
+
+    def __init__(self, graph: GraphService, path: PathService, landmarks: int = 16, refresh_interval: float = 60.0):
+        self.graph = graph
+        self.path = path
+        self.landmarks = landmarks
+        self.refresh_interval = refresh_interval
+        self._tables: Optional[_Tables] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- tablas ----------
+    def refresh(self) -> bool:
+        """
+        Recalcula las tablas desde la versión vigente. False si ya estaban al día.
+        """
+        with self._refresh_lock:
+            snap = self.graph.current()
+            if self._tables is not None and self._tables.version == snap.version:
+                return False
+            csr = CsrGraph.from_adjacency(snap)
+            offsets = csr.offsets
+            chosen = heapq.nlargest(self.landmarks, range(len(csr)), key=lambda i: offsets[i + 1] - offsets[i])
+            dists = [_bfs_distances(csr, i) for i in chosen]
+            # Un solo reemplazo de referencia: los lectores ven tablas viejas o nuevas, nunca mezcla
+            self._tables = _Tables(snap.version, csr.index, [csr.ids[i] for i in chosen], dists)
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="distance-oracle", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[ORACLE] Refresh failed: {e}")
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    # ---------- consultas ----------
+    def bounds(self, a: str, b: str) -> Optional[Dict[str, Any]]:
+        """
+        {"lower", "upper", "connected"} según las tablas, o None si no hay tablas
+        o alguno de los dos usuarios es posterior a ellas.
+        connected es None si ningún landmark alcanza a ambos.
+        """
+        return self._bounds(self._tables, a, b)
+
+    @staticmethod
+    def _bounds(t: Optional[_Tables], a: str, b: str) -> Optional[Dict[str, Any]]:
+        if t is None:
+            return None
+        ia = t.index.get(a)
+        ib = t.index.get(b)
+        if ia is None or ib is None:
+            return None
+        if ia == ib:
+            return {"lower": 0, "upper": 0, "connected": True}
+
+        lower = 0
+        upper: Optional[int] = None
+        for dist in t.dists:
+            da, db = dist[ia], dist[ib]
+            if da == UNREACHABLE and db == UNREACHABLE:
+                continue
+            if da == UNREACHABLE or db == UNREACHABLE:
+                # Un landmark alcanza a uno solo: están en componentes distintas
+                return {"lower": None, "upper": None, "connected": False}
+            lower = max(lower, abs(da - db))
+            upper = da + db if upper is None else min(upper, da + db)
+        return {"lower": lower, "upper": upper, "connected": True if upper is not None else None}
+
+    def estimate(self, a: str, b: str, exact: bool = False) -> Dict[str, Any]:
+        """
+        Cotas de d(a, b) y, con exact=True (o sin tablas utilizables), la distancia
+        exacta por BFS. distance es None si no hay camino.
+        """
+        t = self._tables
+        out = self._bounds(t, a, b)
+        if out is not None and not exact:
+            out["distance"] = out["lower"] if out["lower"] == out["upper"] else None
+            out["method"] = "landmarks"
+            out["version"] = t.version
+            out["stale"] = t.version != self.graph.version
+            return out
+
+        path = self.path.find_path_bfs(a, b)
+        d = len(path) - 1 if path else None
+        return {
+            "lower": d,
+            "upper": d,
+            "connected": d is not None,
+            "distance": d,
+            "method": "bfs",
+            "version": self.graph.version,
+            "stale": False,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        t = self._tables
+        if t is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "version": t.version,
+            "stale": t.version != self.graph.version,
+            "landmarks": list(t.landmarks),
+            "bytes": sum(d.buffer_info()[1] * d.itemsize for d in t.dists),
+        }
@@ -1,10 +1,28 @@
 import json
 import os
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional, Set
+
+from shared import tracing
 
 class GraphRepository:
-    def __init__(self, file_path: str):
+    """
+    Persistencia del grafo: snapshot (graph.json) + journal append-only (graph.json.journal).
+
+    Cada mutación se agrega como una línea JSON al journal (costo O(1)).
+    save() compacta: reescribe el snapshot completo y vacía el journal.
+    load() recupera el estado: snapshot + replay del journal.
+    """
+
+    # GraphService compacta periódicamente sólo si el backend lo necesita
+    needs_compaction = True
+
+    def __init__(self, file_path: str, fsync: bool = False):
         self.file_path = file_path
+        self.journal_path = file_path + ".journal"
+        self.fsync = fsync
+        self._journal = None
+        self._journal_lock = threading.Lock()
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         if not os.path.exists(file_path):
             with open(file_path, "w", encoding="utf-8") as f:
@@ -12,8 +30,75 @@ class GraphRepository:
 
     def load(self) -> Dict[str, List[str]]:
         with open(self.file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+            raw = json.load(f)
+        if not os.path.exists(self.journal_path):
+            return raw
+
+        adj: Dict[str, Set[str]] = {k: set(v) for k, v in raw.items()}
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea cortada por un crash: se descarta
+                    break
+                self._apply(adj, rec)
+        return {k: sorted(v) for k, v in adj.items()}
+
+    @staticmethod
+    def _apply(adj: Dict[str, Set[str]], rec: Dict[str, str]) -> None:
+        op = rec.get("op")
+        a = rec.get("a")
+        b = rec.get("b")
+        if op == "node":
+            adj.setdefault(a, set())
+        elif op == "add":
+            adj.setdefault(a, set()).add(b)
+            adj.setdefault(b, set()).add(a)
+        elif op == "remove":
+            if a in adj:
+                adj[a].discard(b)
+            if b in adj:
+                adj[b].discard(a)
+
+    def append(self, op: str, a: str, b: Optional[str] = None) -> None:
+        rec = {"op": op, "a": a} if b is None else {"op": op, "a": a, "b": b}
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with tracing.span("graph.append"), self._journal_lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
 
     def save(self, adj: Dict[str, List[str]]) -> None:
-        with open(self.file_path, "w", encoding="utf-8") as f:
+        with tracing.span("graph.save"):
+            self._save(adj)
+
+    def _save(self, adj: Dict[str, List[str]]) -> None:
+        tmp = self.file_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(adj, f, ensure_ascii=False, indent=2)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.file_path)
+
+        # El snapshot ya contiene todo lo del journal: lo vaciamos.
+        # Si caemos entre replace y truncate, el replay es idempotente.
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                open(self.journal_path, "w", encoding="utf-8").close()
+
+    def close(self) -> None:
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -1,46 +1,174 @@
+import bisect
 import threading
-from typing import Dict, List, Set
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from server.core.component_index import ComponentIndex
+from server.core.degree_index import DegreeIndex
 from server.core.graph_repo import GraphRepository
+from server.core.graph_snapshot import Friends, GraphSnapshot, with_friend, without_friend
+from shared import tracing
+
+# listener(version, op, nodes): op es "node", "add" o "remove"
+GraphListener = Callable[[int, str, Iterable[str]], None]
+
 
 class GraphService:
-    def __init__(self, repo: GraphRepository):
+    """
+    Grafo de amistades. El estado vigente es un GraphSnapshot inmutable y versionado:
+    los lectores lo toman sin lock; los escritores (serializados por _lock) publican
+    la versión siguiente copiando sólo las listas de adyacencia que cambian.
+    """
+
+    def __init__(self, repo: GraphRepository, compact_every: int = 1000):
         self._repo = repo
         self._lock = threading.Lock()
+        # Cada cuántas mutaciones del journal se compacta en un snapshot
+        self._compact_every = compact_every
+        self._pending = 0
 
-        # adj: user_id -> set(friend_ids)
+        # adj: user_id -> tupla ordenada de friend_ids
         raw = self._repo.load()
-        self._adj: Dict[str, Set[str]] = {k: set(v) for k, v in raw.items()}
+        self._snap = GraphSnapshot.build(raw)
+        # Estadísticas de grado mantenidas en cada escritura (protegidas por _lock)
+        self._degrees = DegreeIndex.from_degrees((u, len(f)) for u, f in self._snap.items())
+        # Componentes conexas (union-find); tras una baja se reconstruye en segundo plano
+        self._components = ComponentIndex.from_snapshot(self._snap, self.current)
+        self._listeners: List[GraphListener] = []
+
+    @property
+    def version(self) -> int:
+        return self._snap.version
+
+    def current(self) -> GraphSnapshot:
+        return self._snap
+
+    def add_listener(self, fn: GraphListener) -> None:
+        """
+        fn se llama con el lock de escritura tomado, después de publicar cada versión.
+        Tiene que ser rápido y no volver a escribir en el grafo.
+        """
+        with self._lock:
+            self._listeners.append(fn)
+
+    def _publish(self, changes: Dict[str, Friends], op: str) -> None:
+        # Se llama con el lock tomado
+        old = self._snap
+        for u, friends in changes.items():
+            prev = old.get(u)
+            if prev is None:
+                self._degrees.add_node(u, len(friends))
+            else:
+                self._degrees.change(u, len(prev), len(friends))
+        self._snap = old.with_changes(changes)
+        self._components.apply(self._snap.version, op, changes.keys())
+        for fn in self._listeners:
+            fn(self._snap.version, op, changes.keys())
+
+    def degree_stats(self, percentiles=(50, 90, 99)) -> Dict[str, Any]:
+        """
+        Estadísticas de grado de la versión vigente, sin recorrer el grafo.
+        """
+        return self.stats_view(percentiles)[1]
+
+    def stats_view(self, percentiles=(50, 90, 99)) -> Tuple[GraphSnapshot, Dict[str, Any]]:
+        """
+        (versión vigente, estadísticas de grado de esa misma versión).
+        """
+        with self._lock:
+            out = self._degrees.summary()
+            out["degree_histogram"] = self._degrees.histogram()
+            out["percentiles"] = self._degrees.percentiles(list(percentiles))
+            out["version"] = self._snap.version
+            return self._snap, out
+
+    def connected(self, a: str, b: str, snap: Optional[GraphSnapshot] = None) -> Optional[bool]:
+        """
+        ¿a y b están en la misma componente? False es definitivo (O(α(n)) si el índice
+        está al día); None si no se sabe todavía y hay que recorrer el grafo.
+        """
+        return self._components.connected(a, b, self._snap if snap is None else snap)
+
+    def component_stats(self, snap: Optional[GraphSnapshot] = None) -> Dict[str, Any]:
+        return self._components.summary(self._snap if snap is None else snap)
 
     def _persist(self) -> None:
-        raw = {k: sorted(list(v)) for k, v in self._adj.items()}
-        self._repo.save(raw)
+        with tracing.span("graph._persist"):
+            raw = {k: list(v) for k, v in self._snap.items()}
+            self._repo.save(raw)
+        self._pending = 0
+
+    def _commit(self, changes: Dict[str, Friends], op: str, a: str, b: Optional[str] = None) -> None:
+        # Se llama con el lock tomado: O(1) salvo cuando toca compactar.
+        # Primero el journal (si falla no se publica nada), después la versión nueva;
+        # la compactación guarda el snapshot ya publicado
+        self._repo.append(op, a, b)
+        self._pending += 1
+        self._publish(changes, op)
+        if not self._repo.needs_compaction:
+            return
+        if self._compact_every and self._pending >= self._compact_every:
+            self._persist()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._persist()
 
     def ensure_user(self, user_id: str) -> None:
+        if user_id in self._snap:
+            return
         with self._lock:
-            if user_id not in self._adj:
-                self._adj[user_id] = set()
-                self._persist()
+            if user_id not in self._snap:
+                self._commit({user_id: ()}, "node", user_id)
 
     def add_friendship(self, a: str, b: str) -> None:
         if a == b:
             raise ValueError("Cannot friend yourself")
         with self._lock:
-            self._adj.setdefault(a, set()).add(b)
-            self._adj.setdefault(b, set()).add(a)
-            self._persist()
+            snap = self._snap
+            if snap.has_edge(a, b) and snap.has_edge(b, a):
+                return
+            self._commit({a: with_friend(snap.get(a, ()), b), b: with_friend(snap.get(b, ()), a)}, "add", a, b)
 
     def remove_friendship(self, a: str, b: str) -> None:
         with self._lock:
-            if a in self._adj:
-                self._adj[a].discard(b)
-            if b in self._adj:
-                self._adj[b].discard(a)
-            self._persist()
+            snap = self._snap
+            changes: Dict[str, Friends] = {}
+            if snap.has_edge(a, b):
+                changes[a] = without_friend(snap[a], b)
+            if snap.has_edge(b, a):
+                changes[b] = without_friend(snap[b], a)
+            if changes:
+                self._commit(changes, "remove", a, b)
 
     def friends_of(self, user_id: str) -> List[str]:
-        with self._lock:
-            return sorted(list(self._adj.get(user_id, set())))
+        # Las tuplas ya están ordenadas: no hace falta lock ni sort
+        return list(self._snap.get(user_id, ()))
+
+    def friends_page(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        snap: Optional[GraphSnapshot] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Página de amigos en orden de id, a partir del id siguiente a cursor.
+        El cursor es el último id entregado: sigue siendo válido aunque el grafo cambie.
+        Retorna (ids, next_cursor); next_cursor es None en la última página.
+        """
+        friends = (self._snap if snap is None else snap).get(user_id, ())
+        start = 0 if cursor is None else bisect.bisect_right(friends, cursor)
+        page = list(friends[start:start + limit])
+        more = start + limit < len(friends)
+        return page, (page[-1] if more and page else None)
 
     def snapshot(self) -> Dict[str, List[str]]:
-        with self._lock:
-            return {k: sorted(list(v)) for k, v in self._adj.items()}
+        return {k: list(v) for k, v in self._snap.items()}
+
+    @contextmanager
+    def read_view(self) -> Iterator[GraphSnapshot]:
+        """
+        Vista de sólo lectura sin copiar: la versión vigente al entrar.
+        No toma lock; los escritores siguen publicando versiones nuevas mientras tanto.
+        """
+        yield self._snap
@@ -0,0 +1,106 @@
+import bisect
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+Friends = Tuple[str, ...]
+
+_MIN_SHARDS = 16
+
+
+def _shard_count(n: int) -> int:
+    # ~sqrt(n) shards: copiar la tupla de shards y un shard cuesta O(sqrt(n)) por escritura
+    s = _MIN_SHARDS
+    while s * s < n:
+        s *= 2
+    return s
+
+
+class GraphSnapshot(Mapping[str, Friends]):
+    """
+    Versión inmutable de la adyacencia: user_id -> tupla ordenada de friend_ids.
+
+    Los nodos se reparten en shards (dicts). Una escritura produce la versión siguiente
+    copiando sólo los shards tocados; el resto se comparte con la versión anterior.
+    Los lectores toman la referencia actual sin lock y nunca la ven cambiar.
+    """
+
+    __slots__ = ("version", "_shards", "_len")
+
+    def __init__(self, version: int, shards: Tuple[Dict[str, Friends], ...], length: int):
+        self.version = version
+        self._shards = shards
+        self._len = length
+
+    @classmethod
+    def build(cls, adj: Mapping[str, object], version: int = 0) -> "GraphSnapshot":
+        return cls._partition(((u, tuple(sorted(set(f)))) for u, f in adj.items()), len(adj), version)
+
+    @classmethod
+    def _partition(cls, items, n: int, version: int) -> "GraphSnapshot":
+        s = _shard_count(n)
+        shards: Tuple[Dict[str, Friends], ...] = tuple({} for _ in range(s))
+        for u, friends in items:
+            shards[hash(u) % s][u] = friends
+        return cls(version, shards, n)
+
+    # ---------- Mapping ----------
+    def __getitem__(self, u: str) -> Friends:
+        return self._shards[hash(u) % len(self._shards)][u]
+
+    def get(self, u: str, default: Optional[Friends] = None):
+        return self._shards[hash(u) % len(self._shards)].get(u, default)
+
+    def __contains__(self, u: object) -> bool:
+        return u in self._shards[hash(u) % len(self._shards)]
+
+    def __iter__(self) -> Iterator[str]:
+        for shard in self._shards:
+            yield from shard
+
+    def __len__(self) -> int:
+        return self._len
+
+    def items(self):
+        for shard in self._shards:
+            yield from shard.items()
+
+    def has_edge(self, a: str, b: str) -> bool:
+        friends = self.get(a, ())
+        i = bisect.bisect_left(friends, b)
+        return i < len(friends) and friends[i] == b
+
+    # ---------- nuevas versiones ----------
+    def with_changes(self, changes: Mapping[str, Friends]) -> "GraphSnapshot":
+        """
+        Nueva versión con las entradas de changes reemplazadas/agregadas.
+        """
+        n = self._len + sum(1 for u in changes if u not in self)
+        if _shard_count(n) != len(self._shards):
+            # Creció lo suficiente como para re-particionar: O(n), amortizado
+            merged = dict(self.items())
+            merged.update(changes)
+            return GraphSnapshot._partition(merged.items(), n, self.version + 1)
+
+        s = len(self._shards)
+        shards = list(self._shards)
+        copied = set()
+        for u, friends in changes.items():
+            i = hash(u) % s
+            if i not in copied:
+                shards[i] = dict(shards[i])
+                copied.add(i)
+            shards[i][u] = friends
+        return GraphSnapshot(self.version + 1, tuple(shards), n)
+
+
+def with_friend(friends: Friends, v: str) -> Friends:
+    i = bisect.bisect_left(friends, v)
+    if i < len(friends) and friends[i] == v:
+        return friends
+    return friends[:i] + (v,) + friends[i:]
+
+
+def without_friend(friends: Friends, v: str) -> Friends:
+    i = bisect.bisect_left(friends, v)
+    if i < len(friends) and friends[i] == v:
+        return friends[:i] + friends[i + 1:]
+    return friends
@@ -0,0 +1,190 @@
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Límites superiores (segundos) de los buckets del histograma de latencia; el último es +Inf
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Etiqueta para tipos fuera de known_types (evita una serie por cada tipo inventado)
+UNKNOWN = "UNKNOWN"
+
+
+class _TypeMetrics:
+    __slots__ = ("requests", "errors", "in_flight", "bytes_in", "bytes_out", "latency_sum", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class MetricsRegistry:
+    """
+    Contadores por tipo de mensaje: requests, errores, en vuelo, bytes entrada/salida
+    e histograma de latencia (buckets fijos, como Prometheus).
+
+    Cada request cuesta dos tomas de un lock y una búsqueda binaria; con las métricas
+    deshabilitadas el router ni siquiera llama acá (router.metrics es None).
+    """
+
+    def __init__(self, known_types: Optional[Iterable[str]] = None):
+        self.known_types = frozenset(known_types) if known_types is not None else None
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._types: Dict[str, _TypeMetrics] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def label(self, msg_type: Any) -> str:
+        if not isinstance(msg_type, str):
+            return UNKNOWN
+        if self.known_types is not None and msg_type not in self.known_types:
+            return UNKNOWN
+        return msg_type
+
+    def _get(self, label: str) -> _TypeMetrics:
+        m = self._types.get(label)
+        if m is None:
+            m = self._types[label] = _TypeMetrics()
+        return m
+
+    # ---------- registro ----------
+    def begin(self, label: str) -> float:
+        with self._lock:
+            self._get(label).in_flight += 1
+        return time.perf_counter()
+
+    def end(self, label: str, t0: float, ok: bool) -> None:
+        elapsed = time.perf_counter() - t0
+        i = bisect.bisect_left(LATENCY_BUCKETS, elapsed)
+        with self._lock:
+            m = self._get(label)
+            m.in_flight -= 1
+            m.requests += 1
+            if not ok:
+                m.errors += 1
+            m.latency_sum += elapsed
+            m.buckets[i] += 1
+
+    def add_bytes(self, label: str, received: int, sent: int) -> None:
+        with self._lock:
+            m = self._get(label)
+            m.bytes_in += received
+            m.bytes_out += sent
+
+    def reset(self) -> None:
+        with self._lock:
+            # Los gauges de requests en curso no se pierden
+            self._types = {k: self._fresh(m) for k, m in self._types.items() if m.in_flight}
+            self.started = time.time()
+
+    @staticmethod
+    def _fresh(m: _TypeMetrics) -> _TypeMetrics:
+        n = _TypeMetrics()
+        n.in_flight = m.in_flight
+        return n
+
+    # ---------- lectura ----------
+    @staticmethod
+    def _quantile(buckets: List[int], count: int, q: float) -> Optional[float]:
+        # Cota superior del bucket donde cae el cuantil (None si cae en +Inf)
+        if not count:
+            return None
+        rank = q * count
+        acc = 0
+        for i, c in enumerate(buckets):
+            acc += c
+            if acc >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = {k: (m.requests, m.errors, m.in_flight, m.bytes_in, m.bytes_out, m.latency_sum, list(m.buckets))
+                    for k, m in self._types.items()}
+        types: Dict[str, Any] = {}
+        for k in sorted(rows):
+            requests, errors, in_flight, bytes_in, bytes_out, total, buckets = rows[k]
+            ms = {}
+            for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                v = self._quantile(buckets, requests, q)
+                ms[name] = v * 1e3 if v is not None else None
+            types[k] = {
+                "requests": requests,
+                "errors": errors,
+                "in_flight": in_flight,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "latency_ms": dict(ms, mean=total / requests * 1e3 if requests else None),
+                "histogram": buckets,
+            }
+        return {"uptime_s": time.time() - self.started, "buckets_s": list(LATENCY_BUCKETS), "types": types}
+
+    def prometheus_text(self) -> str:
+        """
+        Formato de exposición de texto de Prometheus.
+        """
+        with self._lock:
+            rows = sorted((k, m.requests, m.errors, m.in_flight, m.bytes_in, m.bytes_out, m.latency_sum, list(m.buckets))
+                          for k, m in self._types.items())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, idx: int) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for row in rows:
+                lines.append(f'{name}{{type="{row[0]}"}} {row[idx]}')
+
+        family("socialtec_requests_total", "counter", "Requests handled.", 1)
+        family("socialtec_request_errors_total", "counter", "Requests answered with an error.", 2)
+        family("socialtec_requests_in_flight", "gauge", "Requests being handled.", 3)
+        family("socialtec_received_bytes_total", "counter", "Request bytes received (framed).", 4)
+        family("socialtec_sent_bytes_total", "counter", "Response bytes sent (framed).", 5)
+
+        name = "socialtec_request_duration_seconds"
+        lines.append(f"# HELP {name} Handler latency.")
+        lines.append(f"# TYPE {name} histogram")
+        for k, requests, _, _, _, _, total, buckets in rows:
+            acc = 0
+            for bound, c in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                acc += c
+                lines.append(f'{name}_bucket{{type="{k}",le="{bound}"}} {acc}')
+            lines.append(f'{name}_sum{{type="{k}"}} {total}')
+            lines.append(f'{name}_count{{type="{k}"}} {requests}')
+        return "\n".join(lines) + "\n"
+
+    # ---------- volcado a archivo ----------
+    def dump(self, path: str) -> None:
+        # Escritura atómica: quien lea el archivo nunca ve uno a medias
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def start_dump(self, path: str, interval: float = 15.0) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dump_loop, args=(path, interval), name="metrics-dump", daemon=True)
+        self._thread.start()
+
+    def stop_dump(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _dump_loop(self, path: str, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.dump(path)
+            except OSError as e:
+                print(f"[METRICS] Dump failed: {e}")
@@ -0,0 +1,106 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Marcadores de inicio/fin: hacen que textos cortos (y prefijos) también generen n-gramas
+_START = "\x02"
+_END = "\x03"
+
+
+class NgramIndex:
+    """
+    Índice invertido de n-gramas (trigramas por defecto) para búsquedas por substring.
+
+    Cada documento tiene uno o más campos de texto. search(q) devuelve los ids cuyos
+    campos contienen q: intersecta las posting lists de los n-gramas de q y verifica
+    los candidatos (la intersección puede dar falsos positivos, nunca falsos negativos).
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._postings: Dict[str, Set[str]] = {}
+        self._fields: Dict[str, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def _grams(self, text: str) -> Set[str]:
+        padded = _START + text + _END
+        n = self.n
+        return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+    def add(self, doc_id: str, fields: Iterable[str]) -> None:
+        if doc_id in self._fields:
+            self.remove(doc_id)
+        texts = tuple(f.lower() for f in fields)
+        self._fields[doc_id] = texts
+        for text in texts:
+            for g in self._grams(text):
+                self._postings.setdefault(g, set()).add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        texts = self._fields.pop(doc_id, ())
+        for text in texts:
+            for g in self._grams(text):
+                posting = self._postings.get(g)
+                if posting is not None:
+                    posting.discard(doc_id)
+                    if not posting:
+                        del self._postings[g]
+
+    def fields_of(self, doc_id: str) -> Tuple[str, ...]:
+        return self._fields.get(doc_id, ())
+
+    def _candidates(self, q: str) -> Set[str]:
+        if len(q) >= self.n:
+            # Intersección empezando por la posting list más chica
+            lists = []
+            for i in range(len(q) - self.n + 1):
+                posting = self._postings.get(q[i:i + self.n])
+                if not posting:
+                    return set()
+                lists.append(posting)
+            lists.sort(key=len)
+            out = set(lists[0])
+            for posting in lists[1:]:
+                out &= posting
+                if not out:
+                    break
+            return out
+
+        # Consulta más corta que n: unión de los n-gramas que la contienen.
+        # La cantidad de n-gramas distintos está acotada por el alfabeto, no por los usuarios.
+        out: Set[str] = set()
+        for g, posting in self._postings.items():
+            if q in g:
+                out |= posting
+        return out
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Ids que contienen query (en minúsculas) en algún campo, rankeados:
+        primero los que empiezan con query, luego los que tienen una palabra que empieza
+        con query, luego el resto. Empates por texto y id, así el orden es estable.
+        Con limit sólo se ordenan los primeros limit (heap), no todos los candidatos.
+        """
+        q = query.strip().lower()
+        if not q:
+            ids: Iterable[str] = self._fields.keys()
+        else:
+            ids = (d for d in self._candidates(q) if any(q in t for t in self._fields[d]))
+
+        ranked = ((self._rank(q, self._fields[d]), self._fields[d], d) for d in ids)
+        if limit is None:
+            top = sorted(ranked)
+        else:
+            top = heapq.nsmallest(limit, ranked)
+        return [d for _, _, d in top]
+
+    @staticmethod
+    def _rank(q: str, texts: Tuple[str, ...]) -> int:
+        if not q:
+            return 0
+        if any(t.startswith(q) for t in texts):
+            return 0
+        if any(w.startswith(q) for t in texts for w in t.split()):
+            return 1
+        return 2
@@ -1,42 +1,113 @@
-from collections import deque
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 from server.core.graph_service import GraphService
+from server.core.query_cache import QueryCache
 
 
 class PathService:
-    def __init__(self, graph: GraphService):
+    def __init__(self, graph: GraphService, cache: Optional[QueryCache] = None):
         self.graph = graph
+        self.cache = cache
 
-    def find_path_bfs(self, src: str, dst: str) -> List[str]:
+    def find_path_bfs(
+        self,
+        src: str,
+        dst: str,
+        max_depth: Optional[int] = None,
+        max_visited: Optional[int] = None,
+    ) -> List[str]:
         """
         Retorna [src, ..., dst] si existe camino.
         Si no existe, retorna [].
+
+        BFS bidireccional sobre la versión vigente del grafo (sin copiarla): en cada
+        paso se expande un nivel completo de la frontera más chica. Si el índice de
+        componentes dice que están separados, se responde sin recorrer.
+        max_depth limita la cantidad de saltos y max_visited los nodos visitados;
+        si se agota el presupuesto también retorna [].
+
+        Con cache, el resultado se guarda por (src, dst, max_depth, versión del grafo).
+        Las consultas con max_visited no se cachean: quitar aristas puede cambiar
+        cuántos nodos hace falta visitar.
         """
         if src == dst:
             return [src]
 
-        adj: Dict[str, List[str]] = self.graph.snapshot()
-        if src not in adj or dst not in adj:
-            return []
+        with self.graph.read_view() as adj:
+            key = ("path", src, dst, max_depth)
+            use_cache = self.cache is not None and max_visited is None
+            if use_cache:
+                hit = self.cache.get(key, adj.version)
+                if hit is not None:
+                    return list(hit)
 
-        q = deque([src])
-        visited = {src}
-        parent: Dict[str, Optional[str]] = {src: None}
+            if src not in adj or dst not in adj or self.graph.connected(src, dst, adj) is False:
+                # Componentes distintas: no hace falta recorrer la de src
+                path: List[str] = []
+            else:
+                path = self._bidirectional(adj, src, dst, max_depth, max_visited)
 
-        while q:
-            u = q.popleft()
-            for v in adj.get(u, []):
-                if v in visited:
-                    continue
-                visited.add(v)
-                parent[v] = u
-                if v == dst:
-                    return self._reconstruct(parent, dst)
-                q.append(v)
+            if use_cache:
+                # Sin camino: quitar aristas no lo crea. Con camino: depende de sus nodos.
+                self.cache.put(key, adj.version, tuple(path), touched=path, survives_add=False)
+            return path
+
+    def _bidirectional(
+        self,
+        adj: Mapping[str, Sequence[str]],
+        src: str,
+        dst: str,
+        max_depth: Optional[int],
+        max_visited: Optional[int],
+    ) -> List[str]:
+        parent_s: Dict[str, Optional[str]] = {src: None}
+        parent_t: Dict[str, Optional[str]] = {dst: None}
+        front_s = [src]
+        front_t = [dst]
+        depth = 0
+
+        while front_s and front_t:
+            if max_depth is not None and depth >= max_depth:
+                return []
+            if len(front_s) <= len(front_t):
+                front_s, meet = self._expand(adj, front_s, parent_s, parent_t)
+            else:
+                front_t, meet = self._expand(adj, front_t, parent_t, parent_s)
+            depth += 1
+            if meet is not None:
+                return self._join(parent_s, parent_t, meet)
+            # El presupuesto se controla entre niveles
+            if max_visited is not None and len(parent_s) + len(parent_t) > max_visited:
+                return []
 
         return []
 
+    @staticmethod
+    def _expand(
+        adj: Mapping[str, Sequence[str]],
+        frontier: List[str],
+        own: Dict[str, Optional[str]],
+        other: Dict[str, Optional[str]],
+    ) -> Tuple[List[str], Optional[str]]:
+        nxt: List[str] = []
+        for u in frontier:
+            for v in adj.get(u, ()):
+                if v in own:
+                    continue
+                own[v] = u
+                if v in other:
+                    return nxt, v
+                nxt.append(v)
+        return nxt, None
+
+    def _join(self, parent_s: Dict[str, Optional[str]], parent_t: Dict[str, Optional[str]], meet: str) -> List[str]:
+        path = self._reconstruct(parent_s, meet)
+        cur = parent_t.get(meet)
+        while cur is not None:
+            path.append(cur)
+            cur = parent_t.get(cur)
+        return path
+
     def _reconstruct(self, parent: Dict[str, Optional[str]], dst: str) -> List[str]:
         path = []
         cur: Optional[str] = dst
@@ -0,0 +1,251 @@
+import cProfile
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+CPROFILE = "cprofile"
+SAMPLING = "sampling"
+MODES = (CPROFILE, SAMPLING)
+
+# Sin límites explícitos se perfilan las próximas DEFAULT_REQUESTS requests
+DEFAULT_REQUESTS = 100
+TOP_FUNCTIONS = 20
+
+
+class _Session:
+    def __init__(self, mode: str, requests: Optional[int], seconds: Optional[float], types: Optional[frozenset], interval: float):
+        self.mode = mode
+        self.remaining = requests
+        self.seconds = seconds
+        self.types = types
+        self.interval = interval
+        self.started = time.time()
+        self.profiled = 0
+        self.in_progress = 0
+        self.stats: Optional[pstats.Stats] = None
+        # Modo sampling: thread -> tipo de la request que está atendiendo
+        self.active: Dict[int, str] = {}
+        self.samples: Counter = Counter()
+        self.stop = threading.Event()
+        self.timer: Optional[threading.Timer] = None
+        self.sampler: Optional[threading.Thread] = None
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "types": sorted(self.types) if self.types else None,
+            "remaining": self.remaining,
+            "seconds": self.seconds,
+            "profiled": self.profiled,
+            "elapsed_s": time.time() - self.started,
+        }
+
+
+class RequestProfiler:
+    """
+    Perfilado bajo demanda del server en vivo, alrededor del dispatch del router.
+
+    start() arma una sesión para las próximas `requests` requests y/o `seconds`
+    segundos (lo que ocurra primero), opcionalmente sólo de ciertos tipos:
+    - cprofile: un cProfile.Profile por request (de a una por vez; las que llegan
+      mientras otra se perfila corren sin perfilar), acumulados en un .pstats
+    - sampling: una thread toma el stack de las threads que atienden requests
+      perfiladas cada `interval` segundos; sale en formato collapsed (flamegraph.pl,
+      speedscope), con el tipo de mensaje como raíz de cada stack
+
+    Con la sesión desarmada el router sólo mira `armed`.
+    """
+
+    def __init__(self, out_dir: str, max_seconds: float = 300.0):
+        self.out_dir = out_dir
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._session: Optional[_Session] = None
+        self._local = threading.local()
+        self._seq = itertools.count(1)
+        self.last: Optional[Dict[str, Any]] = None
+
+    @property
+    def armed(self) -> bool:
+        return self._session is not None
+
+    # ---------- control ----------
+    def start(
+        self,
+        requests: Optional[int] = None,
+        seconds: Optional[float] = None,
+        types: Optional[Iterable[str]] = None,
+        mode: str = CPROFILE,
+        interval: float = 0.005,
+    ) -> Dict[str, Any]:
+        if mode not in MODES:
+            raise ValueError("Invalid mode")
+        if requests is not None and requests < 1:
+            raise ValueError("requests must be >= 1")
+        if requests is None and seconds is None:
+            requests = DEFAULT_REQUESTS
+        # Una sesión olvidada no puede quedar perfilando para siempre
+        seconds = min(seconds, self.max_seconds) if seconds is not None else self.max_seconds
+        s = _Session(mode, requests, seconds, frozenset(types) if types else None, max(interval, 0.001))
+        with self._lock:
+            if self._session is not None:
+                raise ValueError("Profiler already running")
+            self._session = s
+        s.timer = threading.Timer(seconds, self._expire, args=(s,))
+        s.timer.daemon = True
+        s.timer.start()
+        if mode == SAMPLING:
+            s.sampler = threading.Thread(target=self._sample_loop, args=(s,), name="profiler-sampler", daemon=True)
+            s.sampler.start()
+        return s.info()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """
+        Desarma la sesión y escribe el resultado. None si no había sesión.
+        """
+        with self._lock:
+            s = self._session
+            if s is None:
+                return None
+            self._session = None
+        s.stop.set()
+        if s.timer is not None:
+            s.timer.cancel()
+        if s.sampler is not None and s.sampler is not threading.current_thread():
+            s.sampler.join(5)
+        self.last = self._write(s)
+        print(f"[PROFILER] {self.last['requests']} requests -> {self.last['file']}")
+        return self.last
+
+    def status(self) -> Dict[str, Any]:
+        s = self._session
+        return {"armed": s is not None, "session": s.info() if s is not None else None, "last": self.last}
+
+    def _expire(self, s: _Session) -> None:
+        if self._session is s:
+            self.stop()
+
+    # ---------- hook del router ----------
+    def call(self, msg_type: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        fn(*args), perfilada si la sesión armada la toma. Los errores del profiler
+        nunca salen de acá: en el peor caso la request corre sin perfilar.
+        """
+        s = self._session
+        # busy: un BATCH ya perfilado no perfila de nuevo sus sub-requests en la misma thread
+        if s is None or getattr(self._local, "busy", False) or (s.types is not None and msg_type not in s.types):
+            return fn(*args)
+        with self._lock:
+            # cProfile es global al intérprete desde 3.12: una request perfilada a la vez
+            claimed = self._session is s and s.remaining != 0 and not (s.mode == CPROFILE and s.in_progress)
+            if claimed:
+                if s.remaining is not None:
+                    s.remaining -= 1
+                s.in_progress += 1
+        if not claimed:
+            return fn(*args)
+
+        self._local.busy = True
+        try:
+            if s.mode == CPROFILE:
+                return self._run_cprofile(s, fn, args)
+            tid = threading.get_ident()
+            s.active[tid] = str(msg_type)
+            try:
+                return fn(*args)
+            finally:
+                s.active.pop(tid, None)
+        finally:
+            self._local.busy = False
+            with self._lock:
+                s.in_progress -= 1
+                s.profiled += 1
+                done = s.remaining == 0 and s.in_progress == 0
+            if done:
+                try:
+                    self._expire(s)
+                except Exception as e:
+                    print(f"[PROFILER] Could not write profile: {e}")
+
+    def _run_cprofile(self, s: _Session, fn: Callable[..., Any], args: tuple) -> Any:
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except Exception as e:
+            # Otra herramienta (debugger, coverage) ya tiene el hook de profiling
+            print(f"[PROFILER] cProfile unavailable: {e}")
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            prof.disable()
+            try:
+                with self._lock:
+                    if s.stats is None:
+                        s.stats = pstats.Stats(prof)
+                    else:
+                        s.stats.add(prof)
+            except Exception as e:
+                print(f"[PROFILER] Discarded profile: {e}")
+
+    # ---------- sampling ----------
+    @staticmethod
+    def _stack(frame) -> List[str]:
+        out = []
+        while frame is not None:
+            code = frame.f_code
+            out.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        out.reverse()
+        return out
+
+    def _sample_loop(self, s: _Session) -> None:
+        while not s.stop.wait(s.interval):
+            if not s.active:
+                continue
+            frames = sys._current_frames()
+            for tid, msg_type in list(s.active.items()):
+                frame = frames.get(tid)
+                if frame is not None:
+                    s.samples[";".join([msg_type] + self._stack(frame))] += 1
+
+    # ---------- salida ----------
+    def _write(self, s: _Session) -> Dict[str, Any]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{next(self._seq)}")
+        result: Dict[str, Any] = dict(s.info(), requests=s.profiled, file=None)
+        result.pop("profiled")
+        result.pop("remaining")
+
+        if s.mode == SAMPLING:
+            result["samples"] = sum(s.samples.values())
+            if s.samples:
+                result["file"] = base + ".collapsed"
+                with open(result["file"], "w", encoding="utf-8") as f:
+                    for stack, n in sorted(s.samples.items()):
+                        f.write(f"{stack} {n}\n")
+            return result
+
+        if s.stats is not None:
+            result["file"] = base + ".pstats"
+            s.stats.dump_stats(result["file"])
+            result["top"] = self._top(s.stats)
+        return result
+
+    @staticmethod
+    def _top(stats: pstats.Stats) -> List[Dict[str, Any]]:
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_FUNCTIONS]
+        return [
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": nc,
+                "tottime_s": tt,
+                "cumtime_s": ct,
+            }
+            for (filename, line, name), (cc, nc, tt, ct, _) in rows
+        ]
@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional
+
+
+class QueryCache:
+    """
+    Caché LRU acotada de resultados de consultas sobre el grafo.
+
+    Cada entrada recuerda la versión del grafo con la que se calculó y sólo se
+    sirve para esa misma versión. Con selective=True, ante cada mutación se
+    re-valida (se pasa a la versión nueva) toda entrada que no dependa de los
+    nodos cambiados, en lugar de descartar la caché entera.
+
+    Dependencias de una entrada (put):
+    - touched: nodos de los que depende el resultado (None = de todo el grafo).
+    - survives_add: si sigue siendo válida cuando se agregan aristas fuera de
+      touched. Un camino más corto puede aparecer por cualquier arista nueva, así
+      que los caminos usan False; quitar aristas fuera del camino no lo afecta.
+    """
+
+    def __init__(self, max_entries: int = 1024, selective: bool = True):
+        if max_entries < 1:
+            raise ValueError("Invalid cache size")
+        self.max_entries = max_entries
+        self.selective = selective
+        self._lock = threading.Lock()
+        # key -> [version, value, touched, survives_add]
+        self._entries: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """
+        Valor cacheado para key en esa versión del grafo, o None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(
+        self,
+        key: Hashable,
+        version: int,
+        value: Any,
+        touched: Optional[Iterable[str]] = None,
+        survives_add: bool = False,
+    ) -> None:
+        deps: Optional[FrozenSet[str]] = None if touched is None else frozenset(touched)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[0] > version:
+                # Ya hay un resultado más nuevo
+                return
+            self._entries[key] = [version, value, deps, survives_add]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def on_graph_change(self, version: int, op: str, nodes: Iterable[str]) -> None:
+        """
+        Listener de GraphService: el grafo pasó a `version` por `op` sobre `nodes`.
+        """
+        changed = set(nodes)
+        with self._lock:
+            if not self.selective:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                return
+
+            stale = []
+            for key, entry in self._entries.items():
+                deps = entry[2]
+                if (
+                    entry[0] != version - 1
+                    or deps is None
+                    or (op == "add" and not entry[3])
+                    or not deps.isdisjoint(changed)
+                ):
+                    stale.append(key)
+                else:
+                    entry[0] = version
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "selective": self.selective,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,202 @@
+import bisect
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from server.core.graph_service import GraphService
+from server.core.graph_snapshot import GraphSnapshot
+
+COMMON = "common"
+ADAMIC_ADAR = "adamic_adar"
+METHODS = (COMMON, ADAMIC_ADAR)
+
+Scored = List[Tuple[str, float]]
+
+
+def intersect_sorted(a: Sequence[str], b: Sequence[str]) -> List[str]:
+    """
+    Intersección de dos secuencias ordenadas, en orden.
+    Con tamaños muy distintos busca cada elemento de la chica en la grande
+    (O(s log L)); si no, recorre la grande contra un set de la chica (O(s + L)).
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if not a:
+        return []
+    if len(a) * max(1, len(b).bit_length()) < len(b):
+        out = []
+        lo = 0
+        for x in a:
+            lo = bisect.bisect_left(b, x, lo)
+            if lo == len(b):
+                break
+            if b[lo] == x:
+                out.append(x)
+        return out
+    small = set(a)
+    return [x for x in b if x in small]
+
+
+class RecommendService:
+    """
+    "Personas que quizás conozcas": candidatos a 2 saltos rankeados por amigos en
+    común (common) o por Adamic-Adar (cada amigo en común f suma 1/log(grado f)).
+
+    Los top-k por usuario se guardan en una tabla (hasta table_k) que se mantiene con
+    los eventos de GraphService: una arista a-b sólo cambia las recomendaciones de
+    {a, b} ∪ N(a) ∪ N(b), así que sólo esas entradas se descartan. Se recalculan al
+    pedirlas de nuevo o con refresh(), que start() corre en segundo plano cada
+    refresh_interval segundos (de a refresh_batch entradas), fuera del camino de escritura.
+    """
+
+    def __init__(self, graph: GraphService, table_k: int = 50, refresh_interval: float = 1.0, refresh_batch: int = 256):
+        self.graph = graph
+        self.table_k = table_k
+        self.refresh_interval = refresh_interval
+        self.refresh_batch = refresh_batch
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # (user_id, method) -> top table_k
+        self._table: Dict[Tuple[str, str], Scored] = {}
+        # Entradas descartadas que vale la pena recalcular (alguien las pidió antes)
+        self._dirty: Dict[Tuple[str, str], None] = {}
+        # Última versión del grafo vista por el listener
+        self._version = graph.version
+        self.hits = 0
+        self.misses = 0
+        graph.add_listener(self._on_graph_change)
+
+    # ---------- consultas ----------
+    def mutual_friends(self, a: str, b: str) -> List[str]:
+        snap = self.graph.current()
+        return intersect_sorted(snap.get(a, ()), snap.get(b, ()))
+
+    def recommend(self, user_id: str, k: int = 10, method: str = ADAMIC_ADAR) -> Scored:
+        if method not in METHODS:
+            raise ValueError("Invalid method")
+        key = (user_id, method)
+        if k <= self.table_k:
+            with self._lock:
+                top = self._table.get(key)
+                if top is not None:
+                    self.hits += 1
+                    return top[:k]
+                self.misses += 1
+
+        snap = self.graph.current()
+        top = self._top(snap, user_id, max(k, self.table_k), method)
+        self._store(key, snap, top)
+        return top[:k]
+
+    def _store(self, key: Tuple[str, str], snap: GraphSnapshot, top: Scored) -> bool:
+        with self._lock:
+            # Si el grafo cambió mientras calculábamos, no sabemos si key quedó afectada
+            if snap.version != self._version:
+                return False
+            self._table[key] = top
+            self._dirty.pop(key, None)
+            return True
+
+    def _top(self, snap: GraphSnapshot, user_id: str, k: int, method: str) -> Scored:
+        scores = self._scores(snap, user_id, method)
+        return heapq.nsmallest(k, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    @staticmethod
+    def _scores(snap: GraphSnapshot, user_id: str, method: str) -> Dict[str, float]:
+        friends = snap.get(user_id, ())
+        if method == COMMON:
+            # Counter cuenta en C sobre la concatenación de las listas de adyacencia
+            scores: Dict[str, float] = Counter(chain.from_iterable(snap.get(f, ()) for f in friends))
+        else:
+            # Los amigos con el mismo grado aportan el mismo peso: se cuentan juntos
+            by_degree: Dict[int, List[Sequence[str]]] = defaultdict(list)
+            for f in friends:
+                nb = snap.get(f, ())
+                if len(nb) > 1:
+                    by_degree[len(nb)].append(nb)
+            scores = {}
+            get = scores.get
+            for d, lists in by_degree.items():
+                w = 1.0 / math.log(d)
+                if len(lists) == 1:
+                    for v in lists[0]:
+                        scores[v] = get(v, 0.0) + w
+                else:
+                    for v, c in Counter(chain.from_iterable(lists)).items():
+                        scores[v] = get(v, 0.0) + w * c
+        scores.pop(user_id, None)
+        for f in friends:
+            scores.pop(f, None)
+        return scores
+
+    # ---------- tabla precalculada ----------
+    def _on_graph_change(self, version: int, op: str, nodes: Iterable[str]) -> None:
+        # Se llama con el lock de escritura de GraphService tomado: sólo descarta
+        # entradas, el recálculo queda para refresh()
+        with self._lock:
+            self._version = version
+            if not self._table or op == "node":
+                return
+            affected = set(nodes)
+            snap = self.graph.current()
+            for u in nodes:
+                affected.update(snap.get(u, ()))
+            if len(self._table) < len(affected) * len(METHODS):
+                # Tabla chica frente a los afectados: se recorre la tabla
+                keys = [key for key in self._table if key[0] in affected]
+            else:
+                keys = [(u, m) for u in affected for m in METHODS if (u, m) in self._table]
+            for key in keys:
+                del self._table[key]
+                self._dirty[key] = None
+
+    def precompute(self, user_ids: Iterable[str], method: str = ADAMIC_ADAR) -> int:
+        """
+        Llena la tabla para user_ids. Retorna cuántas entradas quedaron guardadas.
+        """
+        stored = 0
+        for u in user_ids:
+            snap = self.graph.current()
+            stored += self._store((u, method), snap, self._top(snap, u, self.table_k, method))
+        return stored
+
+    def refresh(self, limit: Optional[int] = None) -> int:
+        """
+        Recalcula hasta limit entradas descartadas por cambios del grafo.
+        """
+        with self._lock:
+            keys = list(self._dirty)[:limit]
+        for user_id, method in keys:
+            snap = self.graph.current()
+            self._store((user_id, method), snap, self._top(snap, user_id, self.table_k, method))
+        return len(keys)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="recommend-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                # Mientras quede trabajo no se espera el intervalo completo
+                while self.refresh(self.refresh_batch) == self.refresh_batch and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                print(f"[RECOMMEND] Refresh failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._table), "dirty": len(self._dirty), "hits": self.hits, "misses": self.misses}
@@ -1,30 +1,181 @@
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Sequence
 
+from shared import tracing
 from shared.crypto import CryptoService
-from shared.config import FERNET_KEY, USERS_FILE, GRAPH_FILE
+from shared.config import (
+    FERNET_KEY, USERS_FILE, GRAPH_FILE, STORAGE_BACKEND, SQLITE_FILE,
+    QUERY_CACHE_SIZE, QUERY_CACHE_SELECTIVE,
+    DISTANCE_ORACLE_ENABLED, DISTANCE_LANDMARKS, DISTANCE_REFRESH_INTERVAL,
+    RECOMMEND_REFRESH_INTERVAL, RECOMMEND_REFRESH_BATCH,
+    METRICS_ENABLED, PROFILE_DIR, PROFILE_MAX_SECONDS,
+)
 
 from server.core.user_repo import UserRepository
 from server.core.auth_service import AuthService
 
 from server.core.graph_repo import GraphRepository
 from server.core.graph_service import GraphService
+from server.core.sqlite_repo import SqliteDatabase, SqliteUserRepository, SqliteGraphRepository
 
 from server.core.path_service import PathService
+from server.core.distance_oracle import DistanceOracle
+from server.core.metrics import MetricsRegistry
+from server.core.profiler import RequestProfiler
+from server.core.query_cache import QueryCache
+from server.core.recommend_service import ADAMIC_ADAR, RecommendService
 from server.core.stats_service import StatsService
 
+# SEARCH_USER paginado: evita frames gigantes con consultas muy cortas
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# BATCH: tipos que no modifican estado (pueden correr en paralelo; METRICS con
+# "reset" cuenta como escritura), tope de items y threads para los tramos paralelos
+READ_ONLY_TYPES = frozenset({
+    "PING", "SEARCH_USER", "GET_MY_PROFILE", "FRIENDS_PAGE", "MUTUAL_FRIENDS", "RECOMMEND",
+    "PATH_BETWEEN", "DISTANCE_ESTIMATE", "GRAPH_STATS", "CACHE_STATS", "METRICS",
+})
+BATCH_MAX_ITEMS = 100
+BATCH_WORKERS = 4
+
+# Tipos que tienen serie propia en las métricas; el resto se cuenta como UNKNOWN
+MESSAGE_TYPES = READ_ONLY_TYPES | {"BATCH", "REGISTER", "LOGIN", "ADD_FRIEND", "REMOVE_FRIEND", "PROFILE"}
+
+# GET_MY_PROFILE: campos que se pueden pedir con "fields" (nunca password_hash)
+PROFILE_FIELDS = ("id", "name", "lastname", "username", "photo_path")
+PROFILE_DEFAULT_FIELDS = ("id", "name", "lastname", "username")
+
+# FRIENDS_PAGE: tamaño de página (también el de cada frame en modo stream)
+FRIENDS_PAGE_DEFAULT_LIMIT = 100
+FRIENDS_PAGE_MAX_LIMIT = 1000
+
+# RECOMMEND: cantidad de sugerencias
+RECOMMEND_DEFAULT_K = 10
+RECOMMEND_MAX_K = 100
+
+
+class _Stream:
+    """
+    Iterador de frames de un handler en modo stream: cada frame se genera bajo su
+    span "handle" y el profiler, en la thread que lo pide; las métricas cubren el
+    stream completo y se cierran al agotarlo o en close(), aunque no haya empezado
+    (un generador cerrado antes de arrancar no corre su finally).
+    """
+
+    def __init__(self, router: "RequestRouter", req: Dict[str, Any], frames: Iterator[Dict[str, Any]], label: Optional[str] = None, t0: float = 0.0):
+        self._router = router
+        self._type = req.get("type")
+        self._frames = frames
+        self._label = label
+        self._t0 = t0
+        self._ok = True
+        self._done = False
+
+    def __iter__(self) -> "_Stream":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._done:
+            raise StopIteration
+        profiler = self._router.profiler
+        try:
+            with tracing.span("handle"):
+                if profiler.armed:
+                    frame = profiler.call(self._type, next, self._frames, None)
+                else:
+                    frame = next(self._frames, None)
+        except BaseException:
+            self._ok = False
+            self.close()
+            raise
+        if frame is None:
+            self.close()
+            raise StopIteration
+        self._ok = self._ok and frame.get("status") == "ok"
+        return frame
+
+    def close(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        try:
+            close = getattr(self._frames, "close", None)
+            if close is not None:
+                close()
+        finally:
+            if self._label is not None:
+                self._router.metrics.end(self._label, self._t0, self._ok)
+
 
 class RequestRouter:
     def __init__(self):
         self.crypto = CryptoService(FERNET_KEY)
 
-        self.users = UserRepository(USERS_FILE)
+        # Backend de almacenamiento (shared.config.STORAGE_BACKEND)
+        if STORAGE_BACKEND == "sqlite":
+            db = SqliteDatabase(SQLITE_FILE)
+            self.users = SqliteUserRepository(db)
+            graph_repo = SqliteGraphRepository(db)
+        else:
+            self.users = UserRepository(USERS_FILE)
+            graph_repo = GraphRepository(GRAPH_FILE)
         self.auth = AuthService(self.users)
 
-        self.graph = GraphService(GraphRepository(GRAPH_FILE))
-        self.path = PathService(self.graph)
+        self.graph = GraphService(graph_repo)
+        self.cache = QueryCache(QUERY_CACHE_SIZE, selective=QUERY_CACHE_SELECTIVE)
+        self.graph.add_listener(self.cache.on_graph_change)
+        self.path = PathService(self.graph, cache=self.cache)
         self.stats = StatsService(self.graph)
+        # Las entradas invalidadas se recalculan con recommend.start() (server/main.py)
+        self.recommend = RecommendService(
+            self.graph, refresh_interval=RECOMMEND_REFRESH_INTERVAL, refresh_batch=RECOMMEND_REFRESH_BATCH
+        )
+        # Las tablas se calculan recién con distance.start() (lo hace server/main.py)
+        self.distance: DistanceOracle | None = None
+        if DISTANCE_ORACLE_ENABLED:
+            self.distance = DistanceOracle(
+                self.graph, self.path, landmarks=DISTANCE_LANDMARKS, refresh_interval=DISTANCE_REFRESH_INTERVAL
+            )
+
+        # None si están deshabilitadas: handle() va directo a _dispatch()
+        self.metrics: MetricsRegistry | None = MetricsRegistry(MESSAGE_TYPES) if METRICS_ENABLED else None
+        # Desarmado salvo que lo pida un PROFILE o el GUI
+        self.profiler = RequestProfiler(PROFILE_DIR, max_seconds=PROFILE_MAX_SECONDS)
+
+        # Las threads se crean recién con el primer BATCH paralelo
+        self._batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
 
     def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Respuesta para req. FRIENDS_PAGE con stream=True retorna en cambio un
+        iterador de respuestas (una por frame, con "more").
+        """
+        with tracing.span("handle"):
+            metrics = self.metrics
+            if metrics is None:
+                resp = self._run(req)
+                return resp if isinstance(resp, dict) else _Stream(self, req, resp)
+            label = metrics.label(req.get("type"))
+            t0 = metrics.begin(label)
+            try:
+                resp = self._run(req)
+            except BaseException:
+                metrics.end(label, t0, False)
+                raise
+            if not isinstance(resp, dict):
+                # El stream sigue en vuelo hasta el último frame o su close()
+                return _Stream(self, req, resp, label, t0)
+            metrics.end(label, t0, resp.get("status") == "ok")
+            return resp
+
+    def _run(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        msg_type = req.get("type")
+        if self.profiler.armed and msg_type != "PROFILE":
+            return self.profiler.call(msg_type, self._dispatch, req)
+        return self._dispatch(req)
+
+    def _dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
         msg_type = req.get("type")
 
         try:
@@ -34,6 +185,19 @@ class RequestRouter:
             if msg_type == "PING":
                 return {"status": "ok", "data": {"pong": True}}
 
+            # ----------------
+            # Batch: varias sub-requests en un solo round trip
+            # ----------------
+            if msg_type == "BATCH":
+                payload = req.get("payload", {})
+                items = payload.get("requests", [])
+                if not isinstance(items, list):
+                    return {"status": "error", "error": "requests must be a list"}
+                if len(items) > BATCH_MAX_ITEMS:
+                    return {"status": "error", "error": f"Too many requests (max {BATCH_MAX_ITEMS})"}
+                results = self._handle_batch(items, parallel=bool(payload.get("parallel", False)))
+                return {"status": "ok", "data": {"results": results}}
+
             # ----------------
             # Auth (003, 006, 007)
             # ----------------
@@ -65,8 +229,10 @@ class RequestRouter:
             if msg_type == "SEARCH_USER":
                 payload = req.get("payload", {})
                 query = payload.get("query", "")
-                results = self.users.search_by_name(query)
-                return {"status": "ok", "data": {"results": results}}
+                limit = int(payload.get("limit", SEARCH_DEFAULT_LIMIT))
+                limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+                results, next_cursor = self.users.search(query, limit=limit, cursor=payload.get("cursor"))
+                return {"status": "ok", "data": {"results": results, "next_cursor": next_cursor}}
 
             # ----------------
             # Profile (008)
@@ -75,36 +241,40 @@ class RequestRouter:
                 payload = req.get("payload", {})
                 my_id = payload.get("user_id", "")
 
-                me = self.users.get_by_id(my_id)
+                fields = self._profile_fields(payload)
+                if fields is None:
+                    return {"status": "error", "error": "Invalid fields"}
+
+                me = self.users.get_many([my_id], fields)
                 if not me:
                     return {"status": "error", "error": "User not found"}
 
-                friend_ids = self.graph.friends_of(my_id)
-                friends = []
-                for fid in friend_ids:
-                    fu = self.users.get_by_id(fid)
-                    if fu:
-                        friends.append(
-                            {
-                                "id": fu["id"],
-                                "name": fu["name"],
-                                "lastname": fu["lastname"],
-                                "username": fu["username"],
-                            }
-                        )
-
-                return {
-                    "status": "ok",
-                    "data": {
-                        "me": {
-                            "id": me["id"],
-                            "name": me["name"],
-                            "lastname": me["lastname"],
-                            "username": me["username"],
-                        },
-                        "friends": friends,
-                    },
-                }
+                # Todos los amigos en una sola pasada por el repositorio
+                friends = self.users.get_many(self.graph.friends_of(my_id), fields)
+                return {"status": "ok", "data": {"me": me[0], "friends": friends}}
+
+            # ----------------
+            # Amigos paginados (cursor = último id entregado)
+            # ----------------
+            if msg_type == "FRIENDS_PAGE":
+                payload = req.get("payload", {})
+                user_id = payload.get("user_id", "")
+                fields = self._profile_fields(payload)
+                if fields is None:
+                    return {"status": "error", "error": "Invalid fields"}
+                if not self.users.get_by_id(user_id):
+                    return {"status": "error", "error": "User not found"}
+                limit = int(payload.get("limit", FRIENDS_PAGE_DEFAULT_LIMIT))
+                limit = max(1, min(limit, FRIENDS_PAGE_MAX_LIMIT))
+                cursor = payload.get("cursor")
+
+                if payload.get("stream"):
+                    # Varios frames con "more"; el server los envía a medida que se generan
+                    return self._stream_friends(user_id, cursor, limit, fields)
+
+                ids, next_cursor = self.graph.friends_page(user_id, cursor, limit)
+                friends = self.users.get_many(ids, fields)
+                return {"status": "ok", "data": {"friends": friends, "next_cursor": next_cursor}}
 
             # ----------------
             # Friendship (add/remove)
@@ -134,6 +304,34 @@ class RequestRouter:
                 self.graph.remove_friendship(a, b)
                 return {"status": "ok", "data": {"removed": True}}
 
+            # ----------------
+            # Amigos en común y sugerencias ("personas que quizás conozcas")
+            # ----------------
+            if msg_type == "MUTUAL_FRIENDS":
+                payload = req.get("payload", {})
+                a = payload.get("a")
+                b = payload.get("b")
+                if not a or not b:
+                    return {"status": "error", "error": "Missing a/b"}
+                fields = self._profile_fields(payload)
+                if fields is None:
+                    return {"status": "error", "error": "Invalid fields"}
+                mutual = self.users.get_many(self.recommend.mutual_friends(a, b), fields)
+                return {"status": "ok", "data": {"count": len(mutual), "mutual": mutual}}
+
+            if msg_type == "RECOMMEND":
+                payload = req.get("payload", {})
+                user_id = payload.get("user_id", "")
+                if not self.users.get_by_id(user_id):
+                    return {"status": "error", "error": "User not found"}
+                k = int(payload.get("k", RECOMMEND_DEFAULT_K))
+                k = max(1, min(k, RECOMMEND_MAX_K))
+                top = self.recommend.recommend(user_id, k, payload.get("method", ADAMIC_ADAR))
+                scores = dict(top)
+                users = self.users.get_many([uid for uid, _ in top], PROFILE_DEFAULT_FIELDS)
+                results = [dict(u, score=scores[u["id"]]) for u in users]
+                return {"status": "ok", "data": {"results": results}}
+
             # ----------------
             # ID 010: Path between two users (server-side)
             # ----------------
@@ -145,17 +343,147 @@ class RequestRouter:
                 if not src or not dst:
                     return {"status": "error", "error": "Missing src/dst"}
 
-                path = self.path.find_path_bfs(src, dst)
+                max_depth = payload.get("max_depth")
+                path = self.path.find_path_bfs(src, dst, max_depth=int(max_depth) if max_depth is not None else None)
                 return {"status": "ok", "data": {"exists": len(path) > 0, "path": path}}
 
+            # ----------------
+            # Grados de separación aproximados (landmarks); exact=True fuerza BFS
+            # ----------------
+            if msg_type == "DISTANCE_ESTIMATE":
+                if self.distance is None:
+                    return {"status": "error", "error": "Distance oracle disabled"}
+                payload = req.get("payload", {})
+                a = payload.get("a")
+                b = payload.get("b")
+                if not a or not b:
+                    return {"status": "error", "error": "Missing a/b"}
+                est = self.distance.estimate(a, b, exact=bool(payload.get("exact", False)))
+                return {"status": "ok", "data": est}
+
             # ----------------
             # ID 011: Graph stats (server-side)
             # ----------------
             if msg_type == "GRAPH_STATS":
-                stats = self.stats.compute_stats()
+                payload = req.get("payload", {})
+                stats = self.stats.compute_stats(verify=bool(payload.get("verify", False)))
                 return {"status": "ok", "data": stats}
 
+            # ----------------
+            # Contadores de la caché de consultas
+            # ----------------
+            if msg_type == "CACHE_STATS":
+                return {"status": "ok", "data": self.cache.stats()}
+
+            # ----------------
+            # Métricas por tipo de mensaje (JSON o texto de Prometheus)
+            # ----------------
+            if msg_type == "METRICS":
+                if self.metrics is None:
+                    return {"status": "error", "error": "Metrics disabled"}
+                payload = req.get("payload", {})
+                if payload.get("format") == "prometheus":
+                    data = {"text": self.metrics.prometheus_text()}
+                else:
+                    data = self.metrics.snapshot()
+                if payload.get("reset"):
+                    self.metrics.reset()
+                return {"status": "ok", "data": data}
+
+            # ----------------
+            # Perfilado bajo demanda: start (próximas N requests / T segundos), stop, status
+            # ----------------
+            if msg_type == "PROFILE":
+                payload = req.get("payload", {})
+                action = payload.get("action", "status")
+                if action == "start":
+                    types = payload.get("types")
+                    if types is not None and not isinstance(types, list):
+                        return {"status": "error", "error": "types must be a list"}
+                    requests = payload.get("requests")
+                    seconds = payload.get("seconds")
+                    session = self.profiler.start(
+                        requests=int(requests) if requests is not None else None,
+                        seconds=float(seconds) if seconds is not None else None,
+                        types=types,
+                        mode=payload.get("mode", "cprofile"),
+                    )
+                    return {"status": "ok", "data": {"started": session}}
+                if action == "stop":
+                    return {"status": "ok", "data": {"result": self.profiler.stop()}}
+                if action == "status":
+                    return {"status": "ok", "data": self.profiler.status()}
+                return {"status": "error", "error": "Invalid action"}
+
             return {"status": "error", "error": f"Unknown type: {msg_type}"}
 
         except Exception as e:
             return {"status": "error", "error": str(e)}
+
+    @staticmethod
+    def _profile_fields(payload: Dict[str, Any]) -> Optional[Sequence[str]]:
+        fields = payload.get("fields") or PROFILE_DEFAULT_FIELDS
+        if not isinstance(fields, (list, tuple)) or not set(fields) <= set(PROFILE_FIELDS):
+            return None
+        return fields
+
+    def _stream_friends(self, user_id: str, cursor: Optional[str], limit: int, fields: Sequence[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Todas las páginas desde cursor, sobre una misma versión del grafo.
+        Cada frame lleva "more"; el último tiene more=False.
+        """
+        snap = self.graph.current()
+        try:
+            while True:
+                ids, cursor = self.graph.friends_page(user_id, cursor, limit, snap=snap)
+                friends = self.users.get_many(ids, fields)
+                more = cursor is not None
+                yield {"status": "ok", "data": {"friends": friends, "next_cursor": cursor}, "more": more}
+                if not more:
+                    return
+        except Exception as e:
+            yield {"status": "error", "error": str(e), "more": False}
+
+    def _handle_batch(self, items: List[Dict[str, Any]], parallel: bool) -> List[Dict[str, Any]]:
+        """
+        Despacha cada sub-request con handle(), respetando el orden.
+        Con parallel=True, los tramos consecutivos de lecturas corren en paralelo;
+        las escrituras hacen de barrera para no reordenar efectos.
+        """
+        results: List[Dict[str, Any]] = []
+        i = 0
+        while i < len(items):
+            item = items[i]
+            if not parallel or not self._is_read_only(item):
+                results.append(self._handle_batch_item(item))
+                i += 1
+                continue
+
+            j = i
+            while j < len(items) and self._is_read_only(items[j]):
+                j += 1
+            run = items[i:j]
+            if len(run) == 1:
+                results.append(self._handle_batch_item(run[0]))
+            else:
+                results.extend(self._batch_pool.map(tracing.wrap(self._handle_batch_item), run))
+            i = j
+        return results
+
+    def _handle_batch_item(self, item: Any) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            return {"status": "error", "error": "Invalid request"}
+        if item.get("type") == "BATCH":
+            return {"status": "error", "error": "Nested BATCH not allowed"}
+        resp = self.handle(item)
+        if not isinstance(resp, dict):
+            resp.close()
+            return {"status": "error", "error": "Streaming not allowed in BATCH"}
+        return resp
+
+    @staticmethod
+    def _is_read_only(item: Any) -> bool:
+        if not isinstance(item, dict) or item.get("type") not in READ_ONLY_TYPES:
+            return False
+        payload = item.get("payload")
+        return not (item["type"] == "METRICS" and isinstance(payload, dict) and payload.get("reset"))
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from server.core.user_repo import UserRepository
+from shared import tracing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id             TEXT PRIMARY KEY,
+    name           TEXT NOT NULL,
+    lastname       TEXT NOT NULL,
+    username       TEXT NOT NULL,
+    username_lower TEXT NOT NULL UNIQUE,
+    password_hash  TEXT NOT NULL,
+    photo_path     TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+-- Cada arista no dirigida se guarda una sola vez con a < b
+CREATE TABLE IF NOT EXISTS edges (
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_b ON edges (b, a);
+"""
+
+# Sentencias fijas y parametrizadas: sqlite3 las mantiene compiladas en su cache
+SQL_SELECT_USERS = "SELECT id, name, lastname, username, password_hash, photo_path FROM users ORDER BY rowid"
+SQL_INSERT_USER = (
+    "INSERT INTO users (id, name, lastname, username, username_lower, password_hash, photo_path) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_INSERT_USER_IF_NEW = SQL_INSERT_USER.replace("INSERT", "INSERT OR IGNORE", 1)
+SQL_SELECT_NODES = "SELECT id FROM nodes"
+SQL_SELECT_EDGES = "SELECT a, b FROM edges"
+SQL_INSERT_NODE = "INSERT OR IGNORE INTO nodes (id) VALUES (?)"
+SQL_INSERT_EDGE = "INSERT OR IGNORE INTO edges (a, b) VALUES (?, ?)"
+SQL_DELETE_EDGE = "DELETE FROM edges WHERE a = ? AND b = ?"
+
+
+def _edge_key(a: str, b: str):
+    return (a, b) if a < b else (b, a)
+
+
+def edge_keys(adj: Dict[str, Iterable[str]]) -> Set[tuple]:
+    return {_edge_key(a, b) for a, friends in adj.items() for b in friends if a != b}
+
+
+def user_row(u: Dict[str, Any]) -> tuple:
+    return (u["id"], u["name"], u["lastname"], u["username"], u["username"].lower(),
+            u["password_hash"], u.get("photo_path", ""))
+
+
+class SqliteDatabase:
+    """
+    Conexión única a la base local (usuarios + amistades), en modo WAL.
+    Se comparte entre repositorios y se serializa con un lock.
+    """
+
+    def __init__(self, path: str):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class SqliteUserRepository(UserRepository):
+    """
+    Mismo contrato que UserRepository (índices en memoria), pero cada alta es un INSERT.
+    """
+
+    def __init__(self, db: SqliteDatabase):
+        self.file_path = db.path
+        self.db = db
+        self._open()
+
+    def _load(self) -> List[Dict[str, Any]]:
+        with self.db.lock:
+            rows = self.db.conn.execute(SQL_SELECT_USERS).fetchall()
+        return [
+            {"id": r[0], "name": r[1], "lastname": r[2], "username": r[3], "password_hash": r[4], "photo_path": r[5]}
+            for r in rows
+        ]
+
+    def _append(self, user: Dict[str, Any]) -> None:
+        try:
+            with tracing.span("users._append"), self.db.lock, self.db.conn:
+                self.db.conn.execute(SQL_INSERT_USER, user_row(user))
+        except sqlite3.IntegrityError:
+            raise ValueError("Username already exists")
+
+
+class SqliteGraphRepository:
+    """
+    Mismo contrato que GraphRepository. Cada mutación se aplica directamente en la
+    tabla de aristas, así que no hace falta compactar.
+    """
+
+    needs_compaction = False
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def load(self) -> Dict[str, List[str]]:
+        adj: Dict[str, Set[str]] = {}
+        with self.db.lock:
+            for (n,) in self.db.conn.execute(SQL_SELECT_NODES):
+                adj.setdefault(n, set())
+            for a, b in self.db.conn.execute(SQL_SELECT_EDGES):
+                adj.setdefault(a, set()).add(b)
+                adj.setdefault(b, set()).add(a)
+        return {k: sorted(v) for k, v in adj.items()}
+
+    def append(self, op: str, a: str, b: Optional[str] = None) -> None:
+        with tracing.span("graph.append"), self.db.lock, self.db.conn:
+            if op == "node":
+                self.db.conn.execute(SQL_INSERT_NODE, (a,))
+            elif op == "add":
+                self.db.conn.executemany(SQL_INSERT_NODE, [(a,), (b,)])
+                self.db.conn.execute(SQL_INSERT_EDGE, _edge_key(a, b))
+            elif op == "remove":
+                self.db.conn.execute(SQL_DELETE_EDGE, _edge_key(a, b))
+
+    def save(self, adj: Dict[str, List[str]]) -> None:
+        with tracing.span("graph.save"), self.db.lock, self.db.conn:
+            self.db.conn.execute("DELETE FROM edges")
+            self.db.conn.execute("DELETE FROM nodes")
+            self.db.conn.executemany(SQL_INSERT_NODE, [(k,) for k in adj])
+            self.db.conn.executemany(SQL_INSERT_EDGE, edge_keys(adj))
+
+    def close(self) -> None:
+        pass
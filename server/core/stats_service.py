@@ -1,20 +1,64 @@
 from typing import Any, Dict, List
 
+from server.core.component_index import UnionFind
 from server.core.graph_service import GraphService
+from server.core.graph_snapshot import GraphSnapshot
+
+COMPONENT_KEYS = ("components", "largest_component", "component_sizes")
 
 
 class StatsService:
     def __init__(self, graph: GraphService):
         self.graph = graph
 
-    def compute_stats(self) -> Dict[str, Any]:
+    def compute_stats(self, verify: bool = False) -> Dict[str, Any]:
         """
         Devuelve:
         - max_user_id, max_friends
         - min_user_id, min_friends
         - avg_friends
+        - nodes, edges, isolated_users
+        - degree_histogram (grado -> cantidad de usuarios), percentiles (p50/p90/p99)
+        - components, largest_component, component_sizes (tamaño -> cantidad)
+        - components_stale: True si hubo bajas de aristas que el índice de componentes
+          todavía no reconstruyó; los tres valores anteriores son los de la última
+          reconstrucción (verify no los compara)
+
+        Sale del índice de grados de GraphService (no recorre el grafo).
+        Con verify=True además recalcula todo desde el snapshot de la misma versión
+        y agrega "verified" y "mismatches".
+        """
+        snap, stats = self.graph.stats_view()
+        # JSON no admite claves int
+        stats["degree_histogram"] = {str(d): c for d, c in stats["degree_histogram"].items()}
+        comps = self.graph.component_stats(snap)
+        comps["component_sizes"] = {str(s): c for s, c in comps["component_sizes"].items()}
+        stats.update(comps)
+        if verify:
+            full = self._compute(snap)
+            skip = COMPONENT_KEYS if stats["components_stale"] else ()
+            mismatches = [
+                k for k, v in full.items() if k not in skip and not self._same(k, stats[k], v, full, snap)
+            ]
+            stats["verified"] = not mismatches
+            stats["mismatches"] = mismatches
+        return stats
+
+    @staticmethod
+    def _same(key: str, got: Any, expected: Any, full: Dict[str, Any], snap: GraphSnapshot) -> bool:
+        # Con empates, cualquier usuario con el grado extremo es válido
+        if key == "max_user_id":
+            return got is None if expected is None else len(snap.get(got, ())) == full["max_friends"]
+        if key == "min_user_id":
+            return got is None if expected is None else len(snap.get(got, ())) == full["min_friends"]
+        if key == "avg_friends":
+            return abs(got - expected) < 1e-9
+        return got == expected
+
+    def _compute(self, adj: GraphSnapshot) -> Dict[str, Any]:
+        """
+        Recalculo completo O(V) desde el snapshot (modo verificación).
         """
-        adj = self.graph.snapshot()
         users: List[str] = list(adj.keys())
 
         if not users:
@@ -24,6 +68,13 @@ class StatsService:
                 "min_user_id": None,
                 "min_friends": 0,
                 "avg_friends": 0.0,
+                "nodes": 0,
+                "edges": 0,
+                "isolated_users": 0,
+                "degree_histogram": {},
+                "components": 0,
+                "largest_component": 0,
+                "component_sizes": {},
             }
 
         degrees = {u: len(adj[u]) for u in users}
@@ -31,10 +82,24 @@ class StatsService:
         min_user = min(users, key=lambda u: degrees[u])
         avg = sum(degrees.values()) / len(users)
 
+        hist: Dict[int, int] = {}
+        for d in degrees.values():
+            hist[d] = hist.get(d, 0) + 1
+
+        uf = UnionFind.from_adjacency(adj)
+        sizes = uf.size_histogram()
+
         return {
             "max_user_id": max_user,
             "max_friends": degrees[max_user],
             "min_user_id": min_user,
             "min_friends": degrees[min_user],
             "avg_friends": avg,
+            "nodes": len(users),
+            "edges": sum(degrees.values()) // 2,
+            "isolated_users": hist.get(0, 0),
+            "degree_histogram": {str(d): c for d, c in sorted(hist.items())},
+            "components": uf.count,
+            "largest_component": max(sizes),
+            "component_sizes": {str(s): c for s, c in sizes.items()},
         }
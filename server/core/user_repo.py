@@ -1,64 +1,137 @@
 import json
 import os
+import threading
 import uuid
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Sequence, Tuple
+
+from server.core.ngram_index import NgramIndex
+from shared import tracing
 
 class UserRepository:
+    """
+    Repositorio de usuarios en memoria con persistencia write-through a users.json.
+    Se carga una sola vez al iniciar y mantiene índices hash por id y username (lower).
+    """
+
     def __init__(self, file_path: str):
         self.file_path = file_path
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         if not os.path.exists(file_path):
             with open(file_path, "w", encoding="utf-8") as f:
                 json.dump([], f)
+        self._open()
+
+    def _open(self) -> None:
+        # Compartido con las subclases: lock e índices en memoria desde _load()
+        self._lock = threading.RLock()
+        self._users: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_username: Dict[str, Dict[str, Any]] = {}
+        self._index(self._load())
+
+    def _index(self, users: List[Dict[str, Any]]) -> None:
+        self._users = list(users)
+        self._by_id = {u["id"]: u for u in self._users}
+        self._by_username = {u["username"].lower(): u for u in self._users}
+        self._search = NgramIndex()
+        for u in self._users:
+            self._search.add(u["id"], self._search_fields(u))
+
+    @staticmethod
+    def _search_fields(u: Dict[str, Any]) -> Tuple[str, str]:
+        return (f"{u['name']} {u['lastname']}", u["username"])
+
+    @staticmethod
+    def _public(u: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": u["id"], "name": u["name"], "lastname": u["lastname"], "username": u["username"], "photo_path": u.get("photo_path","")}
 
     def _load(self) -> List[Dict[str, Any]]:
         with open(self.file_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
     def _save(self, users: List[Dict[str, Any]]) -> None:
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        # Escribimos a un temporal y reemplazamos: si falla a mitad, users.json queda intacto
+        tmp = self.file_path + ".tmp"
+        with tracing.span("users._save"):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(users, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.file_path)
+
+    def _append(self, user: Dict[str, Any]) -> None:
+        # En JSON agregar un usuario implica reescribir el archivo completo
+        self._save(self._users + [user])
 
     def find_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        users = self._load()
-        for u in users:
-            if u["username"].lower() == username.lower():
-                return u
-        return None
+        with self._lock:
+            u = self._by_username.get(username.lower())
+            return dict(u) if u else None
 
     def create_user(self, name: str, lastname: str, username: str, password_hash: str) -> Dict[str, Any]:
-        users = self._load()
-        if self.find_by_username(username) is not None:
-            raise ValueError("Username already exists")
-
-        user = {
-            "id": str(uuid.uuid4()),
-            "name": name,
-            "lastname": lastname,
-            "username": username,
-            "password_hash": password_hash,
-            "photo_path": ""  # luego lo usamos
-        }
-        users.append(user)
-        self._save(users)
-        return user
+        with self._lock:
+            key = username.lower()
+            if key in self._by_username:
+                raise ValueError("Username already exists")
+
+            user = {
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "lastname": lastname,
+                "username": username,
+                "password_hash": password_hash,
+                "photo_path": ""  # luego lo usamos
+            }
+            # Persistimos primero: si el disco falla, la memoria no queda adelantada
+            self._append(user)
+            self._users.append(user)
+            self._by_id[user["id"]] = user
+            self._by_username[key] = user
+            self._search.add(user["id"], self._search_fields(user))
+            return dict(user)
 
     def search_by_name(self, query: str):
-        q = query.strip().lower()
-        users = self._load()
-        results = []
-        for u in users:
-            full = f"{u['name']} {u['lastname']}".lower()
-            if q in full:
-                results.append({"id": u["id"], "name": u["name"], "lastname": u["lastname"], "username": u["username"], "photo_path": u.get("photo_path","")})
+        results, _ = self.search(query)
         return results
-    
+
+    def search(self, query: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+        """
+        Búsqueda por substring en nombre, apellido y username usando el índice de trigramas.
+        Retorna (results, next_cursor); next_cursor es None cuando no hay más páginas.
+        """
+        try:
+            offset = int(cursor) if cursor else 0
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+
+        with self._lock:
+            if limit is None:
+                ids = self._search.search(query)
+                end = len(ids)
+            else:
+                end = offset + max(0, limit)
+                # Pedimos uno de más para saber si hay otra página
+                ids = self._search.search(query, limit=end + 1)
+            page = [self._public(self._by_id[i]) for i in ids[offset:end]]
+        next_cursor = str(end) if len(ids) > end else None
+        return page, next_cursor
+
     def get_by_id(self, user_id: str):
-        users = self._load()
-        for u in users:
-            if u["id"] == user_id:
-                return u
-        return None
-    
+        with self._lock:
+            u = self._by_id.get(user_id)
+            return dict(u) if u else None
+
+    def get_many(self, user_ids: Iterable[str], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Usuarios de user_ids en ese orden, resueltos con una sola toma del lock.
+        Los ids inexistentes se omiten. fields proyecta cada usuario a esas claves.
+        """
+        with self._lock:
+            found = [u for u in map(self._by_id.get, user_ids) if u is not None]
+        if fields is None:
+            return [dict(u) for u in found]
+        return [{f: u.get(f) for f in fields} for u in found]
+
     def list_all(self):
-        return self._load()
+        with self._lock:
+            return [dict(u) for u in self._users]
@@ -1,16 +1,23 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import networkx as nx
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from server.core.graph_service import GraphService
+from server.core.metrics import MetricsRegistry
 from server.core.path_service import PathService
+from server.core.profiler import RequestProfiler
 from server.core.stats_service import StatsService
 from server.core.user_repo import UserRepository
 
+# Cada cuánto se redibuja el panel de métricas
+METRICS_REFRESH_MS = 1000
+# Botón de perfilado: cantidad de requests de la sesión
+PROFILE_GUI_REQUESTS = 200
+
 
 class ServerGUI:
     def __init__(
@@ -20,22 +27,32 @@ class ServerGUI:
         path_service: PathService,
         stats_service: StatsService,
         users: UserRepository,
+        metrics: Optional[MetricsRegistry] = None,
+        profiler: Optional[RequestProfiler] = None,
     ):
         self.root = root
         self.graph = graph
         self.path_service = path_service
         self.stats_service = stats_service
         self.users = users
+        self.metrics = metrics
+        self.profiler = profiler
 
         # Mapeo: texto mostrado -> user_id real
         self.user_choices: List[str] = []
         self.choice_to_id: Dict[str, str] = {}
 
+        # Layout del último render, por versión del grafo: si no cambió, no se recalcula
+        self._layout_version: int | None = None
+        self._layout: Tuple[Any, Dict[str, Any], Dict[str, str]] | None = None
+
         self.root.title("SocialTec - Server")
         self.root.geometry("1050x680")
 
         self._build_layout()
         self.refresh_users()  # carga inicial
+        if self.metrics is not None:
+            self._refresh_metrics()
 
     def _build_layout(self):
         main = ttk.Frame(self.root, padding=10)
@@ -82,6 +99,25 @@ class ServerGUI:
 
         ttk.Button(graph_frame, text="Renderizar grafo", command=self.on_render_graph).pack(fill=tk.X, pady=4)
 
+        # ===== Perfilado bajo demanda =====
+        if self.profiler is not None:
+            prof_frame = ttk.LabelFrame(left, text="Perfilado", padding=10)
+            prof_frame.pack(fill=tk.X, pady=5)
+
+            ttk.Label(prof_frame, text="Tipos (vacío = todos):").pack(anchor="w")
+            self.prof_types = ttk.Entry(prof_frame)
+            self.prof_types.pack(fill=tk.X, pady=2)
+            self.prof_mode = ttk.Combobox(prof_frame, values=("cprofile", "sampling"), state="readonly")
+            self.prof_mode.current(0)
+            self.prof_mode.pack(fill=tk.X, pady=2)
+
+            btns = ttk.Frame(prof_frame)
+            btns.pack(fill=tk.X, pady=4)
+            ttk.Button(btns, text=f"Próximas {PROFILE_GUI_REQUESTS} requests", command=self.on_profile_start).pack(
+                side=tk.LEFT, fill=tk.X, expand=True
+            )
+            ttk.Button(btns, text="Detener", command=self.on_profile_stop).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=6)
+
         # ===== Output =====
         out_frame = ttk.LabelFrame(right, text="Salida", padding=10)
         out_frame.pack(fill=tk.BOTH, expand=False)
@@ -89,6 +125,19 @@ class ServerGUI:
         self.output = tk.Text(out_frame, height=16)
         self.output.pack(fill=tk.BOTH, expand=False)
 
+        # ===== Métricas por tipo de mensaje (se refresca sola) =====
+        if self.metrics is not None:
+            metrics_frame = ttk.LabelFrame(right, text="Métricas por tipo de mensaje", padding=10)
+            metrics_frame.pack(fill=tk.X, pady=(8, 0))
+            columns = ("requests", "errors", "in_flight", "p50_ms", "p99_ms", "kb_in", "kb_out")
+            self.metrics_tree = ttk.Treeview(metrics_frame, columns=columns, height=6)
+            self.metrics_tree.heading("#0", text="tipo")
+            self.metrics_tree.column("#0", width=140)
+            for c in columns:
+                self.metrics_tree.heading(c, text=c)
+                self.metrics_tree.column(c, width=70, anchor="e")
+            self.metrics_tree.pack(fill=tk.X)
+
         # ===== Canvas grafo =====
         viz_frame = ttk.LabelFrame(right, text="Visualización del grafo", padding=10)
         viz_frame.pack(fill=tk.BOTH, expand=True, pady=8)
@@ -105,6 +154,22 @@ class ServerGUI:
         self.output.insert(tk.END, msg + "\n")
         self.output.see(tk.END)
 
+    def _refresh_metrics(self):
+        snap = self.metrics.snapshot()
+        tree = self.metrics_tree
+        tree.delete(*tree.get_children())
+
+        def fmt(v):
+            return "-" if v is None else f"{v:g}"
+
+        for t, m in snap["types"].items():
+            lat = m["latency_ms"]
+            tree.insert("", tk.END, text=t, values=(
+                m["requests"], m["errors"], m["in_flight"], fmt(lat["p50"]), fmt(lat["p99"]),
+                f"{m['bytes_in'] / 1024:.1f}", f"{m['bytes_out'] / 1024:.1f}",
+            ))
+        self.root.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
     def on_clear(self):
         self.output.delete("1.0", tk.END)
 
@@ -117,10 +182,17 @@ class ServerGUI:
 
 
     def _user_label(self, user_id: str) -> str:
-        u = self.users.get_by_id(user_id)
-        if not u:
-            return user_id
-        return f"{u.get('username','?')} — {u.get('name','')} {u.get('lastname','')} ({user_id[:6]}...)"
+        return self._user_labels([user_id])[user_id]
+
+    def _user_labels(self, user_ids) -> dict:
+        # Una sola consulta al repositorio para todos los ids
+        ids = list(user_ids)
+        found = {u["id"]: u for u in self.users.get_many(ids, ("id", "username", "name", "lastname"))}
+        labels = {}
+        for uid in ids:
+            u = found.get(uid)
+            labels[uid] = f"{u['username']} — {u['name']} {u['lastname']} ({uid[:6]}...)" if u else uid
+        return labels
 
 
 
@@ -176,10 +248,12 @@ class ServerGUI:
 
         path = self.path_service.find_path_bfs(src, dst)
         if not path:
-            self._log(f"[PATH] No existe camino entre {self._user_label(src)} y {self._user_label(dst)}")
+            labels = self._user_labels([src, dst])
+            self._log(f"[PATH] No existe camino entre {labels[src]} y {labels[dst]}")
             return
 
-        pretty = " -> ".join(self._user_label(x) for x in path)
+        labels = self._user_labels(path)
+        pretty = " -> ".join(labels[x] for x in path)
         self._log(f"[PATH] Camino encontrado ({len(path)-1} saltos): {pretty}")
 
     def on_stats(self):
@@ -188,18 +262,51 @@ class ServerGUI:
         self._log(f"  - max_user_id: {stats['max_user_id']}  (amigos: {stats['max_friends']})")
         self._log(f"  - min_user_id: {stats['min_user_id']}  (amigos: {stats['min_friends']})")
         self._log(f"  - avg_friends: {stats['avg_friends']:.2f}")
+        self._log(f"  - nodos: {stats['nodes']}  aristas: {stats['edges']}  aislados: {stats['isolated_users']}")
+        pct = stats["percentiles"]
+        self._log(f"  - grado p50/p90/p99: {pct['p50']}/{pct['p90']}/{pct['p99']}")
+        self._log(f"  - componentes: {stats['components']}  (la mayor: {stats['largest_component']} usuarios)")
+
+    def on_profile_start(self):
+        types = [t.strip().upper() for t in self.prof_types.get().split(",") if t.strip()]
+        try:
+            self.profiler.start(requests=PROFILE_GUI_REQUESTS, types=types or None, mode=self.prof_mode.get())
+        except ValueError as e:
+            self._log(f"[PROFILE] Error: {e}")
+            return
+        self._log(f"[PROFILE] Perfilando las próximas {PROFILE_GUI_REQUESTS} requests ({', '.join(types) or 'todos los tipos'}).")
+
+    def on_profile_stop(self):
+        result = self.profiler.stop() or self.profiler.last
+        if result is None:
+            self._log("[PROFILE] No hay perfilado en curso.")
+            return
+        self._log(f"[PROFILE] {result['requests']} requests en {result['elapsed_s']:.1f}s -> {result['file']}")
+        for row in result.get("top", [])[:10]:
+            self._log(f"  - {row['cumtime_s'] * 1e3:9.1f} ms  {row['calls']:>7}  {row['function']}")
 
     def on_render_graph(self):
-        snap = self.graph.snapshot()
+        snap = self.graph.current()
 
-        G = nx.Graph()
-        for u in snap.keys():
-            G.add_node(u)
+        if self._layout_version != snap.version or self._layout is None:
+            G = nx.Graph()
+            for u in snap.keys():
+                G.add_node(u)
 
-        for u, friends in snap.items():
-            for v in friends:
-                if u != v:
-                    G.add_edge(u, v)
+            for u, friends in snap.items():
+                for v in friends:
+                    if u != v:
+                        G.add_edge(u, v)
+
+            labels = {node: node[:6] for node in G.nodes}
+            for u in self.users.get_many(G.nodes, ("id", "name", "lastname")):
+                labels[u["id"]] = f"{u['name']} {u['lastname'][:1]}."
+
+            pos = nx.spring_layout(G, seed=42) if len(G.nodes) else {}
+            self._layout = (G, pos, labels)
+            self._layout_version = snap.version
+
+        G, pos, labels = self._layout
 
         self.ax.clear()
         self.ax.axis("off")
@@ -209,16 +316,7 @@ class ServerGUI:
             self.canvas.draw()
             return
 
-        labels = {}
-        for node in G.nodes:
-            u = self.users.get_by_id(node)
-            if u:
-                labels[node] = f"{u['name']} {u['lastname'][:1]}."
-            else:
-                labels[node] = node[:6]
-
-        pos = nx.spring_layout(G, seed=42)
         nx.draw_networkx(G, pos=pos, ax=self.ax, labels=labels, font_size=8, node_size=900)
 
         self.canvas.draw()
-        self._log(f"[GRAFO] Renderizado: {len(G.nodes)} nodos, {len(G.edges)} aristas.")
+        self._log(f"[GRAFO] Renderizado (v{snap.version}): {len(G.nodes)} nodos, {len(G.edges)} aristas.")
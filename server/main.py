@@ -1,18 +1,54 @@
+import os
 import threading
 import tkinter as tk
 
-from shared.config import HOST, PORT
+from shared.config import (
+    HOST,
+    PORT,
+    SERVER_MODE,
+    MAX_CONNECTIONS,
+    WORKER_THREADS,
+    REQUEST_QUEUE_SIZE,
+    IDLE_TIMEOUT,
+    METRICS_DUMP_FILE,
+    METRICS_DUMP_INTERVAL,
+    TRACE_SAMPLE_RATE,
+    TRACE_FILE,
+)
+from shared import tracing
 from server.net.tcp_server import TcpServer
+from server.net.async_tcp_server import AsyncTcpServer
 from server.core.router import RequestRouter
 
 from server.gui.server_gui import ServerGUI
 
 
 def main():
+    tracing.configure(TRACE_FILE, TRACE_SAMPLE_RATE)
     router = RequestRouter()
+    if router.distance is not None:
+        # Tablas del oráculo de distancias, recalculadas en segundo plano
+        router.distance.start()
+    # Recálculo de las recomendaciones invalidadas por escrituras
+    router.recommend.start()
+    if router.metrics is not None and METRICS_DUMP_FILE:
+        router.metrics.start_dump(METRICS_DUMP_FILE, METRICS_DUMP_INTERVAL)
 
-    # Server TCP en thread aparte
-    srv = TcpServer(HOST, PORT, handler=router.handle)
+    # Server TCP en thread aparte (SOCIALTEC_SERVER_MODE pisa shared.config.SERVER_MODE)
+    mode = os.environ.get("SOCIALTEC_SERVER_MODE", SERVER_MODE)
+    if mode == "asyncio":
+        srv = AsyncTcpServer(HOST, PORT, handler=router.handle, metrics=router.metrics)
+    else:
+        srv = TcpServer(
+            HOST,
+            PORT,
+            handler=router.handle,
+            max_connections=MAX_CONNECTIONS,
+            workers=WORKER_THREADS,
+            queue_size=REQUEST_QUEUE_SIZE,
+            idle_timeout=IDLE_TIMEOUT,
+            metrics=router.metrics,
+        )
     t = threading.Thread(target=srv.start, daemon=True)
     t.start()
 
@@ -24,6 +60,8 @@ def main():
         path_service=router.path,
         stats_service=router.stats,
         users=router.users,
+        metrics=router.metrics,
+        profiler=router.profiler,
     )
     root.mainloop()
 
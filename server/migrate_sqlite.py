@@ -0,0 +1,61 @@
+"""
+Migración única de users.json/graph.json (+ journal) a la base SQLite.
+
+Uso:
+    python -m server.migrate_sqlite [--users ...] [--graph ...] [--db ...]
+
+Es idempotente: usuarios y aristas ya presentes se ignoran.
+"""
+import argparse
+import json
+import os
+import sys
+
+from shared.config import USERS_FILE, GRAPH_FILE, SQLITE_FILE
+from server.core.graph_repo import GraphRepository
+from server.core.sqlite_repo import (
+    SqliteDatabase,
+    SQL_INSERT_EDGE,
+    SQL_INSERT_NODE,
+    SQL_INSERT_USER_IF_NEW,
+    edge_keys,
+    user_row,
+)
+
+
+def migrate(users_file: str, graph_file: str, db_path: str) -> dict:
+    users = []
+    if os.path.exists(users_file):
+        with open(users_file, "r", encoding="utf-8") as f:
+            users = json.load(f)
+
+    adj = GraphRepository(graph_file).load() if os.path.exists(graph_file) else {}
+
+    db = SqliteDatabase(db_path)
+    try:
+        with db.lock, db.conn:
+            db.conn.executemany(SQL_INSERT_USER_IF_NEW, [user_row(u) for u in users])
+            db.conn.executemany(SQL_INSERT_NODE, [(k,) for k in adj])
+            db.conn.executemany(SQL_INSERT_EDGE, edge_keys(adj))
+            n_users = db.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            n_edges = db.conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+    finally:
+        db.close()
+
+    return {"users": n_users, "edges": n_edges}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Migra los archivos JSON a SQLite")
+    ap.add_argument("--users", default=USERS_FILE)
+    ap.add_argument("--graph", default=GRAPH_FILE)
+    ap.add_argument("--db", default=SQLITE_FILE)
+    args = ap.parse_args(argv)
+
+    res = migrate(args.users, args.graph, args.db)
+    print(f"[MIGRATE] {res['users']} usuarios, {res['edges']} amistades -> {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from shared import tracing
+from shared.config import MAX_FRAME_SIZE
+from shared.protocol import JSON, MessageProtocol
+from server.core.metrics import MetricsRegistry
+from server.net.tcp_server import HandlerFn
+
+# Tipos baratos que se atienden directo en el event loop; el resto va al executor
+DEFAULT_INLINE_TYPES = ("PING",)
+
+
+class AsyncTcpServer:
+    """
+    Alternativa a TcpServer basada en asyncio: una sola thread atiende todas las
+    conexiones y los handlers pesados (BFS, stats, hashing) corren en un pool acotado.
+    Mismo framing (MessageProtocol) y mismo contrato de handler.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        handler: HandlerFn,
+        workers: Optional[int] = None,
+        inline_types: Iterable[str] = DEFAULT_INLINE_TYPES,
+        metrics: Optional[MetricsRegistry] = None,
+        max_frame_size: Optional[int] = MAX_FRAME_SIZE,
+    ):
+        self.host = host
+        self.port = port
+        self.handler = handler
+        self.inline_types = frozenset(inline_types)
+        # Tope de lo que manda el cliente (las respuestas no se limitan)
+        self.max_frame_size = max_frame_size
+        # Sólo bytes por tipo; el resto lo registra el handler (RequestRouter.handle)
+        self.metrics = metrics
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="handler")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.ready = threading.Event()
+
+    def start(self) -> None:
+        # Bloqueante, igual que TcpServer.start
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    async def serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._client_loop, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"[SERVER] (asyncio) Listening on {self.host}:{self.port}")
+        self.ready.set()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, req: Dict[str, Any], resp: Dict[str, Any], codec: str) -> int:
+        if "id" in req:
+            resp = dict(resp, id=req["id"])
+        return await MessageProtocol.send_async(writer, resp, codec)
+
+    async def _client_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+        try:
+            codec = JSON
+            while True:
+                # Cada conexión es su propia task: la traza no se mezcla con otras
+                trace = tracing.begin()
+                try:
+                    req, received = await MessageProtocol.recv_async_sized(reader, codec, self.max_frame_size)
+                    tracing.set_type(req.get("type"))
+                    if req.get("type") == "HELLO":
+                        resp, codec_next = MessageProtocol.negotiate(req)
+                        await MessageProtocol.send_async(writer, resp)
+                        codec = codec_next
+                        continue
+                    if req.get("type") in self.inline_types:
+                        resp = self.handler(req)
+                    else:
+                        # run_in_executor no copia el contexto: wrap lo hace si hay traza
+                        resp = await self._loop.run_in_executor(self._executor, tracing.wrap(self.handler), req)
+                    if isinstance(resp, dict):
+                        sent = await self._send(writer, req, resp, codec)
+                    else:
+                        # Modo stream: cada frame se genera en el executor para no bloquear el loop
+                        sent = 0
+                        frames = iter(resp)
+                        step = tracing.wrap(next)
+                        try:
+                            while True:
+                                frame = await self._loop.run_in_executor(self._executor, step, frames, None)
+                                if frame is None:
+                                    break
+                                sent += await self._send(writer, req, frame, codec)
+                        finally:
+                            close = getattr(frames, "close", None)
+                            if close is not None:
+                                close()
+                    if self.metrics is not None:
+                        self.metrics.add_bytes(self.metrics.label(req.get("type")), received, sent)
+                finally:
+                    tracing.finish(trace)
+        except Exception as e:
+            print(f"[SERVER] Client {addr} disconnected/error: {e}")
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
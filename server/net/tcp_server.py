@@ -1,40 +1,174 @@
 import socket
 import threading
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Optional
 
-from shared.protocol import MessageProtocol
+from shared import tracing
+from shared.config import MAX_FRAME_SIZE
+from shared.protocol import JSON, FrameBuffer, MessageProtocol
+from server.core.metrics import MetricsRegistry
+from server.net.worker_pool import PoolBusy, WorkerPool
 
 HandlerFn = Callable[[Dict[str, Any]], Dict[str, Any]]
 
+BUSY_RESPONSE = {"status": "error", "error": "BUSY"}
+
 class TcpServer:
-    def __init__(self, host: str, port: int, handler: HandlerFn):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        handler: HandlerFn,
+        max_connections: int = 1024,
+        workers: int = 8,
+        queue_size: int = 64,
+        idle_timeout: Optional[float] = 300.0,
+        metrics: Optional[MetricsRegistry] = None,
+        max_frame_size: Optional[int] = MAX_FRAME_SIZE,
+    ):
         self.host = host
         self.port = port
         self.handler = handler
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        # Tope de lo que manda el cliente (las respuestas no se limitan)
+        self.max_frame_size = max_frame_size
+        # Sólo bytes por tipo; el resto lo registra el handler (RequestRouter.handle)
+        self.metrics = metrics
+        self._pool = WorkerPool(workers=workers, queue_size=queue_size)
         self._sock: socket.socket | None = None
+        self._active = 0
+        self._active_lock = threading.Lock()
+        self._running = False
+        self.ready = threading.Event()
+
+    @property
+    def active_connections(self) -> int:
+        return self._active
 
     def start(self) -> None:
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._sock.bind((self.host, self.port))
         self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        self._running = True
         print(f"[SERVER] Listening on {self.host}:{self.port}")
+        self.ready.set()
+
+        while self._running:
+            try:
+                conn, addr = self._sock.accept()
+            except OSError:
+                # stop() cerró el socket de escucha
+                break
+
+            with self._active_lock:
+                accepted = self._active < self.max_connections
+                if accepted:
+                    self._active += 1
+            if not accepted:
+                self._reject(conn)
+                continue
 
-        while True:
-            conn, addr = self._sock.accept()
             print(f"[SERVER] Client connected: {addr}")
             t = threading.Thread(target=self._client_loop, args=(conn, addr), daemon=True)
             t.start()
 
+    def stop(self) -> None:
+        self._running = False
+        if self._sock:
+            try:
+                # shutdown despierta al accept() bloqueado (close solo no alcanza en Linux)
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._pool.shutdown()
+
+    def _reject(self, conn: socket.socket) -> None:
+        # Límite de conexiones alcanzado: avisamos y cerramos sin crear thread
+        try:
+            conn.settimeout(1.0)
+            MessageProtocol.send(conn, BUSY_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            # wrap: la traza de la request sigue en la thread del pool
+            fut = self._pool.submit(tracing.wrap(self.handler), req)
+        except PoolBusy:
+            return dict(BUSY_RESPONSE)
+        return fut.result()
+
+    @staticmethod
+    def _send(conn: socket.socket, req: Dict[str, Any], frame: Dict[str, Any], codec: str) -> int:
+        if "id" in req:
+            # Correlation id: permite a los clientes hacer pipelining
+            frame = dict(frame, id=req["id"])
+        return MessageProtocol.send(conn, frame, codec)
+
+    def _send_stream(self, conn: socket.socket, req: Dict[str, Any], frames, codec: str) -> int:
+        # Cada frame se genera en el pool, como la request: respeta el límite de workers y BUSY
+        sent = 0
+        step = tracing.wrap(next)
+        it = iter(frames)
+        try:
+            while True:
+                try:
+                    frame = self._pool.submit(step, it, None).result()
+                except PoolBusy:
+                    sent += self._send(conn, req, dict(BUSY_RESPONSE, more=False), codec)
+                    break
+                if frame is None:
+                    break
+                sent += self._send(conn, req, frame, codec)
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+        return sent
+
     def _client_loop(self, conn: socket.socket, addr) -> None:
         try:
+            # Un socket sin actividad por idle_timeout segundos se considera muerto
+            conn.settimeout(self.idle_timeout)
+            codec = JSON
+            buf = FrameBuffer()
             while True:
-                req = MessageProtocol.recv(conn)
-                resp = self.handler(req)
-                MessageProtocol.send(conn, resp)
+                # Sólo las requests muestreadas generan spans (ver shared.tracing)
+                trace = tracing.begin()
+                try:
+                    req = MessageProtocol.recv(conn, codec, buf, self.max_frame_size)
+                    tracing.set_type(req.get("type"))
+                    if req.get("type") == "HELLO":
+                        # Negociación de codificación: se resuelve acá, no en el handler
+                        resp, codec_next = MessageProtocol.negotiate(req)
+                        MessageProtocol.send(conn, resp)
+                        codec = codec_next
+                        continue
+                    resp = self._dispatch(req)
+                    if isinstance(resp, dict):
+                        sent = self._send(conn, req, resp, codec)
+                    else:
+                        # Un handler en modo stream retorna un iterador: un frame por elemento
+                        sent = self._send_stream(conn, req, resp, codec)
+                    if self.metrics is not None:
+                        self.metrics.add_bytes(self.metrics.label(req.get("type")), buf.last_size, sent)
+                finally:
+                    tracing.finish(trace)
+        except socket.timeout:
+            print(f"[SERVER] Client {addr} idle timeout")
         except Exception as e:
             print(f"[SERVER] Client {addr} disconnected/error: {e}")
         finally:
+            with self._active_lock:
+                self._active -= 1
             try:
                 conn.close()
             except:
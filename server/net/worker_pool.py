@@ -0,0 +1,52 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class WorkerPool:
+    """
+    Pool fijo de threads con cola acotada. submit() no bloquea: si la cola está
+    llena levanta PoolBusy para que el llamador responda BUSY en vez de encolar sin límite.
+    """
+
+    def __init__(self, workers: int = 8, queue_size: int = 64):
+        self._q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        fut: Future = Future()
+        try:
+            self._q.put_nowait((fut, fn, args))
+        except queue.Full:
+            raise PoolBusy()
+        return fut
+
+    def pending(self) -> int:
+        return self._q.qsize()
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._q.put(None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            fut, fn, args = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
@@ -0,0 +1,162 @@
+"""
+Codificación binaria compacta ("bin1") para los mensajes del protocolo.
+
+Cada valor es [1 byte tag][datos]. Soporta lo mismo que JSON:
+None, bool, int, float, str, list/tuple y dict con claves str.
+Enteros chicos y strings cortos usan encabezados de 1 byte.
+"""
+import struct
+from typing import Any, Tuple
+
+T_NONE = 0x00
+T_FALSE = 0x01
+T_TRUE = 0x02
+T_INT8 = 0x03
+T_INT32 = 0x04
+T_INT64 = 0x05
+T_FLOAT = 0x06
+T_STR8 = 0x07
+T_STR32 = 0x08
+T_LIST = 0x09
+T_DICT = 0x0A
+T_BIGINT = 0x0B
+
+_I8 = struct.Struct(">b")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_F64 = struct.Struct(">d")
+_U8 = struct.Struct(">B")
+_U32 = struct.Struct(">I")
+
+
+def encode(obj: Any) -> bytes:
+    out = bytearray()
+    _encode(obj, out)
+    return bytes(out)
+
+
+def _encode(obj: Any, out: bytearray) -> None:
+    # bool antes que int: bool es subclase de int
+    if obj is None:
+        out.append(T_NONE)
+    elif obj is True:
+        out.append(T_TRUE)
+    elif obj is False:
+        out.append(T_FALSE)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        n = len(raw)
+        if n < 256:
+            out.append(T_STR8)
+            out.append(n)
+        else:
+            out.append(T_STR32)
+            out += _U32.pack(n)
+        out += raw
+    elif isinstance(obj, int):
+        if -128 <= obj <= 127:
+            out.append(T_INT8)
+            out += _I8.pack(obj)
+        elif -(1 << 31) <= obj < (1 << 31):
+            out.append(T_INT32)
+            out += _I32.pack(obj)
+        elif -(1 << 63) <= obj < (1 << 63):
+            out.append(T_INT64)
+            out += _I64.pack(obj)
+        else:
+            raw = str(obj).encode("ascii")
+            out.append(T_BIGINT)
+            out += _U32.pack(len(raw))
+            out += raw
+    elif isinstance(obj, float):
+        out.append(T_FLOAT)
+        out += _F64.pack(obj)
+    elif isinstance(obj, dict):
+        out.append(T_DICT)
+        out += _U32.pack(len(obj))
+        for k, v in obj.items():
+            if not isinstance(k, str):
+                raise TypeError(f"Dict keys must be str, got {type(k).__name__}")
+            _encode(k, out)
+            _encode(v, out)
+    elif isinstance(obj, (list, tuple)):
+        out.append(T_LIST)
+        out += _U32.pack(len(obj))
+        for v in obj:
+            _encode(v, out)
+    else:
+        raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+
+def decode(buf) -> Any:
+    """
+    Decodifica desde bytes/bytearray/memoryview. Se copia el frame a bytes una sola vez:
+    slicing + decode sobre bytes es bastante más rápido que sobre memoryview.
+    """
+    data = buf if isinstance(buf, bytes) else bytes(buf)
+    obj, off = _decode(data, 0)
+    if off != len(data):
+        raise ValueError("Trailing bytes after message")
+    return obj
+
+
+def _decode(data: bytes, off: int) -> Tuple[Any, int]:
+    tag = data[off]
+    off += 1
+    if tag == T_STR8:
+        n = data[off]
+        off += 1
+        return data[off:off + n].decode("utf-8"), off + n
+    if tag == T_INT8:
+        return _I8.unpack_from(data, off)[0], off + 1
+    if tag == T_DICT:
+        (n,) = _U32.unpack_from(data, off)
+        off += 4
+        d = {}
+        for _ in range(n):
+            # Atajo para claves/valores str cortos (el caso común): evita una llamada
+            if data[off] == T_STR8:
+                kn = data[off + 1]
+                off += 2
+                k = data[off:off + kn].decode("utf-8")
+                off += kn
+            else:
+                k, off = _decode(data, off)
+            if data[off] == T_STR8:
+                vn = data[off + 1]
+                off += 2
+                d[k] = data[off:off + vn].decode("utf-8")
+                off += vn
+            else:
+                d[k], off = _decode(data, off)
+        return d, off
+    if tag == T_LIST:
+        (n,) = _U32.unpack_from(data, off)
+        off += 4
+        items = []
+        append = items.append
+        for _ in range(n):
+            v, off = _decode(data, off)
+            append(v)
+        return items, off
+    if tag == T_NONE:
+        return None, off
+    if tag == T_TRUE:
+        return True, off
+    if tag == T_FALSE:
+        return False, off
+    if tag == T_STR32:
+        (n,) = _U32.unpack_from(data, off)
+        off += 4
+        return data[off:off + n].decode("utf-8"), off + n
+    if tag == T_INT32:
+        return _I32.unpack_from(data, off)[0], off + 4
+    if tag == T_INT64:
+        return _I64.unpack_from(data, off)[0], off + 8
+    if tag == T_FLOAT:
+        return _F64.unpack_from(data, off)[0], off + 8
+    if tag == T_BIGINT:
+        (n,) = _U32.unpack_from(data, off)
+        off += 4
+        return int(data[off:off + n].decode("ascii")), off + n
+    raise ValueError(f"Unknown tag 0x{tag:02x}")
@@ -6,3 +6,48 @@ FERNET_KEY = b"1Q_WJYS-7NFQ2AurOgQsqn-75npoh15tAlsucF3UnLQ="
 
 USERS_FILE = "server/data/users.json"
 GRAPH_FILE = "server/data/graph.json"
+
+# Backend de almacenamiento: "json" (USERS_FILE/GRAPH_FILE) o "sqlite" (SQLITE_FILE)
+STORAGE_BACKEND = "json"
+SQLITE_FILE = "server/data/socialtec.db"
+
+# Modo del servidor TCP: "threads" (una thread por conexión) o "asyncio"
+SERVER_MODE = "threads"
+
+# Límites del TcpServer (modo "threads")
+MAX_CONNECTIONS = 1024
+WORKER_THREADS = 8
+REQUEST_QUEUE_SIZE = 64
+IDLE_TIMEOUT = 300.0  # segundos sin recibir nada antes de cerrar la conexión
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # bytes de payload de una request; uno más grande cierra la conexión
+
+# Caché de consultas sobre el grafo (PATH_BETWEEN)
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_SELECTIVE = True  # False: cada mutación vacía la caché entera
+
+# Oráculo de distancias (DISTANCE_ESTIMATE): landmarks de mayor grado y cada cuánto
+# se revisa si el grafo cambió para recalcular las tablas (en segundo plano)
+DISTANCE_ORACLE_ENABLED = True
+DISTANCE_LANDMARKS = 16
+DISTANCE_REFRESH_INTERVAL = 60.0
+
+# RECOMMEND: cada cuántos segundos se recalculan (en segundo plano) las entradas de
+# la tabla de recomendaciones descartadas por cambios del grafo, y cuántas por vuelta
+RECOMMEND_REFRESH_INTERVAL = 1.0
+RECOMMEND_REFRESH_BATCH = 256
+
+# Métricas por tipo de mensaje (METRICS). Con METRICS_DUMP_FILE se vuelcan además
+# en formato texto de Prometheus cada METRICS_DUMP_INTERVAL segundos
+METRICS_ENABLED = True
+METRICS_DUMP_FILE = None
+METRICS_DUMP_INTERVAL = 15.0
+
+# Trazas por fase (shared.tracing): fracción de requests muestreadas (0 = apagado)
+# y archivo JSON lines con eventos del formato Chrome Trace Event
+TRACE_SAMPLE_RATE = 0.0
+TRACE_FILE = "server/data/trace.jsonl"
+
+# Perfilado bajo demanda (mensaje PROFILE o botón del GUI): dónde se guardan los
+# .pstats/.collapsed y duración máxima de una sesión
+PROFILE_DIR = "server/data/profiles"
+PROFILE_MAX_SECONDS = 300.0
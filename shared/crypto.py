@@ -2,6 +2,8 @@ import json
 from cryptography.fernet import Fernet
 from typing import Dict, Any
 
+from shared import tracing
+
 class CryptoService:
     def __init__(self, key: bytes):
         self.f = Fernet(key)
@@ -12,6 +14,7 @@ class CryptoService:
         return token.decode("utf-8")
 
     def decrypt_json(self, token_str: str) -> Dict[str, Any]:
-        token = token_str.encode("utf-8")
-        raw = self.f.decrypt(token)
-        return json.loads(raw.decode("utf-8"))
+        with tracing.span("decrypt"):
+            token = token_str.encode("utf-8")
+            raw = self.f.decrypt(token)
+            return json.loads(raw.decode("utf-8"))
@@ -1,37 +1,166 @@
+import asyncio
 import json
 import struct
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared import binary_codec, tracing
+
+# Codificaciones del payload. "json" es la default y la que habla todo cliente viejo;
+# "bin1" se habilita por conexión con un HELLO (ver MessageProtocol.negotiate).
+JSON = "json"
+BINARY = "bin1"
+SUPPORTED_ENCODINGS = (BINARY, JSON)
+
+_HEADER = struct.Struct(">I")
+
+
+def encode_payload(msg: Dict[str, Any], codec: str = JSON) -> bytes:
+    if codec == BINARY:
+        return binary_codec.encode(msg)
+    return json.dumps(msg, ensure_ascii=False).encode("utf-8")
+
+
+def decode_payload(buf, codec: str = JSON) -> Dict[str, Any]:
+    if codec == BINARY:
+        return binary_codec.decode(buf)
+    # str(buffer, encoding) acepta memoryview sin copiar a bytes antes
+    return json.loads(str(buf, "utf-8"))
+
+
+class FrameBuffer:
+    """
+    Buffer reutilizable para recibir frames con recv_into.
+    Crece al tamaño del frame más grande visto; el contenido sólo es válido
+    hasta la próxima lectura (decodificar antes de volver a leer).
+    """
+
+    def __init__(self, size: int = 4096):
+        self._buf = bytearray(size)
+        self._header = bytearray(MessageProtocol.HEADER)
+        # Tamaño (header incluido) del último frame leído
+        self.last_size = 0
+
+    def view(self, n: int) -> memoryview:
+        if n > len(self._buf):
+            self._buf = bytearray(max(n, 2 * len(self._buf)))
+        return memoryview(self._buf)[:n]
+
+    def header_view(self) -> memoryview:
+        return memoryview(self._header)
+
 
 class MessageProtocol:
     """
-    [4 bytes length big-endian][JSON utf-8]
+    [4 bytes length big-endian][payload]
+    payload = JSON utf-8 (default) o bin1 si la conexión lo negoció.
     """
     HEADER = 4
 
     @staticmethod
-    def send(sock, msg: Dict[str, Any]) -> None:
-        data = json.dumps(msg, ensure_ascii=False).encode("utf-8")
-        sock.sendall(struct.pack(">I", len(data)) + data)
+    def send(sock, msg: Dict[str, Any], codec: str = JSON) -> int:
+        with tracing.span("encode"):
+            data = encode_payload(msg, codec)
+        header = _HEADER.pack(len(data))
+        with tracing.span("send"):
+            MessageProtocol._send_vectored(sock, [header, data])
+        return MessageProtocol.HEADER + len(data)
 
     @staticmethod
-    def recv(sock) -> Dict[str, Any]:
-        header = MessageProtocol._recv_exact(sock, MessageProtocol.HEADER)
-        if not header:
-            raise ConnectionError("Disconnected")
-        (length,) = struct.unpack(">I", header)
-        payload = MessageProtocol._recv_exact(sock, length)
-        if not payload:
+    def recv(sock, codec: str = JSON, buffer: Optional[FrameBuffer] = None, max_size: Optional[int] = None) -> Dict[str, Any]:
+        if buffer is None:
+            buffer = FrameBuffer(0)
+        header = buffer.header_view()
+        if not MessageProtocol._recv_into(sock, header):
             raise ConnectionError("Disconnected")
-        return json.loads(payload.decode("utf-8"))
+        # La espera del header es tiempo ocioso de la conexión: el span arranca después
+        with tracing.span("recv"):
+            length = MessageProtocol._check_length(header, max_size)
+            payload = buffer.view(length)
+            if length and not MessageProtocol._recv_into(sock, payload):
+                raise ConnectionError("Disconnected")
+            buffer.last_size = MessageProtocol.HEADER + length
+            return decode_payload(payload, codec)
 
     @staticmethod
-    def _recv_exact(sock, n: int) -> bytes:
-        chunks = []
+    def _recv_into(sock, view: memoryview) -> bool:
         got = 0
+        n = len(view)
         while got < n:
-            chunk = sock.recv(n - got)
-            if not chunk:
-                return b""
-            chunks.append(chunk)
-            got += len(chunk)
-        return b"".join(chunks)
+            k = sock.recv_into(view[got:], n - got)
+            if not k:
+                return False
+            got += k
+        return True
+
+    @staticmethod
+    def _check_length(header, max_size: Optional[int]) -> int:
+        # Antes de reservar memoria: el header lo controla el otro extremo.
+        # max_size=None (los clientes, que confían en el server): sin límite
+        (length,) = _HEADER.unpack(header)
+        if max_size is not None and length > max_size:
+            raise ConnectionError(f"Frame too large ({length} bytes)")
+        return length
+
+    @staticmethod
+    def _send_vectored(sock, parts: List[bytes]) -> None:
+        # sendmsg evita concatenar header + payload; no existe en Windows
+        if not hasattr(sock, "sendmsg"):
+            sock.sendall(b"".join(parts))
+            return
+        views = [memoryview(p) for p in parts if p]
+        while views:
+            sent = sock.sendmsg(views)
+            while sent:
+                if sent >= len(views[0]):
+                    sent -= len(views[0])
+                    views.pop(0)
+                else:
+                    views[0] = views[0][sent:]
+                    sent = 0
+
+    # ---------- negociación de codificación ----------
+    @staticmethod
+    def hello(encodings=SUPPORTED_ENCODINGS) -> Dict[str, Any]:
+        return {"type": "HELLO", "payload": {"encodings": list(encodings)}}
+
+    @staticmethod
+    def negotiate(req: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """
+        Respuesta del server a un HELLO: elige la primera codificación del cliente que
+        soportamos (o json). La respuesta viaja en json; los frames siguientes, en la elegida.
+        """
+        wanted = (req.get("payload") or {}).get("encodings") or [JSON]
+        codec = next((e for e in wanted if e in SUPPORTED_ENCODINGS), JSON)
+        return {"status": "ok", "data": {"encoding": codec}}, codec
+
+    # ---------- asyncio (streams) ----------
+    @staticmethod
+    async def recv_async(reader: asyncio.StreamReader, codec: str = JSON, max_size: Optional[int] = None) -> Dict[str, Any]:
+        msg, _ = await MessageProtocol.recv_async_sized(reader, codec, max_size)
+        return msg
+
+    @staticmethod
+    async def recv_async_sized(
+        reader: asyncio.StreamReader, codec: str = JSON, max_size: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Como recv_async, pero retorna también el tamaño del frame (header incluido).
+        """
+        try:
+            header = await reader.readexactly(MessageProtocol.HEADER)
+            with tracing.span("recv"):
+                length = MessageProtocol._check_length(header, max_size)
+                payload = await reader.readexactly(length)
+                msg = decode_payload(payload, codec)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Disconnected")
+        return msg, MessageProtocol.HEADER + length
+
+    @staticmethod
+    async def send_async(writer: asyncio.StreamWriter, msg: Dict[str, Any], codec: str = JSON) -> int:
+        with tracing.span("encode"):
+            data = encode_payload(msg, codec)
+        with tracing.span("send"):
+            writer.writelines((_HEADER.pack(len(data)), data))
+            await writer.drain()
+        return MessageProtocol.HEADER + len(data)
@@ -0,0 +1,165 @@
+"""
+Trazas por fase de cada request (recv, decrypt, handle, persistencia, encode, send).
+
+Un server llama begin() antes de leer cada request y finish() después de responder;
+sólo una fracción sample_rate de las requests queda muestreada. Dentro de una request
+muestreada, span("nombre") mide un tramo; fuera de ellas span() retorna un objeto nulo
+compartido, así que el costo con trazas apagadas es una lectura de un ContextVar.
+
+La request en curso viaja en un ContextVar: las threads de un pool no la heredan,
+por eso quien despacha a un pool usa wrap(fn).
+
+Cada request muestreada se escribe al terminar como eventos "X" del formato Chrome
+Trace Event, uno por línea (JSON lines). Para abrirlo en chrome://tracing o Perfetto:
+    python -m shared.tracing trace.jsonl trace.json
+"""
+import contextvars
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Optional, TextIO
+
+_current: contextvars.ContextVar[Optional["_Trace"]] = contextvars.ContextVar("trace", default=None)
+
+_lock = threading.Lock()
+_out: Optional[TextIO] = None
+_sample_rate = 0.0
+_ids = itertools.count(1)
+_pid = os.getpid()
+
+
+class _Trace:
+    __slots__ = ("request_id", "msg_type", "events", "token")
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+        self.msg_type: Optional[str] = None
+        # (name, start_us, dur_us, tid); list.append es atómico entre threads
+        self.events: List[tuple] = []
+        self.token: Optional[contextvars.Token] = None
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace: _Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        t1 = time.perf_counter_ns()
+        self.trace.events.append((self.name, self.t0 // 1000, (t1 - self.t0) // 1000, threading.get_ident()))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL = _NullSpan()
+
+
+def configure(path: Optional[str], sample_rate: float) -> None:
+    """
+    Abre (en modo append) el archivo de trazas y fija la tasa de muestreo.
+    path=None o sample_rate<=0 apaga las trazas.
+    """
+    global _out, _sample_rate
+    with _lock:
+        if _out is not None:
+            _out.close()
+            _out = None
+        _sample_rate = 0.0
+        if path and sample_rate > 0:
+            _out = open(path, "a", encoding="utf-8")
+            _sample_rate = min(sample_rate, 1.0)
+
+
+def begin() -> Optional[_Trace]:
+    """
+    Decide si la próxima request se muestrea. Retorna la traza (a pasar a finish)
+    o None si no se muestrea.
+    """
+    if _sample_rate <= 0 or (_sample_rate < 1 and random.random() >= _sample_rate):
+        return None
+    trace = _Trace(next(_ids))
+    trace.token = _current.set(trace)
+    return trace
+
+
+def set_type(msg_type: Any) -> None:
+    trace = _current.get()
+    if trace is not None and trace.msg_type is None and isinstance(msg_type, str):
+        trace.msg_type = msg_type
+
+
+def span(name: str):
+    trace = _current.get()
+    if trace is None:
+        return _NULL
+    return _Span(trace, name)
+
+
+def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    fn ligada al contexto actual si hay una request muestreada (para correrla en
+    otra thread); si no, fn tal cual.
+    """
+    if _current.get() is None:
+        return fn
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # Una copia por llamada: un mismo Context no puede estar activo en dos threads
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def finish(trace: Optional[_Trace]) -> None:
+    if trace is None:
+        return
+    _current.reset(trace.token)
+    if not trace.events:
+        return
+    args = {"request_id": trace.request_id, "type": trace.msg_type}
+    cat = trace.msg_type or "request"
+    lines = "".join(
+        json.dumps({"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur, "pid": _pid, "tid": tid, "args": args}) + "\n"
+        for name, ts, dur, tid in trace.events
+    )
+    with _lock:
+        if _out is not None:
+            _out.write(lines)
+            _out.flush()
+
+
+def export_chrome(jsonl_path: str, out_path: str) -> int:
+    """
+    Convierte el archivo de trazas a un JSON {"traceEvents": [...]}. Retorna cuántos eventos.
+    """
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m shared.tracing TRACE.jsonl OUT.json")
+        sys.exit(2)
+    print(f"{export_chrome(sys.argv[1], sys.argv[2])} events")
@@ -1,4 +1,5 @@
 import sys
+import threading
 from pathlib import Path
 import pytest
 
@@ -6,6 +7,8 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from server.net.tcp_server import TcpServer
+
 @pytest.fixture
 def tmp_users_file(tmp_path: Path):
     return tmp_path / "users.json"
@@ -13,3 +16,24 @@ def tmp_users_file(tmp_path: Path):
 @pytest.fixture
 def tmp_graph_file(tmp_path: Path):
     return tmp_path / "graph.json"
+
+@pytest.fixture
+def start_server():
+    """
+    start_server(handler, server_cls=TcpServer, **kw): levanta el server en un puerto
+    libre y en una thread, y lo retorna ya escuchando. Al terminar el test se detiene.
+    """
+    started = []
+
+    def start(handler, server_cls=TcpServer, **kw):
+        srv = server_cls("127.0.0.1", 0, handler=handler, **kw)
+        t = threading.Thread(target=srv.start, daemon=True)
+        t.start()
+        started.append((srv, t))
+        assert srv.ready.wait(5)
+        return srv
+
+    yield start
+    for srv, t in reversed(started):
+        srv.stop()
+        t.join(5)
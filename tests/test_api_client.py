@@ -31,3 +31,32 @@ def test_api_client_request_response():
 
     assert resp["status"] == "ok"
     assert resp["data"]["type"] == "PING"
+
+def test_api_client_batch():
+    host = "127.0.0.1"
+    srv_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv_sock.bind((host, 0))
+    srv_sock.listen()
+    port = srv_sock.getsockname()[1]
+
+    def server_thread():
+        conn, _ = srv_sock.accept()
+        try:
+            req = MessageProtocol.recv(conn)
+            items = req["payload"]["requests"]
+            MessageProtocol.send(conn, {"status": "ok", "data": {"results": [
+                {"status": "ok", "data": it["type"]} for it in items
+            ]}})
+        finally:
+            conn.close()
+            srv_sock.close()
+
+    t = threading.Thread(target=server_thread, daemon=True)
+    t.start()
+
+    client = ApiClient(host, port)
+    client.connect()
+    results = client.batch([{"type": "PING"}, {"type": "GRAPH_STATS"}])
+    client.close()
+
+    assert [r["data"] for r in results] == ["PING", "GRAPH_STATS"]
@@ -0,0 +1,84 @@
+import asyncio
+import struct
+
+import pytest
+from cryptography.fernet import Fernet
+
+from client.net.async_api_client import AsyncApiClient
+from shared.crypto import CryptoService
+
+def test_async_client_pipelines_with_correlation_ids(start_server):
+    srv = start_server(lambda req: {"status": "ok", "data": req.get("payload")})
+
+    async def run():
+        async with AsyncApiClient("127.0.0.1", srv.port, crypto=CryptoService(Fernet.generate_key())) as c:
+            resps = await asyncio.gather(*[c.request({"type": "PING", "payload": i}) for i in range(50)])
+            assert c.in_flight == 0
+            return resps
+
+    resps = asyncio.run(run())
+    assert [r["data"] for r in resps] == list(range(50))
+    assert all("id" not in r for r in resps)
+
+def test_async_client_helpers_against_router(tmp_path, monkeypatch, start_server):
+    import importlib
+    import shared.config as cfg
+    key = Fernet.generate_key()
+    monkeypatch.setattr(cfg, "FERNET_KEY", key, raising=False)
+    monkeypatch.setattr(cfg, "USERS_FILE", str(tmp_path / "users.json"), raising=False)
+    monkeypatch.setattr(cfg, "GRAPH_FILE", str(tmp_path / "graph.json"), raising=False)
+    import server.core.router as router_module
+    importlib.reload(router_module)
+    srv = start_server(router_module.RequestRouter().handle)
+
+    async def run():
+        async with AsyncApiClient("127.0.0.1", srv.port, crypto=CryptoService(key)) as c:
+            r1, r2 = await asyncio.gather(
+                c.register("Julian", "Test", "julian123", "1234"),
+                c.register("Ana", "Lopez", "ana123", "abcd"),
+            )
+            assert (await c.login("julian123", "1234"))["status"] == "ok"
+            id1, id2 = r1["data"]["id"], r2["data"]["id"]
+            assert (await c.add_friend(id1, id2))["status"] == "ok"
+            prof, path, stats = await asyncio.gather(
+                c.get_profile(id1), c.path_between(id1, id2), c.graph_stats()
+            )
+            assert prof["data"]["friends"][0]["id"] == id2
+            assert path["data"]["path"] == [id1, id2]
+            assert stats["data"]["max_friends"] == 1
+
+    asyncio.run(run())
+
+def test_async_client_fails_pending_on_disconnect(start_server):
+    srv = start_server(lambda req: (_ for _ in ()).throw(ConnectionError("boom")))
+
+    async def run():
+        async with AsyncApiClient("127.0.0.1", srv.port, crypto=CryptoService(Fernet.generate_key())) as c:
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(c.request({"type": "PING"}), 5)
+
+    asyncio.run(run())
+
+def test_async_client_fails_pending_on_malformed_frame():
+    async def run():
+        async def serve(reader, writer):
+            await reader.readexactly(4)
+            # Largo 3 y un payload que no es JSON
+            writer.write(struct.pack(">I", 3) + b"{x]")
+            await writer.drain()
+            await reader.read()
+            writer.close()
+
+        srv = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            async with AsyncApiClient("127.0.0.1", port, crypto=CryptoService(Fernet.generate_key())) as c:
+                with pytest.raises(ConnectionError, match="Invalid frame"):
+                    await asyncio.wait_for(c.request({"type": "PING"}), 5)
+                with pytest.raises(ConnectionError):
+                    await c.request({"type": "PING"})
+        finally:
+            srv.close()
+            await srv.wait_closed()
+
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+import socket
+import time
+
+from shared.protocol import MessageProtocol
+from server.net.async_tcp_server import AsyncTcpServer
+
+def test_async_server_roundtrip(start_server):
+    srv = start_server(lambda req: {"status": "ok", "data": req}, server_cls=AsyncTcpServer)
+    with socket.create_connection(("127.0.0.1", srv.port)) as s:
+        for i in range(3):
+            MessageProtocol.send(s, {"type": "ECHO", "payload": {"i": i}})
+            assert MessageProtocol.recv(s)["data"]["payload"]["i"] == i
+
+def test_async_server_slow_handler_does_not_block_ping(start_server):
+    def handler(req):
+        if req["type"] == "SLOW":
+            time.sleep(0.5)
+        return {"status": "ok", "data": {"type": req["type"]}}
+
+    srv = start_server(handler, server_cls=AsyncTcpServer)
+    slow = socket.create_connection(("127.0.0.1", srv.port))
+    MessageProtocol.send(slow, {"type": "SLOW"})
+
+    t0 = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", srv.port)) as s:
+        MessageProtocol.send(s, {"type": "PING"})
+        assert MessageProtocol.recv(s)["data"]["type"] == "PING"
+    assert time.perf_counter() - t0 < 0.4
+
+    assert MessageProtocol.recv(slow)["data"]["type"] == "SLOW"
+    slow.close()
+
+def test_async_server_streams_with_async_client(start_server):
+    import asyncio
+    from cryptography.fernet import Fernet
+    from client.net.async_api_client import AsyncApiClient
+    from shared.crypto import CryptoService
+
+    def handler(req):
+        if req["type"] == "PING":
+            return {"status": "ok"}
+        return ({"status": "ok", "data": i, "more": i < 3} for i in range(4))
+
+    async def run(port):
+        async with AsyncApiClient("127.0.0.1", port, crypto=CryptoService(Fernet.generate_key())) as c:
+            ping = asyncio.ensure_future(c.request({"type": "PING"}))
+            frames = [f["data"] async for f in c.stream({"type": "FRIENDS_PAGE"})]
+            assert (await ping)["status"] == "ok"
+            assert c.in_flight == 0
+            return frames
+
+    srv = start_server(handler, server_cls=AsyncTcpServer)
+    assert asyncio.run(run(srv.port)) == [0, 1, 2, 3]
@@ -0,0 +1,24 @@
+import pytest
+from shared import binary_codec
+
+def test_binary_codec_roundtrip_types():
+    msg = {
+        "type": "GET_MY_PROFILE",
+        "payload": {"user_id": "ñandú-" + "x" * 300, "n": 5, "big": 1 << 40, "huge": 1 << 70,
+                    "neg": -70000, "f": 1.5, "ok": True, "no": False, "none": None,
+                    "list": [1, "a", [2, {"b": 3}]], "empty": {}},
+    }
+    assert binary_codec.decode(binary_codec.encode(msg)) == msg
+
+def test_binary_codec_is_smaller_than_json_for_small_ints():
+    import json
+    msg = {"results": list(range(100))}
+    assert len(binary_codec.encode(msg)) < len(json.dumps(msg))
+
+def test_binary_codec_rejects_bad_input():
+    with pytest.raises(TypeError):
+        binary_codec.encode({1: "x"})
+    with pytest.raises(ValueError):
+        binary_codec.decode(b"\xff")
+    with pytest.raises(ValueError):
+        binary_codec.decode(binary_codec.encode(1) + b"\x00")
@@ -0,0 +1,99 @@
+import time
+
+from server.core.component_index import ComponentIndex, UnionFind
+from server.core.graph_snapshot import GraphSnapshot
+
+def test_union_find_counts_and_sizes():
+    uf = UnionFind.from_adjacency({"A": ["B"], "B": ["A", "C"], "C": ["B"], "D": [], "E": ["F"], "F": ["E"]})
+    assert uf.count == 3
+    assert uf.connected("A", "C") and not uf.connected("A", "D")
+    assert uf.size_histogram() == {1: 1, 2: 1, 3: 1}
+    assert not uf.connected("A", "Z")
+
+def test_union_find_histogram_is_incremental():
+    uf = UnionFind()
+    for u in "ABCD":
+        uf.add(u)
+    assert uf.size_histogram() == {1: 4}
+    uf.union("A", "B")
+    uf.union("C", "D")
+    assert uf.size_histogram() == {2: 2}
+    uf.union("A", "C")
+    uf.union("B", "D")
+    assert uf.size_histogram() == {4: 1}
+    assert uf.largest() == 4
+
+class _Graph:
+    def __init__(self, snap):
+        self.snap = snap
+
+    def current(self):
+        return self.snap
+
+def test_component_index_rebuilds_in_background_after_remove():
+    g = _Graph(GraphSnapshot.build({"A": ["B"], "B": ["A", "C"], "C": ["B"]}))
+    idx = ComponentIndex.from_snapshot(g.snap, g.current, quiet=0.01, interval=0)
+    assert idx.connected("A", "C", g.snap) is True
+
+    g.snap = g.snap.with_changes({"B": ("A",), "C": ()})
+    idx.apply(g.snap.version, "remove", ["B", "C"])
+    # Las consultas no esperan ni reconstruyen
+    assert idx.connected("A", "C", g.snap) is None
+    assert idx.summary(g.snap)["components_stale"] is True
+
+    deadline = time.monotonic() + 5
+    while idx.rebuilds == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    summary = idx.summary(g.snap)
+    assert summary["components"] == 2
+    assert summary["components_stale"] is False
+    assert idx.connected("A", "C", g.snap) is False
+
+def test_component_index_snapshot_newer_than_index_is_unknown():
+    v0 = GraphSnapshot.build({"A": [], "B": []})
+    idx = ComponentIndex.from_snapshot(v0, lambda: v0)
+    # GraphService publica v1 antes de llamar a apply()
+    v1 = v0.with_changes({"A": ("B",), "B": ("A",)})
+    assert idx.connected("A", "B", v1) is None
+    idx.apply(v1.version, "add", ["A", "B"])
+    assert idx.connected("A", "B", v1) is True
+
+def test_component_index_debounces_removals():
+    v0 = GraphSnapshot.build({"A": ["B"], "B": ["A"]})
+    idx = ComponentIndex.from_snapshot(v0, lambda: v0, quiet=3600, interval=3600)
+    v1 = v0.with_changes({"A": (), "B": ()})
+    idx.apply(v1.version, "remove", ["A", "B"])
+    time.sleep(0.05)
+    assert idx.rebuilds == 0
+    assert idx.summary(v1) == {"components": 1, "largest_component": 2, "component_sizes": {2: 1}, "components_stale": True}
+
+def test_component_index_replays_adds_after_rebuild_snapshot():
+    v0 = GraphSnapshot.build({"A": ["B"], "B": ["A"], "C": []})
+    # Intervalo enorme: la thread de fondo no llega a reconstruir, se hace a mano
+    idx = ComponentIndex.from_snapshot(v0, lambda: v0, quiet=3600, interval=3600)
+    v1 = v0.with_changes({"A": (), "B": ()})
+    v2 = v1.with_changes({"B": ("C",), "C": ("B",)})
+    idx.apply(v1.version, "remove", ["A", "B"])
+    idx.apply(v2.version, "add", ["B", "C"])
+    assert idx.connected("B", "C", v2) is None
+
+    assert idx.rebuild(v1) is True
+    assert idx.connected("B", "C", v2) is True
+    # v1 es anterior a la baja: no se responde desde el índice
+    assert idx.connected("B", "C", v1) is None
+    assert idx.summary(v2) == {"components": 2, "largest_component": 2, "component_sizes": {1: 1, 2: 1}, "components_stale": False}
+
+def test_component_index_later_remove_keeps_partial_rebuild():
+    v0 = GraphSnapshot.build({"A": ["B"], "B": ["A", "C"], "C": ["B"]})
+    idx = ComponentIndex.from_snapshot(v0, lambda: v0, quiet=3600, interval=3600)
+    v1 = v0.with_changes({"A": (), "B": ("C",)})
+    v2 = v1.with_changes({"B": (), "C": ()})
+    idx.apply(v1.version, "remove", ["A", "B"])
+    idx.apply(v2.version, "remove", ["B", "C"])
+
+    # Se instala lo de v1 (más fresco que v0) pero sigue sucio por la baja de v2
+    assert idx.rebuild(v1) is False
+    assert idx.summary(v2)["components"] == 2
+    assert idx.summary(v2)["components_stale"] is True
+    assert idx.rebuild(v2) is True
+    assert idx.summary(v2)["components"] == 3
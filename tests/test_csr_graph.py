@@ -0,0 +1,45 @@
+import random
+
+from server.core.csr_graph import CsrGraph
+
+def test_csr_from_adjacency_and_queries():
+    g = CsrGraph.from_adjacency({"A": ["B", "C"], "B": ["A"], "C": ["A", "D"], "D": ["C"], "E": []})
+    assert g.neighbors("A") == ["B", "C"]
+    assert g.degree("C") == 2 and g.degree("E") == 0 and g.degree("Z") == 0
+    assert g.has_edge("C", "D") and not g.has_edge("B", "D")
+    assert g.edge_count == 3
+    assert g.bfs_path("B", "D") == ["B", "A", "C", "D"]
+    assert g.bfs_path("B", "E") == []
+    assert g.bfs_path("B", "D", max_depth=2) == []
+
+def test_csr_overlay_and_compaction_match_sets():
+    rnd = random.Random(5)
+    ids = [f"u{i}" for i in range(30)]
+    ref = {u: set() for u in ids}
+    g = CsrGraph.from_adjacency({u: [] for u in ids}, compact_ratio=0.0)
+
+    for step in range(500):
+        a, b = rnd.sample(ids, 2)
+        if rnd.random() < 0.6:
+            g.add_edge(a, b)
+            ref[a].add(b)
+            ref[b].add(a)
+        else:
+            g.remove_edge(a, b)
+            ref[a].discard(b)
+            ref[b].discard(a)
+        if step == 250:
+            g.compact()
+
+    for u in ids:
+        assert g.neighbors(u) == sorted(ref[u])
+        assert g.degree(u) == len(ref[u])
+    assert g.edge_count == sum(len(v) for v in ref.values()) // 2
+
+def test_csr_from_asymmetric_or_dangling_adjacency():
+    g = CsrGraph.from_adjacency({"A": ["B", "A"], "C": ["A"]})
+    assert len(g) == 3
+    assert g.neighbors("A") == ["B", "C"]
+    assert g.neighbors("B") == ["A"]
+    assert g.has_edge("B", "A") and g.has_edge("A", "C")
+    assert g.edge_count == 2
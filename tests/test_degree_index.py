@@ -0,0 +1,25 @@
+from server.core.degree_index import DegreeIndex
+
+def test_degree_index_tracks_extremes():
+    idx = DegreeIndex()
+    for u in "ABC":
+        idx.add_node(u)
+    idx.change("A", 0, 1)
+    idx.change("B", 0, 1)
+    idx.change("A", 1, 2)
+    idx.change("C", 0, 1)
+
+    s = idx.summary()
+    assert s["max_user_id"] == "A" and s["max_friends"] == 2
+    assert s["min_friends"] == 1
+    assert s["edges"] == 2 and s["nodes"] == 3 and s["isolated_users"] == 0
+
+    idx.change("A", 2, 0)
+    s = idx.summary()
+    assert s["max_friends"] == 1 and s["min_user_id"] == "A" and s["min_friends"] == 0
+
+def test_degree_index_histogram_and_percentiles():
+    idx = DegreeIndex.from_degrees([(f"u{i}", i % 4) for i in range(100)])
+    assert idx.histogram() == {0: 25, 1: 25, 2: 25, 3: 25}
+    assert idx.percentiles([50, 90, 99]) == {"p50": 1, "p90": 3, "p99": 3}
+    assert DegreeIndex().percentiles([50]) == {"p50": 0}
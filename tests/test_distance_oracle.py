@@ -0,0 +1,49 @@
+from server.core.distance_oracle import DistanceOracle
+from server.core.graph_repo import GraphRepository
+from server.core.graph_service import GraphService
+from server.core.path_service import PathService
+
+def _oracle(tmp_graph_file, edges, landmarks=2):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    for a, b in edges:
+        gs.add_friendship(a, b)
+    return gs, DistanceOracle(gs, PathService(gs), landmarks=landmarks)
+
+def test_oracle_bounds_contain_exact_distance(tmp_graph_file):
+    # Hub H con una cadena colgando: H-A-B-C y H-X-Y
+    gs, oracle = _oracle(tmp_graph_file, [("H", "A"), ("A", "B"), ("B", "C"), ("H", "X"), ("X", "Y"), ("H", "Z"), ("Q", "R")])
+    assert oracle.refresh() is True
+    assert oracle.refresh() is False
+
+    est = oracle.estimate("C", "Y")
+    assert est["method"] == "landmarks"
+    assert est["lower"] <= 5 <= est["upper"]
+    assert oracle.estimate("C", "Y", exact=True)["distance"] == 5
+
+    assert oracle.estimate("H", "X")["distance"] == 1
+    assert oracle.estimate("C", "Q")["connected"] is False
+
+def test_oracle_falls_back_to_bfs_and_reports_stale(tmp_graph_file):
+    gs, oracle = _oracle(tmp_graph_file, [("A", "B"), ("B", "C")])
+    assert oracle.estimate("A", "C")["method"] == "bfs"  # sin tablas todavía
+
+    oracle.refresh()
+    gs.add_friendship("C", "D")
+    assert oracle.estimate("A", "C")["stale"] is True
+    # D es posterior a las tablas: BFS exacto
+    est = oracle.estimate("A", "D")
+    assert (est["method"], est["distance"]) == ("bfs", 3)
+
+def test_oracle_background_refresh(tmp_graph_file):
+    gs, oracle = _oracle(tmp_graph_file, [("A", "B")])
+    oracle.refresh_interval = 0.01
+    oracle.start()
+    try:
+        gs.add_friendship("B", "C")
+        import time
+        deadline = time.time() + 5
+        while oracle.stats().get("version") != gs.version and time.time() < deadline:
+            time.sleep(0.01)
+        assert oracle.estimate("A", "C")["method"] == "landmarks"
+    finally:
+        oracle.stop()
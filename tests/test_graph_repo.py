@@ -8,3 +8,33 @@ def test_graph_repo_save_load(tmp_graph_file):
 
     loaded = repo.load()
     assert loaded == adj
+
+def test_graph_repo_journal_replay(tmp_graph_file):
+    repo = GraphRepository(str(tmp_graph_file))
+    repo.save({"u1": []})
+    repo.append("add", "u1", "u2")
+    repo.append("add", "u2", "u3")
+    repo.append("remove", "u1", "u2")
+    repo.append("node", "u4")
+    repo.close()
+
+    loaded = GraphRepository(str(tmp_graph_file)).load()
+    assert loaded == {"u1": [], "u2": ["u3"], "u3": ["u2"], "u4": []}
+
+def test_graph_repo_ignores_torn_journal_line(tmp_graph_file):
+    repo = GraphRepository(str(tmp_graph_file))
+    repo.append("add", "u1", "u2")
+    repo.close()
+    with open(repo.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "a": "u1"')  # crash a mitad de escritura
+
+    assert GraphRepository(str(tmp_graph_file)).load() == {"u1": ["u2"], "u2": ["u1"]}
+
+def test_graph_repo_save_truncates_journal(tmp_graph_file):
+    import os
+    repo = GraphRepository(str(tmp_graph_file))
+    repo.append("add", "u1", "u2")
+    repo.save({"u1": ["u2"], "u2": ["u1"]})
+
+    assert os.path.getsize(repo.journal_path) == 0
+    assert repo.load() == {"u1": ["u2"], "u2": ["u1"]}
@@ -1,4 +1,7 @@
 import threading
+
+import pytest
+
 from server.core.graph_repo import GraphRepository
 from server.core.graph_service import GraphService
 
@@ -41,3 +44,67 @@ def test_graph_service_thread_safety_smoke(tmp_graph_file):
     # Debe seguir siendo consistente (sin explotar) y terminar en estado válido
     friendsA = gs.friends_of("A")
     assert isinstance(friendsA, list)
+
+def test_graph_service_recovers_from_journal(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    gs.add_friendship("A", "B")
+    gs.add_friendship("B", "C")
+    gs.remove_friendship("A", "B")
+
+    # Simula reinicio sin compactar: el snapshot sigue vacío
+    gs2 = GraphService(GraphRepository(str(tmp_graph_file)))
+    assert gs2.snapshot() == {"A": [], "B": ["C"], "C": ["B"]}
+
+def test_graph_service_compacts_periodically(tmp_graph_file):
+    import json
+    repo = GraphRepository(str(tmp_graph_file))
+    gs = GraphService(repo, compact_every=2)
+    gs.add_friendship("A", "B")
+    gs.add_friendship("B", "C")
+
+    with open(tmp_graph_file, encoding="utf-8") as f:
+        assert json.load(f) == {"A": ["B"], "B": ["A", "C"], "C": ["B"]}
+
+def test_graph_service_versions_and_immutable_reads(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    v0 = gs.version
+    gs.add_friendship("A", "B")
+    old = gs.current()
+    assert gs.version == v0 + 1
+
+    gs.add_friendship("A", "C")
+    gs.add_friendship("A", "C")  # sin cambios: no hay versión nueva
+    assert gs.version == v0 + 2
+    # La versión tomada antes no cambia
+    assert old["A"] == ("B",)
+    assert gs.friends_of("A") == ["B", "C"]
+
+def test_graph_service_friends_page_cursor_is_stable(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    for i in range(7):
+        gs.add_friendship("A", f"F{i}")
+
+    page, cur = gs.friends_page("A", limit=3)
+    assert page == ["F0", "F1", "F2"] and cur == "F2"
+
+    # Un alta antes del cursor no corre la página siguiente
+    gs.add_friendship("A", "E")
+    page, cur = gs.friends_page("A", cur, limit=3)
+    assert page == ["F3", "F4", "F5"]
+    page, cur = gs.friends_page("A", cur, limit=3)
+    assert page == ["F6"] and cur is None
+    assert gs.friends_page("Z") == ([], None)
+
+def test_graph_service_journal_failure_does_not_publish(tmp_graph_file):
+    repo = GraphRepository(str(tmp_graph_file))
+    gs = GraphService(repo)
+    seen = []
+    gs.add_listener(lambda version, op, nodes: seen.append(op))
+
+    def broken(*args):
+        raise OSError("disk full")
+
+    repo.append = broken
+    with pytest.raises(OSError):
+        gs.add_friendship("A", "B")
+    assert gs.friends_of("A") == [] and seen == [] and gs.version == 0
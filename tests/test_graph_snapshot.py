@@ -0,0 +1,28 @@
+from server.core.graph_snapshot import GraphSnapshot, with_friend, without_friend
+
+def test_snapshot_build_and_mapping():
+    snap = GraphSnapshot.build({"A": ["C", "B"], "B": ["A"], "C": ["A"]})
+    assert snap["A"] == ("B", "C")
+    assert "B" in snap and "Z" not in snap
+    assert sorted(snap) == ["A", "B", "C"]
+    assert len(snap) == 3
+    assert snap.has_edge("A", "C") and not snap.has_edge("B", "C")
+
+def test_snapshot_with_changes_is_copy_on_write():
+    v0 = GraphSnapshot.build({"A": [], "B": []})
+    v1 = v0.with_changes({"A": with_friend(v0["A"], "B"), "B": with_friend(v0["B"], "A")})
+
+    assert v1.version == v0.version + 1
+    assert v0["A"] == () and v1["A"] == ("B",)
+
+    v2 = v1.with_changes({"A": without_friend(v1["A"], "B"), "N": ()})
+    assert v1["A"] == ("B",) and v2["A"] == ()
+    assert len(v1) == 2 and len(v2) == 3
+
+def test_snapshot_reshards_when_growing():
+    snap = GraphSnapshot.build({})
+    for i in range(2000):
+        snap = snap.with_changes({f"u{i}": ()})
+    assert len(snap) == 2000
+    assert all(f"u{i}" in snap for i in range(2000))
+    assert snap.version == 2000
@@ -0,0 +1,42 @@
+from server.core.metrics import UNKNOWN, MetricsRegistry
+
+def test_metrics_counts_errors_in_flight_and_histogram():
+    m = MetricsRegistry(known_types={"PING", "LOGIN"})
+    t0 = m.begin("PING")
+    assert m.snapshot()["types"]["PING"]["in_flight"] == 1
+    m.end("PING", t0, ok=True)
+    m.end("LOGIN", m.begin("LOGIN"), ok=False)
+    m.add_bytes("LOGIN", 40, 120)
+
+    snap = m.snapshot()["types"]
+    assert (snap["PING"]["requests"], snap["PING"]["errors"], snap["PING"]["in_flight"]) == (1, 0, 0)
+    assert (snap["LOGIN"]["errors"], snap["LOGIN"]["bytes_in"], snap["LOGIN"]["bytes_out"]) == (1, 40, 120)
+    assert sum(snap["PING"]["histogram"]) == 1
+    assert snap["PING"]["latency_ms"]["p50"] is not None
+
+def test_metrics_labels_unknown_types():
+    m = MetricsRegistry(known_types={"PING"})
+    assert m.label("PING") == "PING"
+    assert m.label("NOPE") == UNKNOWN
+    assert m.label(None) == UNKNOWN
+
+def test_metrics_prometheus_text_and_dump(tmp_path):
+    m = MetricsRegistry()
+    m.end("PING", m.begin("PING"), ok=True)
+    text = m.prometheus_text()
+    assert 'socialtec_requests_total{type="PING"} 1' in text
+    assert 'socialtec_request_duration_seconds_bucket{type="PING",le="+Inf"} 1' in text
+    assert 'socialtec_request_duration_seconds_count{type="PING"} 1' in text
+
+    out = tmp_path / "metrics.prom"
+    m.dump(str(out))
+    assert out.read_text(encoding="utf-8") == text
+
+def test_metrics_reset_keeps_in_flight():
+    m = MetricsRegistry()
+    m.end("A", m.begin("A"), ok=True)
+    m.begin("B")
+    m.reset()
+    snap = m.snapshot()["types"]
+    assert "A" not in snap
+    assert snap["B"]["in_flight"] == 1 and snap["B"]["requests"] == 0
@@ -0,0 +1,25 @@
+from server.core.graph_repo import GraphRepository
+from server.core.sqlite_repo import SqliteDatabase, SqliteUserRepository, SqliteGraphRepository
+from server.core.user_repo import UserRepository
+from server.migrate_sqlite import migrate
+
+def test_migrate_json_to_sqlite(tmp_path):
+    users = UserRepository(str(tmp_path / "users.json"))
+    a = users.create_user("Julian", "Test", "julian123", "H1")
+    b = users.create_user("Ana", "Lopez", "ana123", "H2")
+
+    graph_repo = GraphRepository(str(tmp_path / "graph.json"))
+    graph_repo.save({a["id"]: [], b["id"]: []})
+    graph_repo.append("add", a["id"], b["id"])  # queda en el journal
+    graph_repo.close()
+
+    db_path = str(tmp_path / "st.db")
+    res = migrate(str(tmp_path / "users.json"), str(tmp_path / "graph.json"), db_path)
+    assert res == {"users": 2, "edges": 1}
+
+    # Idempotente
+    assert migrate(str(tmp_path / "users.json"), str(tmp_path / "graph.json"), db_path) == res
+
+    db = SqliteDatabase(db_path)
+    assert SqliteUserRepository(db).find_by_username("ana123")["id"] == b["id"]
+    assert SqliteGraphRepository(db).load() == {a["id"]: [b["id"]], b["id"]: [a["id"]]}
@@ -0,0 +1,34 @@
+from server.core.ngram_index import NgramIndex
+
+def test_ngram_index_substring_and_short_fields():
+    idx = NgramIndex()
+    idx.add("1", ["julian gomez", "jg"])
+    idx.add("2", ["ana lopez", "al"])
+
+    assert idx.search("lian go") == ["1"]
+    assert idx.search("al") == ["2"]
+    assert idx.search("OPE") == ["2"]
+    assert idx.search("xyz") == []
+
+def test_ngram_index_no_false_positives_from_grams():
+    idx = NgramIndex()
+    # contiene "abc" y "bcd" pero no "abcd"
+    idx.add("1", ["abc bcd"])
+    assert idx.search("abcd") == []
+
+def test_ngram_index_ranks_prefix_first():
+    idx = NgramIndex()
+    idx.add("mid", ["maria ana"])
+    idx.add("word", ["zoe anabel"])
+    idx.add("prefix", ["ana lopez"])
+    idx.add("inner", ["diana perez"])
+
+    assert idx.search("ana") == ["prefix", "mid", "word", "inner"]
+    assert idx.search("ana", limit=2) == ["prefix", "mid"]
+
+def test_ngram_index_remove():
+    idx = NgramIndex()
+    idx.add("1", ["julian"])
+    idx.remove("1")
+    assert idx.search("jul") == []
+    assert len(idx) == 0
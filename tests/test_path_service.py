@@ -27,3 +27,76 @@ def test_path_same_node(tmp_graph_file):
 
     ps = PathService(gs)
     assert ps.find_path_bfs("A", "A") == ["A"]
+
+def test_path_is_shortest_in_both_directions(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    # Camino largo A-B-C-D-E y atajo A-X-E
+    for a, b in [("A", "B"), ("B", "C"), ("C", "D"), ("D", "E"), ("A", "X"), ("X", "E")]:
+        gs.add_friendship(a, b)
+    # Hub con muchos vecinos del lado de E: fuerza a expandir desde A
+    for i in range(20):
+        gs.add_friendship("E", f"N{i}")
+
+    ps = PathService(gs)
+    assert ps.find_path_bfs("A", "E") == ["A", "X", "E"]
+    assert ps.find_path_bfs("E", "A") == ["E", "X", "A"]
+    assert ps.find_path_bfs("B", "N3") in (["B", "A", "X", "E", "N3"], ["B", "C", "D", "E", "N3"])
+
+def test_path_respects_budgets(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    for a, b in [("A", "B"), ("B", "C"), ("C", "D")]:
+        gs.add_friendship(a, b)
+
+    ps = PathService(gs)
+    assert ps.find_path_bfs("A", "D", max_depth=2) == []
+    assert ps.find_path_bfs("A", "D", max_depth=3) == ["A", "B", "C", "D"]
+    assert ps.find_path_bfs("A", "D", max_visited=2) == []
+
+def test_path_unknown_node(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    gs.add_friendship("A", "B")
+    assert PathService(gs).find_path_bfs("A", "Z") == []
+
+def test_path_cache_hits_and_invalidates_on_mutation(tmp_graph_file):
+    from server.core.query_cache import QueryCache
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    cache = QueryCache()
+    gs.add_listener(cache.on_graph_change)
+    for a, b in [("A", "B"), ("B", "C"), ("C", "D")]:
+        gs.add_friendship(a, b)
+    ps = PathService(gs, cache=cache)
+
+    assert ps.find_path_bfs("A", "D") == ["A", "B", "C", "D"]
+    assert ps.find_path_bfs("A", "D") == ["A", "B", "C", "D"]
+    assert cache.stats()["hits"] == 1
+
+    # Arista lejana quitada: la entrada sobrevive
+    gs.add_friendship("X", "Y")
+    ps.find_path_bfs("A", "D")
+    gs.remove_friendship("X", "Y")
+    assert ps.find_path_bfs("A", "D") == ["A", "B", "C", "D"]
+    assert cache.stats()["hits"] == 2
+
+    # Atajo nuevo: hay que recalcular
+    gs.add_friendship("A", "D")
+    assert ps.find_path_bfs("A", "D") == ["A", "D"]
+    gs.remove_friendship("B", "C")
+    gs.remove_friendship("A", "D")
+    assert ps.find_path_bfs("A", "D") == []
+
+def test_path_disconnected_short_circuits_without_bfs(tmp_graph_file, monkeypatch):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    for i in range(50):
+        gs.add_friendship("A", f"N{i}")
+    gs.ensure_user("Z")
+    ps = PathService(gs)
+
+    def boom(*args):
+        raise AssertionError("BFS should not run")
+    monkeypatch.setattr(ps, "_bidirectional", boom)
+    assert ps.find_path_bfs("A", "Z") == []
+
+    # Tras una baja, una vez reconstruido el índice sigue respondiendo
+    gs.remove_friendship("A", "N0")
+    gs._components.rebuild(gs.current())
+    assert ps.find_path_bfs("N0", "A") == []
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from client.net.pool import ApiClientPool, PoolTimeout
+
+def test_pool_concurrent_requests_and_stats(start_server):
+    srv = start_server(lambda req: {"status": "ok", "data": req.get("payload")})
+    pool = ApiClientPool("127.0.0.1", srv.port, min_size=1, max_size=3)
+    try:
+        results = []
+
+        def worker(i):
+            results.append(pool.request({"type": "PING", "payload": i})["data"])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+        for th in threads: th.start()
+        for th in threads: th.join()
+
+        assert sorted(results) == list(range(10))
+        st = pool.stats()
+        assert st["in_use"] == 0
+        assert 1 <= st["size"] <= 3
+        assert st["acquires"] == 10
+    finally:
+        pool.close()
+
+def test_pool_reconnects_and_retries_idempotent(start_server):
+    srv = start_server(lambda req: {"status": "ok"})
+    pool = ApiClientPool("127.0.0.1", srv.port, min_size=1, max_size=1)
+    try:
+        # Cortamos la conexión ociosa por debajo del pool
+        c = pool.acquire()
+        c.sock.close()
+        pool.release(c)
+
+        assert pool.request({"type": "PING"})["status"] == "ok"
+        assert pool.stats()["retries"] == 1
+    finally:
+        pool.close()
+
+def test_pool_wait_times_out_when_exhausted(start_server):
+    srv = start_server(lambda req: {"status": "ok"})
+    pool = ApiClientPool("127.0.0.1", srv.port, min_size=0, max_size=1)
+    try:
+        held = pool.acquire()
+        with pytest.raises(PoolTimeout):
+            pool.request({"type": "PING"}, deadline=0.1)
+        pool.release(held)
+        assert pool.request({"type": "PING"}, deadline=1.0)["status"] == "ok"
+    finally:
+        pool.close()
+
+def test_pool_releases_client_on_unexpected_error(monkeypatch, start_server):
+    srv = start_server(lambda req: {"status": "ok"})
+    pool = ApiClientPool("127.0.0.1", srv.port, min_size=0, max_size=1)
+    try:
+        from client.net.api_client import ApiClient
+        real = ApiClient.request
+
+        def bad_frame(self, msg):
+            raise ValueError("Invalid frame")
+
+        monkeypatch.setattr(ApiClient, "request", bad_frame)
+        with pytest.raises(ValueError):
+            pool.request({"type": "PING"})
+        assert pool.stats()["in_use"] == 0
+
+        monkeypatch.setattr(ApiClient, "request", real)
+        assert pool.request({"type": "PING"}, deadline=1.0)["status"] == "ok"
+    finally:
+        pool.close()
+
+def test_pool_request_deadline_on_slow_server(start_server):
+    def handler(req):
+        time.sleep(0.5)
+        return {"status": "ok"}
+
+    srv = start_server(handler)
+    pool = ApiClientPool("127.0.0.1", srv.port, min_size=1, max_size=1)
+    try:
+        with pytest.raises(PoolTimeout):
+            pool.request({"type": "GRAPH_STATS"}, deadline=0.1)
+        # La conexión vencida se descartó
+        assert pool.stats()["size"] == 0
+    finally:
+        pool.close()
@@ -0,0 +1,80 @@
+import pstats
+import time
+
+import pytest
+
+from server.core.profiler import RequestProfiler
+
+def _busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+    return ms
+
+def test_profiler_cprofile_next_n_requests_of_type(tmp_path):
+    prof = RequestProfiler(str(tmp_path))
+    prof.start(requests=2, types=["PATH_BETWEEN"])
+    assert prof.call("PING", _busy, 1) == 1  # otro tipo: no cuenta
+    assert prof.armed
+    prof.call("PATH_BETWEEN", _busy, 1)
+    prof.call("PATH_BETWEEN", _busy, 1)
+
+    assert not prof.armed
+    result = prof.last
+    assert result["requests"] == 2 and result["mode"] == "cprofile"
+    assert result["file"].endswith(".pstats")
+    assert any("_busy" in row["function"] for row in result["top"])
+    assert pstats.Stats(result["file"]).total_calls > 0
+
+def test_profiler_sampling_writes_collapsed_stacks(tmp_path):
+    prof = RequestProfiler(str(tmp_path))
+    prof.start(seconds=10, mode="sampling", interval=0.001)
+    prof.call("GRAPH_STATS", _busy, 50)
+    result = prof.stop()
+
+    assert result["samples"] > 0
+    with open(result["file"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert all(line.startswith("GRAPH_STATS;") for line in lines)
+    assert any("_busy" in line for line in lines)
+
+def test_profiler_expires_and_rejects_double_start(tmp_path):
+    prof = RequestProfiler(str(tmp_path))
+    prof.start(seconds=0.05)
+    with pytest.raises(ValueError):
+        prof.start()
+    time.sleep(0.3)
+    assert not prof.armed
+    assert prof.last["requests"] == 0 and prof.last["file"] is None
+    with pytest.raises(ValueError):
+        prof.start(mode="nope")
+
+def test_profiler_concurrent_calls_profile_one_at_a_time(tmp_path):
+    import threading
+
+    prof = RequestProfiler(str(tmp_path))
+    prof.start(requests=3)
+    barrier = threading.Barrier(3)
+    results, errors = [], []
+
+    def request(i):
+        barrier.wait(5)
+        return i
+
+    def worker(i):
+        try:
+            results.append(prof.call("GRAPH_STATS", request, i))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert errors == []
+    assert sorted(results) == [0, 1, 2]
+    # Las tres corrieron a la vez: sólo una se perfiló y la sesión sigue armada
+    assert prof.status()["session"]["profiled"] == 1
+    assert prof.stop()["requests"] == 1
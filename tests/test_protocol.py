@@ -22,3 +22,77 @@ def test_protocol_recv_disconnect_raises():
     finally:
         try: b.close()
         except: pass
+
+def test_protocol_async_roundtrip():
+    import asyncio
+
+    async def run():
+        got = {}
+
+        async def on_client(reader, writer):
+            got["req"] = await MessageProtocol.recv_async(reader)
+            await MessageProtocol.send_async(writer, {"status": "ok"})
+            writer.close()
+
+        server = await asyncio.start_server(on_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await MessageProtocol.send_async(writer, {"type": "PING", "payload": {"ñ": 1}})
+        resp = await MessageProtocol.recv_async(reader)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return got["req"], resp
+
+    req, resp = asyncio.run(run())
+    assert req == {"type": "PING", "payload": {"ñ": 1}}
+    assert resp == {"status": "ok"}
+
+def test_protocol_binary_roundtrip_with_reused_buffer():
+    from shared.protocol import BINARY, FrameBuffer
+    a, b = socket.socketpair()
+    try:
+        buf = FrameBuffer(8)
+        small = {"type": "PING"}
+        large = {"type": "X", "payload": {"items": ["y" * 50] * 2000}}
+        for msg in (small, large, small):
+            MessageProtocol.send(a, msg, BINARY)
+            assert MessageProtocol.recv(b, BINARY, buf) == msg
+    finally:
+        a.close()
+        b.close()
+
+def test_protocol_negotiate():
+    req = MessageProtocol.hello(["bin1", "json"])
+    resp, codec = MessageProtocol.negotiate(req)
+    assert codec == "bin1"
+    assert resp["data"]["encoding"] == "bin1"
+
+    _, codec = MessageProtocol.negotiate({"type": "HELLO", "payload": {"encodings": ["zstd"]}})
+    assert codec == "json"
+
+def test_protocol_rejects_oversized_frame_before_reading_it():
+    import asyncio
+    import struct
+
+    from shared.protocol import FrameBuffer
+
+    a, b = socket.socketpair()
+    try:
+        a.sendall(struct.pack(">I", 1 << 30))
+        buf = FrameBuffer(16)
+        with pytest.raises(ConnectionError, match="too large"):
+            MessageProtocol.recv(b, buffer=buf, max_size=1024)
+        # El buffer no creció al tamaño anunciado
+        assert len(buf._buf) == 16
+    finally:
+        a.close()
+        b.close()
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(struct.pack(">I", 2048) + b"x" * 2048)
+        with pytest.raises(ConnectionError, match="too large"):
+            await MessageProtocol.recv_async_sized(reader, max_size=1024)
+
+    asyncio.run(run())
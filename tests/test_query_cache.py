@@ -0,0 +1,53 @@
+from server.core.query_cache import QueryCache
+
+def test_query_cache_lru_and_counters():
+    c = QueryCache(max_entries=2)
+    c.put("a", 1, [1])
+    c.put("b", 1, [2])
+    assert c.get("a", 1) == [1]
+    c.put("c", 1, [3])  # desaloja "b" (el menos usado)
+
+    assert c.get("b", 1) is None
+    assert c.get("c", 1) == [3]
+    assert c.get("a", 2) is None  # otra versión del grafo
+
+    st = c.stats()
+    assert (st["hits"], st["misses"], st["evictions"], st["size"]) == (2, 2, 1, 2)
+
+def test_query_cache_selective_invalidation():
+    c = QueryCache(selective=True)
+    c.put("path-AB", 1, ("A", "X", "B"), touched=["A", "X", "B"])
+    c.put("no-path", 1, (), touched=[])
+    c.put("friends-C", 1, ("D",), touched=["C"], survives_add=True)
+    c.put("global", 1, 42)
+
+    # Quitar una arista lejos del camino: sólo cae lo que depende de todo el grafo
+    c.on_graph_change(2, "remove", ["P", "Q"])
+    assert c.get("path-AB", 2) == ("A", "X", "B")
+    assert c.get("no-path", 2) == ()
+    assert c.get("friends-C", 2) == ("D",)
+    assert c.get("global", 2) is None
+
+    # Agregar una arista puede acortar caminos o crearlos
+    c.on_graph_change(3, "add", ["P", "Q"])
+    assert c.get("path-AB", 3) is None
+    assert c.get("no-path", 3) is None
+    assert c.get("friends-C", 3) == ("D",)
+
+    c.on_graph_change(4, "remove", ["C", "D"])
+    assert c.get("friends-C", 4) is None
+    assert c.stats()["invalidations"] == 4
+
+def test_query_cache_full_invalidation_mode():
+    c = QueryCache(selective=False)
+    c.put("k", 1, 1, touched=["A"], survives_add=True)
+    c.on_graph_change(2, "remove", ["Z"])
+    assert c.stats()["size"] == 0
+
+def test_query_cache_does_not_revalidate_late_put():
+    c = QueryCache()
+    c.on_graph_change(2, "add", ["A", "B"])
+    # Un lector que calculó sobre la versión 1 guarda tarde: no debe pasar a la 3
+    c.put("k", 1, 1, touched=["Z"], survives_add=True)
+    c.on_graph_change(3, "remove", ["A", "B"])
+    assert c.get("k", 3) is None
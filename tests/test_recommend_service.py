@@ -0,0 +1,68 @@
+import math
+import time
+
+from server.core.graph_repo import GraphRepository
+from server.core.graph_service import GraphService
+from server.core.recommend_service import COMMON, RecommendService, intersect_sorted
+
+def test_intersect_sorted_both_strategies():
+    big = tuple(f"u{i:04d}" for i in range(0, 2000, 2))
+    assert intersect_sorted(("u0002", "u0003", "u1998"), big) == ["u0002", "u1998"]
+    assert intersect_sorted(big[:10], big[5:15]) == list(big[5:10])
+    assert intersect_sorted((), big) == []
+
+def _graph(tmp_graph_file, edges):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    for a, b in edges:
+        gs.add_friendship(a, b)
+    return gs
+
+def test_recommend_ranks_two_hop_candidates(tmp_graph_file):
+    # U es amigo de A y B; X comparte A y B, Y sólo A (que además tiene grado alto)
+    gs = _graph(tmp_graph_file, [("U", "A"), ("U", "B"), ("A", "X"), ("B", "X"), ("A", "Y"), ("A", "Z")])
+    rs = RecommendService(gs)
+
+    assert rs.mutual_friends("U", "X") == ["A", "B"]
+    assert rs.recommend("U", 3, COMMON) == [("X", 2), ("Y", 1), ("Z", 1)]
+
+    top = rs.recommend("U", 2)
+    assert top[0][0] == "X"
+    assert math.isclose(top[0][1], 1 / math.log(4) + 1 / math.log(2))
+
+def test_recommend_table_invalidates_only_affected_users(tmp_graph_file):
+    gs = _graph(tmp_graph_file, [("U", "A"), ("A", "X"), ("V", "B"), ("B", "W")])
+    rs = RecommendService(gs)
+    assert rs.recommend("U") == rs.recommend("U")
+    rs.recommend("V")
+    assert rs.stats()["hits"] == 1 and rs.stats()["entries"] == 2
+
+    # A es vecino de U: la entrada de U cae, la de V no
+    gs.add_friendship("A", "Q")
+    assert rs.stats() == {"entries": 1, "dirty": 1, "hits": 1, "misses": 2}
+    assert rs.refresh() == 1
+    assert [c for c, _ in rs.recommend("U")] == ["Q", "X"]
+    assert rs.stats()["hits"] == 2
+
+def test_recommend_empty_table_ignores_writes(tmp_graph_file):
+    gs = _graph(tmp_graph_file, [("U", "A"), ("A", "X")])
+    rs = RecommendService(gs)
+    gs.add_friendship("A", "Q")
+    assert rs.stats() == {"entries": 0, "dirty": 0, "hits": 0, "misses": 0}
+    # La versión avanza igual: lo calculado después se guarda
+    rs.recommend("U")
+    assert rs.stats()["entries"] == 1
+
+def test_recommend_background_refresh(tmp_graph_file):
+    gs = _graph(tmp_graph_file, [("U", "A"), ("A", "X")])
+    rs = RecommendService(gs, refresh_interval=0.01)
+    rs.recommend("U")
+    rs.start()
+    try:
+        gs.add_friendship("A", "Q")
+        deadline = time.monotonic() + 5
+        while rs.stats()["dirty"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        rs.stop()
+    assert rs.stats()["entries"] == 1 and rs.stats()["dirty"] == 0
+    assert [c for c, _ in rs.recommend("U")] == ["Q", "X"]
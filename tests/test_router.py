@@ -41,3 +41,238 @@ def test_router_unknown_type(tmp_path, monkeypatch):
     router = router_module.RequestRouter()
     resp = router.handle({"type":"NOPE"})
     assert resp["status"] == "error"
+
+def test_router_sqlite_backend(tmp_path, monkeypatch):
+    key = Fernet.generate_key()
+    crypto = CryptoService(key)
+
+    import shared.config as cfg
+    monkeypatch.setattr(cfg, "FERNET_KEY", key, raising=False)
+    monkeypatch.setattr(cfg, "STORAGE_BACKEND", "sqlite", raising=False)
+    monkeypatch.setattr(cfg, "SQLITE_FILE", str(tmp_path / "st.db"), raising=False)
+
+    import server.core.router as router_module
+    importlib.reload(router_module)
+
+    router = router_module.RequestRouter()
+    reg = router.handle({"type": "REGISTER", "secure": crypto.encrypt_json(
+        {"name": "Julian", "lastname": "Test", "username": "julian123", "password": "1234"})})
+    assert reg["status"] == "ok"
+
+    again = router_module.RequestRouter()
+    resp = again.handle({"type": "GET_MY_PROFILE", "payload": {"user_id": reg["data"]["id"]}})
+    assert resp["status"] == "ok"
+    assert resp["data"]["me"]["username"] == "julian123"
+
+def _make_router(tmp_path, monkeypatch, key=None):
+    import shared.config as cfg
+    if key is not None:
+        monkeypatch.setattr(cfg, "FERNET_KEY", key, raising=False)
+    monkeypatch.setattr(cfg, "USERS_FILE", str(tmp_path / "users.json"), raising=False)
+    monkeypatch.setattr(cfg, "GRAPH_FILE", str(tmp_path / "graph.json"), raising=False)
+
+    import server.core.router as router_module
+    importlib.reload(router_module)
+    return router_module.RequestRouter()
+
+def test_router_batch_keeps_order_and_per_item_status(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    a = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    b = router.users.create_user("Ana", "Lopez", "ana123", "H")["id"]
+
+    resp = router.handle({"type": "BATCH", "payload": {"parallel": True, "requests": [
+        {"type": "PATH_BETWEEN", "payload": {"src": a, "dst": b}},
+        {"type": "ADD_FRIEND", "payload": {"a": a, "b": b}},
+        {"type": "PATH_BETWEEN", "payload": {"src": a, "dst": b}},
+        {"type": "GRAPH_STATS"},
+        {"type": "NOPE"},
+        {"type": "BATCH", "payload": {"requests": []}},
+    ]}})
+
+    assert resp["status"] == "ok"
+    results = resp["data"]["results"]
+    assert [r["status"] for r in results] == ["ok", "ok", "ok", "ok", "error", "error"]
+    assert results[0]["data"]["exists"] is False
+    assert results[2]["data"]["path"] == [a, b]
+    assert results[3]["data"]["max_friends"] == 1
+
+def test_router_batch_rejects_non_list(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    resp = router.handle({"type": "BATCH", "payload": {"requests": "nope"}})
+    assert resp["status"] == "error"
+
+def test_router_batch_metrics_reset_is_a_write(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    assert router._is_read_only({"type": "METRICS"})
+    assert not router._is_read_only({"type": "METRICS", "payload": {"reset": True}})
+
+    # El reset hace de barrera: el METRICS siguiente ya no ve los PING de antes
+    resp = router.handle({"type": "BATCH", "payload": {"parallel": True, "requests": [
+        {"type": "PING"},
+        {"type": "PING"},
+        {"type": "METRICS", "payload": {"reset": True}},
+        {"type": "METRICS"},
+    ]}})
+    results = resp["data"]["results"]
+    assert [r["status"] for r in results] == ["ok"] * 4
+    assert "PING" not in results[3]["data"]["types"]
+
+def test_router_cache_stats(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    a = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    b = router.users.create_user("Ana", "Lopez", "ana123", "H")["id"]
+    router.handle({"type": "ADD_FRIEND", "payload": {"a": a, "b": b}})
+    for _ in range(3):
+        router.handle({"type": "PATH_BETWEEN", "payload": {"src": a, "dst": b}})
+
+    resp = router.handle({"type": "CACHE_STATS"})
+    assert resp["status"] == "ok"
+    assert resp["data"]["hits"] == 2 and resp["data"]["misses"] == 1
+
+def test_router_profile_resolves_friends_in_bulk_with_fields(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    me = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    ids = [router.users.create_user(f"U{i}", "X", f"user{i}", "H")["id"] for i in range(5)]
+    for fid in ids:
+        router.handle({"type": "ADD_FRIEND", "payload": {"a": me, "b": fid}})
+
+    calls = []
+    orig = router.users.get_many
+    monkeypatch.setattr(router.users, "get_many", lambda *a, **k: calls.append(a) or orig(*a, **k))
+    resp = router.handle({"type": "GET_MY_PROFILE", "payload": {"user_id": me, "fields": ["id", "username"]}})
+
+    assert resp["status"] == "ok"
+    assert len(calls) == 2  # me + todos los amigos
+    assert resp["data"]["me"] == {"id": me, "username": "julian123"}
+    assert sorted(f["username"] for f in resp["data"]["friends"]) == [f"user{i}" for i in range(5)]
+
+    bad = router.handle({"type": "GET_MY_PROFILE", "payload": {"user_id": me, "fields": ["password_hash"]}})
+    assert bad == {"status": "error", "error": "Invalid fields"}
+
+def test_router_friends_page_and_stream(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    me = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    for i in range(5):
+        fid = router.users.create_user(f"U{i}", "X", f"user{i}", "H")["id"]
+        router.handle({"type": "ADD_FRIEND", "payload": {"a": me, "b": fid}})
+
+    got, cursor = [], None
+    while True:
+        resp = router.handle({"type": "FRIENDS_PAGE", "payload": {"user_id": me, "cursor": cursor, "limit": 2, "fields": ["username"]}})
+        assert resp["status"] == "ok" and len(resp["data"]["friends"]) <= 2
+        got += [f["username"] for f in resp["data"]["friends"]]
+        cursor = resp["data"]["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(got) == [f"user{i}" for i in range(5)]
+
+    frames = list(router.handle({"type": "FRIENDS_PAGE", "payload": {"user_id": me, "limit": 2, "stream": True}}))
+    assert [f["more"] for f in frames] == [True, True, False]
+    assert sum(len(f["data"]["friends"]) for f in frames) == 5
+
+    resp = router.handle({"type": "BATCH", "payload": {"requests": [
+        {"type": "FRIENDS_PAGE", "payload": {"user_id": me, "stream": True}},
+    ]}})
+    assert resp["data"]["results"][0]["status"] == "error"
+
+def test_router_mutual_friends_and_recommend(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    u, a, b, x = [router.users.create_user(n, "X", n.lower(), "H")["id"] for n in ("U", "A", "B", "Xx")]
+    for p, q in [(u, a), (u, b), (a, x), (b, x)]:
+        router.handle({"type": "ADD_FRIEND", "payload": {"a": p, "b": q}})
+
+    resp = router.handle({"type": "MUTUAL_FRIENDS", "payload": {"a": u, "b": x, "fields": ["username"]}})
+    assert resp["data"]["count"] == 2
+    assert sorted(m["username"] for m in resp["data"]["mutual"]) == ["a", "b"]
+
+    resp = router.handle({"type": "RECOMMEND", "payload": {"user_id": u, "k": 5, "method": "common"}})
+    assert resp["status"] == "ok"
+    assert [(r["username"], r["score"]) for r in resp["data"]["results"]] == [("xx", 2)]
+
+    bad = router.handle({"type": "RECOMMEND", "payload": {"user_id": u, "method": "nope"}})
+    assert bad == {"status": "error", "error": "Invalid method"}
+
+def test_router_distance_estimate(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    a, b, c = [router.users.create_user(n, "X", n.lower(), "H")["id"] for n in ("A", "B", "C")]
+    router.handle({"type": "ADD_FRIEND", "payload": {"a": a, "b": b}})
+    router.handle({"type": "ADD_FRIEND", "payload": {"a": b, "b": c}})
+    router.distance.refresh()
+
+    resp = router.handle({"type": "DISTANCE_ESTIMATE", "payload": {"a": a, "b": c}})
+    assert resp["status"] == "ok"
+    assert resp["data"]["lower"] <= 2 <= resp["data"]["upper"]
+    resp = router.handle({"type": "DISTANCE_ESTIMATE", "payload": {"a": a, "b": c, "exact": True}})
+    assert resp["data"]["distance"] == 2
+
+def test_router_metrics_per_type(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    router.handle({"type": "PING"})
+    router.handle({"type": "PING"})
+    router.handle({"type": "NOPE"})
+
+    resp = router.handle({"type": "METRICS"})
+    assert resp["status"] == "ok"
+    types = resp["data"]["types"]
+    assert types["PING"]["requests"] == 2 and types["PING"]["errors"] == 0
+    assert types["UNKNOWN"]["errors"] == 1
+
+    text = router.handle({"type": "METRICS", "payload": {"format": "prometheus", "reset": True}})["data"]["text"]
+    assert 'socialtec_requests_total{type="PING"} 2' in text
+    assert "PING" not in router.handle({"type": "METRICS"})["data"]["types"]
+
+def test_router_metrics_disabled(tmp_path, monkeypatch):
+    import shared.config as cfg
+    monkeypatch.setattr(cfg, "METRICS_ENABLED", False, raising=False)
+    router = _make_router(tmp_path, monkeypatch)
+    assert router.metrics is None
+    assert router.handle({"type": "PING"})["status"] == "ok"
+    assert router.handle({"type": "METRICS"})["status"] == "error"
+
+def test_router_profile_admin_message(tmp_path, monkeypatch):
+    import shared.config as cfg
+    monkeypatch.setattr(cfg, "PROFILE_DIR", str(tmp_path / "profiles"), raising=False)
+    router = _make_router(tmp_path, monkeypatch)
+
+    resp = router.handle({"type": "PROFILE", "payload": {"action": "start", "requests": 1, "types": ["GRAPH_STATS"]}})
+    assert resp["status"] == "ok"
+    assert router.handle({"type": "PROFILE"})["data"]["armed"] is True
+    router.handle({"type": "PING"})
+    assert router.handle({"type": "GRAPH_STATS"})["status"] == "ok"
+
+    status = router.handle({"type": "PROFILE", "payload": {"action": "status"}})["data"]
+    assert status["armed"] is False
+    assert status["last"]["requests"] == 1
+    assert (tmp_path / "profiles").is_dir()
+    assert router.handle({"type": "PROFILE", "payload": {"action": "stop"}})["data"]["result"] is None
+    assert router.handle({"type": "PROFILE", "payload": {"action": "start", "types": "PING"}})["status"] == "error"
+
+def test_router_stream_metrics_cover_whole_stream(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    a = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    for i in range(3):
+        b = router.users.create_user("F", "X", f"friend{i}", "H")["id"]
+        router.graph.add_friendship(a, b)
+
+    frames = router.handle({"type": "FRIENDS_PAGE", "payload": {"user_id": a, "limit": 1, "stream": True}})
+    next(frames)
+    fp = router.metrics.snapshot()["types"]["FRIENDS_PAGE"]
+    assert (fp["in_flight"], fp["requests"]) == (1, 0)
+    assert len(list(frames)) == 2
+    fp = router.metrics.snapshot()["types"]["FRIENDS_PAGE"]
+    assert (fp["in_flight"], fp["requests"], fp["errors"]) == (0, 1, 0)
+
+def test_router_stream_closed_before_start_ends_metrics(tmp_path, monkeypatch):
+    router = _make_router(tmp_path, monkeypatch)
+    a = router.users.create_user("Julian", "Test", "julian123", "H")["id"]
+    stream = {"type": "FRIENDS_PAGE", "payload": {"user_id": a, "stream": True}}
+
+    # BATCH rechaza el stream y lo cierra sin haber pedido ningún frame
+    resp = router.handle({"type": "BATCH", "payload": {"requests": [stream]}})
+    assert resp["data"]["results"][0]["error"] == "Streaming not allowed in BATCH"
+    fp = router.metrics.snapshot()["types"]["FRIENDS_PAGE"]
+    assert (fp["in_flight"], fp["requests"]) == (0, 1)
+
+    router.handle(stream).close()
+    fp = router.metrics.snapshot()["types"]["FRIENDS_PAGE"]
+    assert (fp["in_flight"], fp["requests"]) == (0, 2)
@@ -0,0 +1,33 @@
+import pytest
+from server.core.graph_service import GraphService
+from server.core.sqlite_repo import SqliteDatabase, SqliteUserRepository, SqliteGraphRepository
+
+def test_sqlite_user_repo_create_and_reload(tmp_path):
+    db_path = str(tmp_path / "st.db")
+    repo = SqliteUserRepository(SqliteDatabase(db_path))
+    u = repo.create_user("Julian", "Test", "Julian123", "HASH")
+
+    repo2 = SqliteUserRepository(SqliteDatabase(db_path))
+    assert repo2.get_by_id(u["id"])["username"] == "Julian123"
+    assert repo2.find_by_username("julian123")["id"] == u["id"]
+
+def test_sqlite_user_repo_duplicate_username(tmp_path):
+    repo = SqliteUserRepository(SqliteDatabase(str(tmp_path / "st.db")))
+    repo.create_user("A", "B", "user", "H")
+    with pytest.raises(ValueError):
+        repo.create_user("C", "D", "USER", "H2")
+
+def test_sqlite_db_uses_wal(tmp_path):
+    db = SqliteDatabase(str(tmp_path / "st.db"))
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_sqlite_graph_repo_with_graph_service(tmp_path):
+    db_path = str(tmp_path / "st.db")
+    gs = GraphService(SqliteGraphRepository(SqliteDatabase(db_path)))
+    gs.ensure_user("D")
+    gs.add_friendship("B", "A")
+    gs.add_friendship("B", "C")
+    gs.remove_friendship("C", "B")
+
+    gs2 = GraphService(SqliteGraphRepository(SqliteDatabase(db_path)))
+    assert gs2.snapshot() == {"A": ["B"], "B": ["A"], "C": [], "D": []}
@@ -23,3 +23,55 @@ def test_stats_empty(tmp_graph_file):
     stats = StatsService(gs).compute_stats()
     assert stats["max_user_id"] is None
     assert stats["avg_friends"] == 0.0
+
+def test_stats_extended_fields(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    gs.add_friendship("A", "B")
+    gs.add_friendship("A", "C")
+    gs.ensure_user("D")
+
+    stats = StatsService(gs).compute_stats()
+    assert stats["nodes"] == 4
+    assert stats["edges"] == 2
+    assert stats["isolated_users"] == 1
+    assert stats["degree_histogram"] == {"0": 1, "1": 2, "2": 1}
+    assert stats["percentiles"]["p50"] == 1
+
+def test_stats_incremental_matches_full_recompute(tmp_graph_file):
+    import random
+    rnd = random.Random(3)
+    gs = GraphService(GraphRepository(str(tmp_graph_file)), compact_every=0)
+    ids = [f"u{i}" for i in range(40)]
+    for _ in range(600):
+        a, b = rnd.sample(ids, 2)
+        if rnd.random() < 0.6:
+            gs.add_friendship(a, b)
+        else:
+            gs.remove_friendship(a, b)
+        if rnd.random() < 0.05:
+            gs.ensure_user(f"x{rnd.randint(0, 5)}")
+
+    stats = StatsService(gs).compute_stats(verify=True)
+    assert stats["verified"], stats["mismatches"]
+
+def test_stats_components(tmp_graph_file):
+    gs = GraphService(GraphRepository(str(tmp_graph_file)))
+    gs.add_friendship("A", "B")
+    gs.add_friendship("B", "C")
+    gs.add_friendship("D", "E")
+    gs.ensure_user("F")
+    gs.remove_friendship("B", "C")
+
+    # Hasta que se reconstruya el índice, los de antes de la baja (y verify no los compara)
+    stats = StatsService(gs).compute_stats(verify=True)
+    assert stats["components_stale"] is True
+    assert stats["components"] == 3
+    assert stats["verified"] is True
+
+    gs._components.rebuild(gs.current())
+    stats = StatsService(gs).compute_stats(verify=True)
+    assert stats["components_stale"] is False
+    assert stats["components"] == 4
+    assert stats["largest_component"] == 2
+    assert stats["component_sizes"] == {"1": 2, "2": 2}
+    assert stats["verified"] is True
@@ -0,0 +1,140 @@
+import socket
+import threading
+import time
+
+from shared.protocol import MessageProtocol
+
+def test_tcp_server_roundtrip(start_server):
+    srv = start_server(lambda req: {"status": "ok", "data": req})
+    with socket.create_connection(("127.0.0.1", srv.port)) as s:
+        MessageProtocol.send(s, {"type": "PING"})
+        assert MessageProtocol.recv(s)["data"]["type"] == "PING"
+
+def test_tcp_server_rejects_over_max_connections(start_server):
+    srv = start_server(lambda req: {"status": "ok"}, max_connections=1)
+    first = socket.create_connection(("127.0.0.1", srv.port))
+    MessageProtocol.send(first, {"type": "PING"})
+    MessageProtocol.recv(first)
+
+    with socket.create_connection(("127.0.0.1", srv.port)) as second:
+        assert MessageProtocol.recv(second) == {"status": "error", "error": "BUSY"}
+    first.close()
+
+def test_tcp_server_busy_when_queue_full(start_server):
+    gate = threading.Event()
+    started = threading.Event()
+
+    def handler(req):
+        if req["type"] == "SLOW":
+            started.set()
+            gate.wait(5)
+        return {"status": "ok"}
+
+    srv = start_server(handler, workers=1, queue_size=1)
+    a = socket.create_connection(("127.0.0.1", srv.port))
+    b = socket.create_connection(("127.0.0.1", srv.port))
+    MessageProtocol.send(a, {"type": "SLOW"})  # ocupa el worker
+    assert started.wait(5)
+    MessageProtocol.send(b, {"type": "SLOW"})  # ocupa la cola
+    deadline = time.time() + 5
+    while srv._pool.pending() < 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    with socket.create_connection(("127.0.0.1", srv.port)) as c:
+        MessageProtocol.send(c, {"type": "PING"})
+        assert MessageProtocol.recv(c) == {"status": "error", "error": "BUSY"}
+
+    gate.set()
+    assert MessageProtocol.recv(a)["status"] == "ok"
+    assert MessageProtocol.recv(b)["status"] == "ok"
+    a.close()
+    b.close()
+
+def test_tcp_server_reaps_idle_connections(start_server):
+    srv = start_server(lambda req: {"status": "ok"}, idle_timeout=0.2)
+    s = socket.create_connection(("127.0.0.1", srv.port))
+    s.settimeout(5)
+    assert s.recv(1) == b""  # el server cerró la conexión
+    s.close()
+    time.sleep(0.05)
+    assert srv.active_connections == 0
+
+def test_tcp_server_binary_negotiation_and_json_clients(start_server):
+    from client.net.api_client import ApiClient
+    srv = start_server(lambda req: {"status": "ok", "data": req})
+    binc = ApiClient("127.0.0.1", srv.port, encoding="bin1")
+    binc.connect()
+    assert binc.codec == "bin1"
+    assert binc.request({"type": "PING", "payload": {"x": 1}})["data"]["payload"] == {"x": 1}
+    binc.close()
+
+    jsonc = ApiClient("127.0.0.1", srv.port)
+    jsonc.connect()
+    assert jsonc.codec == "json"
+    assert jsonc.request({"type": "PING"})["status"] == "ok"
+    jsonc.close()
+
+def test_tcp_server_streams_iterator_responses(start_server):
+    from client.net.api_client import ApiClient
+
+    def handler(req):
+        n = req["payload"]["n"]
+        return ({"status": "ok", "data": {"i": i}, "more": i < n - 1} for i in range(n))
+
+    srv = start_server(handler)
+    c = ApiClient("127.0.0.1", srv.port)
+    c.connect()
+    frames = list(c.request_stream({"type": "X", "payload": {"n": 3}, "id": 7}))
+    assert [f["data"]["i"] for f in frames] == [0, 1, 2]
+    assert all(f["id"] == 7 for f in frames)
+    # La conexión sigue usable después del stream
+    assert [f["data"]["i"] for f in c.request_stream({"type": "X", "payload": {"n": 1}})] == [0]
+    c.close()
+
+def test_tcp_server_counts_bytes_per_type(start_server):
+    from server.core.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    srv = start_server(lambda req: {"status": "ok", "data": req}, metrics=metrics)
+    with socket.create_connection(("127.0.0.1", srv.port)) as s:
+        sent = MessageProtocol.send(s, {"type": "PING"})
+        MessageProtocol.recv(s)
+    deadline = time.time() + 2
+    while "PING" not in metrics.snapshot()["types"] and time.time() < deadline:
+        time.sleep(0.01)
+    ping = metrics.snapshot()["types"]["PING"]
+    assert ping["bytes_in"] == sent
+    assert ping["bytes_out"] > sent
+
+def test_tcp_server_generates_stream_frames_in_worker_pool(start_server):
+    from client.net.api_client import ApiClient
+
+    threads = []
+
+    def frames(n):
+        for i in range(n):
+            threads.append(threading.current_thread().name)
+            yield {"status": "ok", "data": {"i": i}, "more": i < n - 1}
+
+    srv = start_server(lambda req: frames(req["payload"]["n"]))
+    c = ApiClient("127.0.0.1", srv.port)
+    c.connect()
+    assert len(list(c.request_stream({"type": "X", "payload": {"n": 3}}))) == 3
+    c.close()
+    assert len(threads) == 3 and all(name.startswith("worker-") for name in threads)
+
+def test_tcp_server_caps_request_frames_but_not_responses(start_server):
+    big = "x" * 4096
+    srv = start_server(lambda req: {"status": "ok", "data": big}, max_frame_size=1024)
+    with socket.create_connection(("127.0.0.1", srv.port)) as s:
+        # La respuesta supera el tope del server: el cliente no lo aplica
+        MessageProtocol.send(s, {"type": "PING"})
+        assert MessageProtocol.recv(s)["data"] == big
+
+        MessageProtocol.send(s, {"type": "PING", "payload": big})
+        s.settimeout(5)
+        # El server corta sin leer el payload: EOF o RST según lo que quedó sin leer
+        try:
+            assert s.recv(1) == b""
+        except ConnectionResetError:
+            pass
@@ -0,0 +1,82 @@
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shared import tracing
+from shared.protocol import MessageProtocol
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(str(path), 1.0)
+    yield path
+    tracing.configure(None, 0)
+
+def _events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def test_tracing_spans_follow_request_into_pool_threads(trace_file):
+    trace = tracing.begin()
+    tracing.set_type("LOGIN")
+    with tracing.span("decrypt"):
+        pass
+
+    def work(i):
+        with tracing.span(f"work{i}"):
+            pass
+
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(tracing.wrap(work), range(2)))
+    tracing.finish(trace)
+
+    events = _events(trace_file)
+    assert sorted(e["name"] for e in events) == ["decrypt", "work0", "work1"]
+    assert {e["args"]["request_id"] for e in events} == {trace.request_id}
+    assert all(e["ph"] == "X" and e["cat"] == "LOGIN" for e in events)
+
+def test_tracing_disabled_is_noop(tmp_path):
+    tracing.configure(None, 0)
+    assert tracing.begin() is None
+    with tracing.span("x"):
+        pass
+    fn = len
+    assert tracing.wrap(fn) is fn
+
+def test_tracing_export_chrome(trace_file, tmp_path):
+    trace = tracing.begin()
+    with tracing.span("handle"):
+        pass
+    tracing.finish(trace)
+    out = tmp_path / "trace.json"
+    assert tracing.export_chrome(str(trace_file), str(out)) == 1
+    assert json.loads(out.read_text(encoding="utf-8"))["traceEvents"][0]["name"] == "handle"
+
+def test_tcp_server_traces_request_phases(trace_file):
+    from server.net.tcp_server import TcpServer
+
+    def handler(req):
+        with tracing.span("handle"):
+            return {"status": "ok"}
+
+    srv = TcpServer("127.0.0.1", 0, handler=handler)
+    t = threading.Thread(target=srv.start, daemon=True)
+    t.start()
+    assert srv.ready.wait(5)
+    try:
+        with socket.create_connection(("127.0.0.1", srv.port)) as s:
+            MessageProtocol.send(s, {"type": "PING"})
+            MessageProtocol.recv(s)
+    finally:
+        srv.stop()
+        t.join(5)
+
+    # El server escribe la traza después de enviar; el cliente puede leer antes
+    for _ in range(200):
+        names = [e["name"] for e in _events(trace_file) if e["cat"] == "PING"]
+        if "send" in names:
+            break
+        threading.Event().wait(0.01)
+    assert names == ["recv", "handle", "encode", "send"]
@@ -33,3 +33,63 @@ def test_user_repo_search_by_name(tmp_users_file):
     results = repo.search_by_name("julian g")
     assert len(results) == 1
     assert results[0]["username"] == "jg"
+
+def test_user_repo_persists_and_reloads(tmp_users_file):
+    repo = UserRepository(str(tmp_users_file))
+    u = repo.create_user("Julian", "Test", "Julian123", "HASH")
+
+    # Nueva instancia: debe leer lo escrito (write-through)
+    repo2 = UserRepository(str(tmp_users_file))
+    assert repo2.get_by_id(u["id"])["username"] == "Julian123"
+    assert repo2.find_by_username("julian123")["id"] == u["id"]
+
+def test_user_repo_returns_copies(tmp_users_file):
+    repo = UserRepository(str(tmp_users_file))
+    u = repo.create_user("Julian", "Test", "julian123", "HASH")
+
+    got = repo.get_by_id(u["id"])
+    got["username"] = "otro"
+    assert repo.get_by_id(u["id"])["username"] == "julian123"
+
+def test_user_repo_concurrent_create_unique(tmp_users_file):
+    import threading
+    repo = UserRepository(str(tmp_users_file))
+    errors = []
+
+    def worker():
+        try:
+            repo.create_user("A", "B", "same", "H")
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert len(errors) == 7
+    assert len(repo.list_all()) == 1
+
+def test_user_repo_search_matches_username_and_paginates(tmp_users_file):
+    repo = UserRepository(str(tmp_users_file))
+    for i in range(5):
+        repo.create_user("Ana", f"Perez{i}", f"ana{i}", "H")
+    repo.create_user("Julian", "Gomez", "xana", "H")
+
+    page1, cur = repo.search("ana", limit=4)
+    assert [u["username"] for u in page1] == ["ana0", "ana1", "ana2", "ana3"]
+    page2, cur2 = repo.search("ana", limit=4, cursor=cur)
+    # "xana" sólo matchea por username y no como prefijo: queda último
+    assert [u["username"] for u in page2] == ["ana4", "xana"]
+    assert cur2 is None
+
+def test_user_repo_get_many_keeps_order_and_projects(tmp_users_file):
+    repo = UserRepository(str(tmp_users_file))
+    a = repo.create_user("Ana", "Lopez", "ana", "H")
+    b = repo.create_user("Beto", "Diaz", "beto", "H")
+
+    got = repo.get_many([b["id"], "missing", a["id"]])
+    assert [u["username"] for u in got] == ["beto", "ana"]
+    assert "password_hash" in got[0]
+
+    got = repo.get_many([a["id"]], fields=("id", "name"))
+    assert got == [{"id": a["id"], "name": "Ana"}]
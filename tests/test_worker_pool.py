@@ -0,0 +1,36 @@
+import threading
+import pytest
+from server.net.worker_pool import PoolBusy, WorkerPool
+
+def test_worker_pool_runs_tasks():
+    pool = WorkerPool(workers=2, queue_size=4)
+    futs = [pool.submit(lambda x: x * 2, i) for i in range(4)]
+    assert [f.result(5) for f in futs] == [0, 2, 4, 6]
+    pool.shutdown()
+
+def test_worker_pool_propagates_exceptions():
+    pool = WorkerPool(workers=1, queue_size=1)
+
+    def boom():
+        raise ValueError("x")
+
+    with pytest.raises(ValueError):
+        pool.submit(boom).result(5)
+    pool.shutdown()
+
+def test_worker_pool_busy_when_queue_full():
+    pool = WorkerPool(workers=1, queue_size=1)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        gate.wait(5)
+
+    pool.submit(block)
+    assert started.wait(5)
+    pool.submit(block)  # ocupa la cola
+    with pytest.raises(PoolBusy):
+        pool.submit(block)
+    gate.set()
+    pool.shutdown()